@@ -0,0 +1,74 @@
+# Copyright 2022 OmniSafe Team. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Benchmark the segment-aware GAE kernel against the per-path discount_cumsum loop."""
+
+import argparse
+import timeit
+
+import numpy as np
+
+from omnisafe.utils.core import discount_cumsum, segment_gae
+
+
+def per_path_gae(rewards, values, last_values, segment_ends, gamma, lam):
+    """GAE with one discount_cumsum call per path and quantity, as done per finished path."""
+    adv = np.zeros_like(rewards)
+    rewards_to_go = np.zeros_like(rewards)
+    start = 0
+    for end, last_val in zip(segment_ends, last_values):
+        rews = np.append(rewards[start:end], last_val)
+        vals = np.append(values[start:end], last_val)
+        deltas = rews[:-1] + gamma * vals[1:] - vals[:-1]
+        adv[start:end] = discount_cumsum(deltas, gamma * lam)
+        rewards_to_go[start:end] = discount_cumsum(rews, gamma)[:-1]
+        start = end
+    return adv, adv + values, rewards_to_go
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--steps', type=int, default=30000, help='Steps per epoch')
+    parser.add_argument(
+        '--ep-lens',
+        type=int,
+        nargs='+',
+        default=[1000, 100, 10, 3],
+        help='Mean episode lengths to benchmark',
+    )
+    parser.add_argument('--repeat', type=int, default=10, help='Number of timed runs')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    rewards = rng.normal(size=args.steps)
+    values = rng.normal(size=args.steps)
+    print(
+        f'{"mean ep len":>12} {"paths":>8} {"per-path [ms]":>14} {"segment [ms]":>13} {"speedup":>8}'
+    )
+    for ep_len in args.ep_lens:
+        lengths = rng.geometric(1.0 / ep_len, size=args.steps)
+        segment_ends = np.cumsum(lengths)
+        segment_ends = np.append(segment_ends[segment_ends < args.steps], args.steps)
+        last_values = rng.normal(size=len(segment_ends))
+        inputs = (rewards, values, last_values, segment_ends, 0.99, 0.95)
+
+        for expected, result in zip(per_path_gae(*inputs), segment_gae(*inputs)):
+            np.testing.assert_allclose(expected, result, rtol=1e-6, atol=1e-6)
+
+        per_path = min(timeit.repeat(lambda: per_path_gae(*inputs), number=1, repeat=args.repeat))
+        segment = min(timeit.repeat(lambda: segment_gae(*inputs), number=1, repeat=args.repeat))
+        print(
+            f'{ep_len:>12} {len(segment_ends):>8} {per_path * 1e3:>14.2f} '
+            f'{segment * 1e3:>13.2f} {per_path / segment:>7.1f}x'
+        )
@@ -0,0 +1,85 @@
+# Copyright 2022 OmniSafe Team. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Benchmark the analytic Fisher-vector product against the double backward pass."""
+
+import argparse
+import timeit
+
+import torch
+
+from omnisafe.models import ActorBuilder
+from omnisafe.utils.fisher import GaussianFisherVectorProduct
+
+
+def autograd_fvp(actor, obs, vector):
+    """The Fisher-vector product as computed by NaturalPG with ``fvp_mode: autograd``."""
+    q_dist = actor(obs)
+    with torch.no_grad():
+        p_dist = actor(obs)
+    kl = torch.distributions.kl.kl_divergence(p_dist, q_dist).mean()
+    grads = torch.autograd.grad(kl, actor.net.parameters(), create_graph=True)
+    flat_grad_kl = torch.cat([grad.view(-1) for grad in grads])
+    grads = torch.autograd.grad((flat_grad_kl * vector).sum(), actor.net.parameters())
+    return torch.cat([grad.contiguous().view(-1) for grad in grads])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--obs-dim', type=int, default=60, help='Observation dimension')
+    parser.add_argument('--act-dim', type=int, default=2, help='Action dimension')
+    parser.add_argument('--hidden-sizes', type=int, nargs='+', default=[64, 64])
+    parser.add_argument('--samples', type=int, default=7500, help='Number of observations')
+    parser.add_argument('--cg-iters', type=int, default=10, help='Products per update')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timed runs')
+    args = parser.parse_args()
+
+    builder = ActorBuilder(
+        obs_dim=args.obs_dim,
+        act_dim=args.act_dim,
+        hidden_sizes=args.hidden_sizes,
+        activation='tanh',
+        weight_initialization_mode='kaiming_uniform',
+    )
+    obs = torch.randn(args.samples, args.obs_dim)
+    print(f'{"actor":>20} {"autograd [ms]":>14} {"analytic [ms]":>14} {"speedup":>8}')
+    for actor_type in ('gaussian_annealing', 'gaussian_learning', 'gaussian_stdnet'):
+        actor = builder.build_actor(
+            actor_type,
+            act_min=-torch.ones(args.act_dim),
+            act_max=torch.ones(args.act_dim),
+        )
+        vector = torch.randn(sum(param.numel() for param in actor.net.parameters()))
+        torch.testing.assert_close(
+            GaussianFisherVectorProduct(actor, obs)(vector),
+            autograd_fvp(actor, obs, vector),
+            rtol=1e-4,
+            atol=1e-6,
+        )
+
+        def run_autograd():
+            for _ in range(args.cg_iters + 1):
+                autograd_fvp(actor, obs, vector)  # pylint: disable=cell-var-from-loop
+
+        def run_analytic():
+            fvp = GaussianFisherVectorProduct(actor, obs)  # pylint: disable=cell-var-from-loop
+            for _ in range(args.cg_iters + 1):
+                fvp(vector)  # pylint: disable=cell-var-from-loop
+
+        autograd = min(timeit.repeat(run_autograd, number=1, repeat=args.repeat))
+        analytic = min(timeit.repeat(run_analytic, number=1, repeat=args.repeat))
+        print(
+            f'{actor_type:>20} {autograd * 1e3:>14.2f} {analytic * 1e3:>14.2f} '
+            f'{autograd / analytic:>7.1f}x'
+        )
@@ -0,0 +1,59 @@
+# Copyright 2022 OmniSafe Team. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Benchmark the cold import time of omnisafe and of the first lookup of an algorithm."""
+
+import argparse
+import subprocess
+import sys
+import time
+
+
+def cold_import_time(code: str, repeat: int) -> float:
+    """The shortest time over ``repeat`` fresh interpreters to run ``code``, minus the startup."""
+
+    def run(statement):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', statement], check=True)
+        return time.perf_counter() - start
+
+    startup = min(run('pass') for _ in range(repeat))
+    return min(run(code) for _ in range(repeat)) - startup
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='Number of timed runs')
+    parser.add_argument(
+        '--algo', type=str, default='PPOLag', help='Algorithm whose first lookup is timed'
+    )
+    parser.add_argument(
+        '--target-ms', type=float, default=200.0, help='Target cold time of import omnisafe'
+    )
+    args = parser.parse_args()
+
+    statements = {
+        'import omnisafe': 'import omnisafe',
+        f'registry.get({args.algo!r})': (
+            f'from omnisafe.algorithms import registry; registry.get({args.algo!r})'
+        ),
+    }
+    print(f'{"statement":>32} {"cold [ms]":>10}')
+    times = {}
+    for name, code in statements.items():
+        times[name] = cold_import_time(code, args.repeat)
+        print(f'{name:>32} {times[name] * 1e3:>10.1f}')
+
+    if times['import omnisafe'] * 1e3 > args.target_ms:
+        sys.exit(f'import omnisafe takes longer than the target of {args.target_ms:.0f} ms')
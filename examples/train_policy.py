@@ -43,6 +43,41 @@ if __name__ == '__main__':
         metavar='N',
         help='Number of paralleled progress for calculations.',
     )
+    parser.add_argument(
+        '--nnodes',
+        default=1,
+        type=int,
+        metavar='N',
+        help='Number of nodes, each running --parallel processes.',
+    )
+    parser.add_argument(
+        '--node-rank',
+        default=0,
+        type=int,
+        metavar='RANK',
+        help='Rank of this node, between 0 and nnodes - 1.',
+    )
+    parser.add_argument(
+        '--rdzv-endpoint',
+        default=None,
+        type=str,
+        metavar='HOST:PORT',
+        help='Address of the node with rank 0, required for several nodes.',
+    )
+    parser.add_argument(
+        '--max-restarts',
+        default=0,
+        type=int,
+        metavar='N',
+        help='Number of times the workers are restarted from the latest checkpoint on failure.',
+    )
+    parser.add_argument(
+        '--resume-from',
+        default=None,
+        type=str,
+        metavar='PATH',
+        help='Checkpoint file, or log directory of a run, to continue the training from.',
+    )
     args, unparsed_args = parser.parse_known_args()
     keys = [k[2:] for k in unparsed_args[0::2]]
     values = list(unparsed_args[1::2])
@@ -52,6 +87,10 @@ if __name__ == '__main__':
         args.algo,
         args.env_id,
         parallel=args.parallel,
+        nnodes=args.nnodes,
+        node_rank=args.node_rank,
+        rdzv_endpoint=args.rdzv_endpoint,
+        max_restarts=args.max_restarts,
         custom_cfgs=unparsed_dict,
     )
-    agent.learn()
+    agent.learn(resume_from=args.resume_from)
@@ -16,8 +16,26 @@
 
 from omnisafe import algorithms
 from omnisafe.algorithms import ALGORITHMS
-from omnisafe.algorithms.algo_wrapper import AlgoWrapper as Agent
-from omnisafe.evaluator import Evaluator
 
 # from omnisafe.algorithms.env_wrapper import EnvWrapper as Env
 from omnisafe.version import __version__
+
+
+# Names resolved on first access, as they import torch and the environments
+_LAZY_ATTRIBUTES = {
+    'Agent': ('omnisafe.algorithms.algo_wrapper', 'AlgoWrapper'),
+    'Evaluator': ('omnisafe.evaluator', 'Evaluator'),
+}
+
+
+def __getattr__(name):
+    """Import ``Agent`` and ``Evaluator`` on first access."""
+    if name in _LAZY_ATTRIBUTES:
+        # pylint: disable-next=import-outside-toplevel
+        import importlib
+
+        module, attribute = _LAZY_ATTRIBUTES[name]
+        value = getattr(importlib.import_module(module), attribute)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -12,52 +12,67 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ==============================================================================
-"""Safe Reinforcement Learning algorithms."""
+"""Safe Reinforcement Learning algorithms.
+
+The algorithms are imported on first use, e.g. by ``registry.get`` or by
+``from omnisafe.algorithms import PPOLag``, so that importing omnisafe stays cheap.
+"""
 
 import itertools
 from types import MappingProxyType
 
-from omnisafe.algorithms import model_based, off_policy, on_policy
-
-# Model-based Safe
-from omnisafe.algorithms.model_based import CAP, MBPPOLag, SafeLOOP
-
-# Off-Policy Safe
-from omnisafe.algorithms.off_policy import DDPG, SAC, SDDPG, TD3, DDPGLag, SACLag, TD3Lag
+from omnisafe.algorithms import registry
 
-# On-Policy Safe
-from omnisafe.algorithms.on_policy import (
-    CPO,
-    CUP,
-    FOCOPS,
-    PCPO,
-    PDO,
-    PPO,
-    TRPO,
-    CPPOPid,
-    NaturalPG,
-    NPGLag,
-    PolicyGradient,
-    PPOEarlyTerminated,
-    PPOLag,
-    PPOLagEarlyTerminated,
-    PPOLagSaute,
-    PPOLagSimmerPid,
-    PPOLagSimmerQ,
-    PPOSaute,
-    PPOSimmerPid,
-    PPOSimmerQ,
-    TRPOLag,
-    TRPOPid,
-)
 
-
-ALGORITHMS = {
-    'off-policy': tuple(off_policy.__all__),
-    'on-policy': tuple(on_policy.__all__),
-    'model-based': tuple(model_based.__all__),
+# The module registering each algorithm, by algorithm type
+ALGORITHM_MODULES = {
+    # Off-Policy Safe
+    'off-policy': {
+        'DDPG': 'omnisafe.algorithms.off_policy.ddpg',
+        'DDPGLag': 'omnisafe.algorithms.off_policy.ddpg_lag',
+        'SAC': 'omnisafe.algorithms.off_policy.sac',
+        'SACLag': 'omnisafe.algorithms.off_policy.sac_lag',
+        'SDDPG': 'omnisafe.algorithms.off_policy.sddpg',
+        'TD3': 'omnisafe.algorithms.off_policy.td3',
+        'TD3Lag': 'omnisafe.algorithms.off_policy.td3_lag',
+    },
+    # On-Policy Safe
+    'on-policy': {
+        'NaturalPG': 'omnisafe.algorithms.on_policy.base.natural_pg',
+        'PolicyGradient': 'omnisafe.algorithms.on_policy.base.policy_gradient',
+        'PPO': 'omnisafe.algorithms.on_policy.base.ppo',
+        'TRPO': 'omnisafe.algorithms.on_policy.base.trpo',
+        'PPOEarlyTerminated': 'omnisafe.algorithms.on_policy.early_terminated.ppo_early_terminated',
+        'PPOLagEarlyTerminated': (
+            'omnisafe.algorithms.on_policy.early_terminated.ppo_lag_early_terminated'
+        ),
+        'CUP': 'omnisafe.algorithms.on_policy.first_order.cup',
+        'FOCOPS': 'omnisafe.algorithms.on_policy.first_order.focops',
+        'NPGLag': 'omnisafe.algorithms.on_policy.naive_lagrange.npg_lag',
+        'PDO': 'omnisafe.algorithms.on_policy.naive_lagrange.pdo',
+        'PPOLag': 'omnisafe.algorithms.on_policy.naive_lagrange.ppo_lag',
+        'TRPOLag': 'omnisafe.algorithms.on_policy.naive_lagrange.trpo_lag',
+        'CPPOPid': 'omnisafe.algorithms.on_policy.pid_lagrange.cppo_pid',
+        'TRPOPid': 'omnisafe.algorithms.on_policy.pid_lagrange.trpo_pid',
+        'PPOLagSaute': 'omnisafe.algorithms.on_policy.saute.ppo_lag_saute',
+        'PPOSaute': 'omnisafe.algorithms.on_policy.saute.ppo_saute',
+        'CPO': 'omnisafe.algorithms.on_policy.second_order.cpo',
+        'PCPO': 'omnisafe.algorithms.on_policy.second_order.pcpo',
+        'PPOLagSimmerPid': 'omnisafe.algorithms.on_policy.simmer.ppo_lag_simmer_pid',
+        'PPOLagSimmerQ': 'omnisafe.algorithms.on_policy.simmer.ppo_lag_simmer_q',
+        'PPOSimmerPid': 'omnisafe.algorithms.on_policy.simmer.ppo_simmer_pid',
+        'PPOSimmerQ': 'omnisafe.algorithms.on_policy.simmer.ppo_simmer_q',
+    },
+    # Model-based Safe
+    'model-based': {
+        'CAP': 'omnisafe.algorithms.model_based.cap',
+        'MBPPOLag': 'omnisafe.algorithms.model_based.mbppo_lag',
+        'SafeLOOP': 'omnisafe.algorithms.model_based.safeloop',
+    },
 }
 
+ALGORITHMS = {algo_type: tuple(modules) for algo_type, modules in ALGORITHM_MODULES.items()}
+
 ALGORITHM2TYPE = {
     algo: algo_type for algo_type, algorithms in ALGORITHMS.items() for algo in algorithms
 }
@@ -66,7 +81,19 @@ __all__ = ALGORITHMS['all'] = tuple(itertools.chain.from_iterable(ALGORITHMS.val
 
 assert len(ALGORITHM2TYPE) == len(__all__), 'Duplicate algorithm names found.'
 
+for _algo_type, _modules in ALGORITHM_MODULES.items():
+    for _algo, _module in _modules.items():
+        registry.register_lazy(_algo, _module)
+
 ALGORITHMS = MappingProxyType(ALGORITHMS)  # make this immutable
 ALGORITHM2TYPE = MappingProxyType(ALGORITHM2TYPE)  # make this immutable
 
-del itertools, MappingProxyType
+
+def __getattr__(name):
+    """Import the algorithm ``name`` on first access."""
+    if name in ALGORITHM2TYPE:
+        return registry.get(name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+del itertools, MappingProxyType, _algo_type, _modules, _algo, _module
@@ -17,8 +17,6 @@
 import os
 import sys
 
-import psutil
-
 from omnisafe.algorithms import ALGORITHM2TYPE, registry
 from omnisafe.utils import distributed_utils
 from omnisafe.utils.config_utils import check_all_configs, recursive_update
@@ -28,9 +26,26 @@ from omnisafe.utils.tools import get_default_kwargs_yaml
 class AlgoWrapper:
     """Algo Wrapper for algo"""
 
-    def __init__(self, algo, env_id, parallel=1, custom_cfgs=None):
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+        self,
+        algo,
+        env_id,
+        parallel=1,
+        custom_cfgs=None,
+        nnodes=1,
+        node_rank=0,
+        rdzv_endpoint=None,
+        max_restarts=0,
+        min_nodes=None,
+    ):
         self.algo = algo
         self.parallel = parallel
+        self.nnodes = nnodes
+        self.node_rank = node_rank
+        self.rdzv_endpoint = rdzv_endpoint
+        self.max_restarts = max_restarts
+        self.min_nodes = min_nodes
         self.env_id = env_id
         # algo_type will set in _init_checks()
         self.algo_type = None
@@ -43,37 +58,61 @@ class AlgoWrapper:
         assert isinstance(self.algo, str), 'algo must be a string!'
         assert isinstance(self.parallel, int), 'parallel must be an integer!'
         assert self.parallel > 0, 'parallel must be greater than 0!'
+        assert isinstance(self.nnodes, int), 'nnodes must be an integer!'
+        assert 0 <= self.node_rank < self.nnodes, 'node_rank must be in [0, nnodes)!'
+        if self.nnodes > 1:
+            assert self.rdzv_endpoint is not None, 'rdzv_endpoint is required for nnodes > 1!'
         assert (
             isinstance(self.custom_cfgs, dict) or self.custom_cfgs is None
         ), 'custom_cfgs must be a dict!'
         self.algo_type = ALGORITHM2TYPE.get(self.algo, None)
         if self.algo_type is None or self.algo_type == '':
             raise ValueError(f'{self.algo} is not supported!')
-        if self.algo_type in ['off-policy', 'model-based']:
-            assert self.parallel == 1, 'off-policy or model-based only support parallel==1!'
+        if self.algo_type == 'model-based':
+            assert self.parallel == 1, 'model-based only support parallel==1!'
+        if self.algo_type != 'on-policy':
+            assert self.nnodes == 1, 'Only on-policy algorithms support nnodes > 1!'
+            assert self.max_restarts == 0, 'Only on-policy algorithms support max_restarts > 0!'
 
-    def learn(self):
-        """Agent Learning"""
-        # Use number of physical cores as default.
-        # If also hardware threading CPUs should be used
-        # enable this by the use_number_of_threads=True
-        physical_cores = psutil.cpu_count(logical=False)
-        use_number_of_threads = bool(self.parallel > physical_cores)
+    def learn(self, resume_from=None):
+        """Agent Learning
 
-        if distributed_utils.mpi_fork(self.parallel, use_number_of_threads=use_number_of_threads):
+        Args:
+            resume_from (str): checkpoint file, or log directory of a run, whose latest
+                checkpoint the training continues from.
+        """
+        custom_cfgs = self.custom_cfgs
+        if self.max_restarts > 0:
+            # Restarted workers continue from the latest checkpoint, by default of every epoch
+            custom_cfgs = {
+                'checkpoint_freq': 1,
+                **(custom_cfgs or {}),
+                'auto_resume': True,
+            }
+        if self.algo_type == 'off-policy' and self.parallel > 1:
+            # Off-policy algorithms keep a single learner fed by parallel collector processes
+            custom_cfgs = {**(custom_cfgs or {}), 'num_collectors': self.parallel}
+        elif distributed_utils.mpi_fork(
+            self.parallel,
+            nnodes=self.nnodes,
+            node_rank=self.node_rank,
+            rdzv_endpoint=self.rdzv_endpoint,
+            max_restarts=self.max_restarts,
+            min_nodes=self.min_nodes,
+        ):
             # Re-launches the current script with workers linked by MPI
             sys.exit()
 
         default_cfgs = get_default_kwargs_yaml(self.algo, self.env_id, self.algo_type)
         exp_name = os.path.join(self.env_id, self.algo)
         default_cfgs.update(exp_name=exp_name, env_id=self.env_id)
-        cfgs = recursive_update(default_cfgs, self.custom_cfgs)
+        cfgs = recursive_update(default_cfgs, custom_cfgs)
         check_all_configs(cfgs, self.algo_type)
         agent = registry.get(self.algo)(
             env_id=self.env_id,
             cfgs=cfgs,
         )
-        agent.learn()
+        agent.learn(resume_from=resume_from)
 
         # self.evaluator = Evaluator(self.env, actor_critic.actor, actor_critic.obs_oms)
 
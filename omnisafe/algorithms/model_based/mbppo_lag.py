@@ -24,6 +24,11 @@ from omnisafe.common.lagrange import Lagrange
 from omnisafe.models.constraint_actor_critic import ConstraintActorCritic
 from omnisafe.utils import core
 from omnisafe.utils.config_utils import namedtuple2dict
+from omnisafe.utils.tools import (
+    flatten_parameters,
+    get_flat_params_from,
+    set_param_values_to_model,
+)
 from omnisafe.wrappers import wrapper_registry
 
 
@@ -52,6 +57,13 @@ class MBPPOLag(PolicyGradientModelBased, Lagrange):
         self.env_auxiliary = wrapper_registry.get(self.wrapper_type)(self.algo, self.env_id)
         # Initialize Actor-Critic
         self.actor_critic = self.set_algorithm_specific_actor_critic()
+        if self.cfgs.use_flat_params:
+            for model in (
+                self.actor_critic.actor,
+                self.actor_critic.reward_critic,
+                self.actor_critic.cost_critic,
+            ):
+                flatten_parameters(model)
         self.buf = Buffer(
             actor_critic=self.actor_critic,
             obs_dim=self.env.ac_state_size,
@@ -70,6 +82,19 @@ class MBPPOLag(PolicyGradientModelBased, Lagrange):
         self.logger.setup_torch_saver(what_to_save=what_to_save)
         self.logger.torch_save()
 
+    def state_dict(self, progress: dict) -> dict:
+        """The training state of the base class and the optimizers of both critics."""
+        state = super().state_dict(progress)
+        state['reward_critic_optimizer'] = self.reward_critic_optimizer.state_dict()
+        state['cost_critic_optimizer'] = self.cost_critic_optimizer.state_dict()
+        return state
+
+    def load_state_dict(self, state: dict) -> dict:
+        """Restore a training state of :meth:`state_dict`."""
+        self.reward_critic_optimizer.load_state_dict(state['reward_critic_optimizer'])
+        self.cost_critic_optimizer.load_state_dict(state['cost_critic_optimizer'])
+        return super().load_state_dict(state)
+
     def algorithm_specific_logs(self, time_step):
         """log algo parameter"""
         super().algorithm_specific_logs(time_step)
@@ -249,24 +274,12 @@ class MBPPOLag(PolicyGradientModelBased, Lagrange):
 
     def get_param_values(self, model):
         """get the dynamics parameters"""
-        trainable_params = list(model.parameters())
-        params = np.concatenate(
-            [p.contiguous().view(-1).data.cpu().numpy() for p in trainable_params]
-        )
-        return params.copy()
+        return get_flat_params_from(model).clone()
 
     def set_param_values(self, new_params, model, set_new=True):
         """set the dynamics parameters"""
-        trainable_params = list(model.parameters())
-        param_shapes = [p.data.cpu().numpy().shape for p in trainable_params]
-        param_sizes = [p.data.cpu().numpy().size for p in trainable_params]
         if set_new:
-            current_idx = 0
-            for idx, param in enumerate(trainable_params):
-                vals = new_params[current_idx : current_idx + param_sizes[idx]]
-                vals = vals.reshape(param_shapes[idx])
-                param.data = torch.from_numpy(vals).float().to(self.device)
-                current_idx += param_sizes[idx]
+            set_param_values_to_model(model, new_params)
 
     def roll_out_in_imaginary(self, megaiter):  # pylint: disable=too-many-locals
         """collect data and store to experience buffer."""
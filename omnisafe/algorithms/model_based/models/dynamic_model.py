@@ -56,6 +56,16 @@ class StandardScaler:
         self.mean_t = torch.FloatTensor(self.mean).to(self.device)
         self.std_t = torch.FloatTensor(self.std).to(self.device)
 
+    def state_dict(self) -> dict:
+        """The fitted mean and standard deviation."""
+        return {'mean': self.mean, 'std': self.std}
+
+    def load_state_dict(self, state: dict) -> None:
+        """Restore the mean and standard deviation of :meth:`state_dict`."""
+        self.mean, self.std = state['mean'], state['std']
+        self.mean_t = torch.as_tensor(self.mean, dtype=torch.float32).to(self.device)
+        self.std_t = torch.as_tensor(self.std, dtype=torch.float32).to(self.device)
+
     def transform(self, data):
         """Transforms the input matrix data using the parameters of this scaler.
 
@@ -280,6 +290,22 @@ class EnsembleDynamicsModel:
         self._state = {}
         self._snapshots = {i: (None, 1e10) for i in range(self.network_size)}
 
+    def state_dict(self) -> dict:
+        """The ensemble, its optimizer, the input scaler and the elite models."""
+        return {
+            'ensemble_model': self.ensemble_model.state_dict(),
+            'optimizer': self.ensemble_model.optimizer.state_dict(),
+            'scaler': self.scaler.state_dict(),
+            'elite_model_idxes': list(self.elite_model_idxes),
+        }
+
+    def load_state_dict(self, state: dict) -> None:
+        """Restore a state of :meth:`state_dict`."""
+        self.ensemble_model.load_state_dict(state['ensemble_model'])
+        self.ensemble_model.optimizer.load_state_dict(state['optimizer'])
+        self.scaler.load_state_dict(state['scaler'])
+        self.elite_model_idxes = list(state['elite_model_idxes'])
+
     # pylint: disable-next=too-many-locals, too-many-arguments
     def train(self, inputs, labels, batch_size=256, holdout_ratio=0.0, max_epochs_since_update=5):
         """train dynamics, holdout_ratio is the data ratio hold out for validation"""
@@ -23,11 +23,13 @@ import torch
 from omnisafe.algorithms import registry
 from omnisafe.algorithms.model_based.models import EnsembleDynamicsModel, VirtualEnv
 from omnisafe.common.base_buffer import BaseBuffer as Off_ReplayBuffer
+from omnisafe.common.lagrange import Lagrange
 from omnisafe.common.logger import Logger
 from omnisafe.models.constraint_actor_critic import ConstraintActorCritic
 from omnisafe.utils import core
 from omnisafe.utils.config_utils import namedtuple2dict
 from omnisafe.utils.distributed_utils import proc_id
+from omnisafe.utils.tools import get_rng_state, set_rng_state
 from omnisafe.wrappers import wrapper_registry
 
 
@@ -53,7 +55,14 @@ class PolicyGradientModelBased:  # pylint: disable=too-many-instance-attributes
         self.cost_gamma = self.cfgs.cost_gamma
         # Set up logger and save configuration to disk
         # Get local parameters before logger instance to avoid unnecessary print
-        self.logger = Logger(exp_name=cfgs.exp_name, data_dir=cfgs.data_dir, seed=cfgs.seed)
+        self.logger = Logger(
+            exp_name=cfgs.exp_name,
+            data_dir=cfgs.data_dir,
+            seed=cfgs.seed,
+            async_save=cfgs.async_save,
+            keep_checkpoints=cfgs.keep_checkpoints,
+            keep_best_checkpoints=cfgs.keep_best_checkpoints,
+        )
         self.logger.save_config(namedtuple2dict(cfgs))
 
         # Set seed
@@ -100,13 +109,74 @@ class PolicyGradientModelBased:  # pylint: disable=too-many-instance-attributes
 
         self.logger.log('Start with training.')
 
-    def learn(self):  # pylint: disable=too-many-locals
-        """training the policy."""
+    def state_dict(self, progress: dict) -> dict:
+        """The training state at ``progress``, the time step and the time steps of the
+        last updates and log, to resume from with :meth:`load_state_dict`.
+
+        The replay buffer is only included with ``checkpoint_replay_buffer``.
+        """
+        state = {
+            'epoch': self.logger.epoch,
+            'progress': dict(progress),
+            'dynamics': self.dynamics.state_dict(),
+        }
+        if self.use_actor:
+            state['actor_critic'] = self.actor_critic.state_dict()
+            state['actor_optimizer'] = self.actor_optimizer.state_dict()
+        if isinstance(self, Lagrange):
+            state['lagrange'] = self.lagrange_state_dict()
+        if self.cfgs.checkpoint_replay_buffer:
+            state['replay_buffer'] = self.off_replay_buffer.state_dict()
+        state['rng'] = get_rng_state()
+        return state
+
+    def load_state_dict(self, state: dict) -> dict:
+        """Restore a training state of :meth:`state_dict` and return the progress to continue from.
+
+        The real environment starts a new episode.
+        """
+        self.dynamics.load_state_dict(state['dynamics'])
+        if self.use_actor:
+            self.actor_critic.load_state_dict(state['actor_critic'])
+            self.actor_optimizer.load_state_dict(state['actor_optimizer'])
+        if isinstance(self, Lagrange):
+            self.load_lagrange_state_dict(state['lagrange'])
+        if 'replay_buffer' in state:
+            self.off_replay_buffer.load_state_dict(state['replay_buffer'])
+        set_rng_state(state['rng'])
+        self.logger.epoch = state['epoch']
+        return state['progress']
+
+    def resume(self, resume_from=None) -> dict:
+        """Restore the training state of ``resume_from``, a checkpoint file or the log
+        directory of a run, and return the progress to start from."""
+        progress = {
+            'time_step': 0,
+            'last_policy_update': 0,
+            'last_dynamics_update': 0,
+            'last_log': 0,
+        }
+        if resume_from is None:
+            return progress
+        state = self.logger.load_checkpoint(resume_from)
+        assert state is not None, f'No checkpoint found in {resume_from}.'
+        return {**progress, **self.load_state_dict(state)}
+
+    # pylint: disable-next=too-many-locals,too-many-statements
+    def learn(self, resume_from=None):
+        """training the policy.
+
+        Args:
+            resume_from (str): checkpoint file, or log directory of a run, to continue from.
+        """
         self.start_time = time.time()
         ep_len, ep_ret, ep_cost = 0, 0, 0
+        progress = self.resume(resume_from)
         state = self.env.reset()
-        time_step = 0
-        last_policy_update, last_dynamics_update, last_log = 0, 0, 0
+        time_step = progress['time_step']
+        last_policy_update = progress['last_policy_update']
+        last_dynamics_update = progress['last_dynamics_update']
+        last_log = progress['last_log']
         while time_step < self.cfgs.max_real_time_steps:
             # select action
             action, action_info = self.select_action(time_step, state, self.env)
@@ -169,6 +239,15 @@ class PolicyGradientModelBased:  # pylint: disable=too-many-instance-attributes
                 self.log(time_step)
                 self.logger.torch_save(itr=time_step)
                 last_log = time_step
+                # Save the training state to resume from, numbered by the logs so far
+                if self.cfgs.checkpoint_freq and self.logger.epoch % self.cfgs.checkpoint_freq == 0:
+                    progress = {
+                        'time_step': time_step,
+                        'last_policy_update': last_policy_update,
+                        'last_dynamics_update': last_dynamics_update,
+                        'last_log': last_log,
+                    }
+                    self.logger.save_checkpoint(self.state_dict(progress), self.logger.epoch)
         # Close opened files to avoid number of open files overflow
         self.logger.close()
 
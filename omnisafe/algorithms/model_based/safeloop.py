@@ -136,6 +136,22 @@ class SafeLOOP(
         self.actor_optimizer.step()
         self.logger.store(**{'Loss/Pi': loss_pi.item()})
 
+    def state_dict(self, progress: dict) -> dict:
+        """The training state of the base class, the target networks, the critic optimizer
+        and the discounted entropy coefficient."""
+        state = super().state_dict(progress)
+        state['ac_targ'] = self.ac_targ.state_dict()
+        state['critic_optimizer'] = self.critic_optimizer.state_dict()
+        state['alpha'] = self.alpha
+        return state
+
+    def load_state_dict(self, state: dict) -> dict:
+        """Restore a training state of :meth:`state_dict`."""
+        self.ac_targ.load_state_dict(state['ac_targ'])
+        self.critic_optimizer.load_state_dict(state['critic_optimizer'])
+        self.alpha = state['alpha']
+        return super().load_state_dict(state)
+
     def alpha_discount(self):
         """Alpha discount."""
         self.alpha *= self.alpha_gamma
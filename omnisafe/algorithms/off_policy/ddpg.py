@@ -22,12 +22,14 @@ import torch
 
 from omnisafe.algorithms import registry
 from omnisafe.common.base_buffer import BaseBuffer
+from omnisafe.common.lagrange import Lagrange
 from omnisafe.common.logger import Logger
 from omnisafe.models.constraint_actor_q_critic import ConstraintActorQCritic
 from omnisafe.utils import core, distributed_utils
 from omnisafe.utils.config_utils import namedtuple2dict
-from omnisafe.utils.tools import get_flat_params_from
+from omnisafe.utils.tools import get_flat_params_from, get_rng_state, set_rng_state
 from omnisafe.wrappers import wrapper_registry
+from omnisafe.wrappers.collector import CollectorPool
 
 
 @registry.register
@@ -56,6 +58,8 @@ class DDPG:  # pylint: disable=too-many-instance-attributes
             env_id,
             use_cost=cfgs.use_cost,
             max_ep_len=cfgs.max_ep_len,
+            num_envs=cfgs.num_envs,
+            use_subprocess_env=cfgs.use_subprocess_env,
         )
         self.env_id = env_id
         self.algo = self.__class__.__name__
@@ -69,12 +73,24 @@ class DDPG:  # pylint: disable=too-many-instance-attributes
         # The steps in each process should be integer
         assert cfgs.steps_per_epoch % distributed_utils.num_procs() == 0
         # Ensure local each local process can experience at least one complete episode
-        assert self.env.max_ep_len <= self.local_steps_per_epoch, (
-            f'Reduce number of cores ({distributed_utils.num_procs()}) or increase '
-            f'batch size {self.steps_per_epoch}.'
+        # in each of its environments, which may be spread over collector processes
+        num_envs = cfgs.num_envs * max(cfgs.num_collectors, 1)
+        assert self.env.max_ep_len * num_envs <= self.local_steps_per_epoch, (
+            f'Reduce number of cores ({distributed_utils.num_procs()}), environments '
+            f'({num_envs}) or increase batch size {self.steps_per_epoch}.'
         )
         # Ensure valid number for iteration
         assert cfgs.update_every > 0
+        assert cfgs.update_every % cfgs.num_envs == 0, (
+            f'update_every ({cfgs.update_every}) must be divisible by '
+            f'num_envs ({cfgs.num_envs}).'
+        )
+        # Each collector process contributes the same share of the steps between updates
+        assert cfgs.update_every % (max(cfgs.num_collectors, 1) * cfgs.num_envs) == 0, (
+            f'update_every ({cfgs.update_every}) must be divisible by '
+            f'num_collectors * num_envs ({cfgs.num_collectors} * {cfgs.num_envs}).'
+        )
+        self.collectors = None
         self.max_ep_len = cfgs.max_ep_len
         if hasattr(self.env, '_max_episode_steps'):
             self.max_ep_len = self.env.env._max_episode_steps
@@ -88,7 +104,14 @@ class DDPG:  # pylint: disable=too-many-instance-attributes
         )
 
         # Set up logger and save configuration to disk
-        self.logger = Logger(exp_name=cfgs.exp_name, data_dir=cfgs.data_dir, seed=cfgs.seed)
+        self.logger = Logger(
+            exp_name=cfgs.exp_name,
+            data_dir=cfgs.data_dir,
+            seed=cfgs.seed,
+            async_save=cfgs.async_save,
+            keep_checkpoints=cfgs.keep_checkpoints,
+            keep_best_checkpoints=cfgs.keep_best_checkpoints,
+        )
         self.logger.save_config(namedtuple2dict(cfgs))
         # Set seed
         seed = cfgs.seed + 10000 * distributed_utils.proc_id()
@@ -111,6 +134,7 @@ class DDPG:  # pylint: disable=too-many-instance-attributes
             act_dim=self.env.action_space.shape,
             size=cfgs.replay_buffer_cfgs.size,
             batch_size=cfgs.replay_buffer_cfgs.batch_size,
+            device_storage=cfgs.replay_buffer_cfgs.device_storage,
         )
         # Set up optimizer for policy and q-function
         self.actor_optimizer = core.set_optimizer(
@@ -127,7 +151,6 @@ class DDPG:  # pylint: disable=too-many-instance-attributes
         self.scheduler = self.set_learning_rate_scheduler()
         # Set up target network for off_policy training
         self._ac_training_setup()
-        torch.set_num_threads(10)
         # Set up model saving
         what_to_save = {
             'pi': self.actor_critic.actor,
@@ -154,12 +177,76 @@ class DDPG:  # pylint: disable=too-many-instance-attributes
             )
         return scheduler
 
+    def state_dict(self, epoch: int) -> dict:
+        """The training state after ``epoch``, to resume from with :meth:`load_state_dict`.
+
+        The replay buffer is only included with ``checkpoint_replay_buffer``.
+        """
+        state = {
+            'epoch': epoch,
+            'actor_critic': self.actor_critic.state_dict(),
+            'ac_targ': self.ac_targ.state_dict(),
+            'actor_optimizer': self.actor_optimizer.state_dict(),
+            'critic_optimizer': self.critic_optimizer.state_dict(),
+        }
+        if self.cfgs.use_cost:
+            state['cost_critic_optimizer'] = self.cost_critic_optimizer.state_dict()
+        if self.scheduler is not None:
+            state['scheduler'] = self.scheduler.state_dict()
+        if isinstance(self, Lagrange):
+            state['lagrange'] = self.lagrange_state_dict()
+        if self.cfgs.checkpoint_replay_buffer:
+            state['replay_buffer'] = self.buf.state_dict()
+        # every process draws its own random numbers
+        state['rng'] = distributed_utils.all_gather_object(get_rng_state())
+        return state
+
+    def load_state_dict(self, state: dict) -> int:
+        """Restore a training state of :meth:`state_dict` and return the step to continue with.
+
+        Without a saved replay buffer, the updates wait until it is refilled
+        for ``update_after`` steps, as at the start of the training.
+        """
+        self.actor_critic.load_state_dict(state['actor_critic'])
+        self.ac_targ.load_state_dict(state['ac_targ'])
+        self.actor_optimizer.load_state_dict(state['actor_optimizer'])
+        self.critic_optimizer.load_state_dict(state['critic_optimizer'])
+        if self.cfgs.use_cost:
+            self.cost_critic_optimizer.load_state_dict(state['cost_critic_optimizer'])
+        if self.scheduler is not None:
+            self.scheduler.load_state_dict(state['scheduler'])
+        if isinstance(self, Lagrange):
+            self.load_lagrange_state_dict(state['lagrange'])
+        # the state is saved at the end of the epoch, after the update of its last steps
+        steps = state['epoch'] * self.steps_per_epoch + self.update_every
+        if 'replay_buffer' in state:
+            self.buf.load_state_dict(state['replay_buffer'])
+        else:
+            self.update_after += steps
+        if distributed_utils.proc_id() < len(state['rng']):
+            set_rng_state(state['rng'][distributed_utils.proc_id()])
+        self.logger.epoch = state['epoch']
+        return steps
+
+    def resume(self, resume_from=None) -> int:
+        """Restore the training state of ``resume_from``, a checkpoint file or the log
+        directory of a run, and return the step to start with."""
+        if resume_from is None:
+            return 0
+        state = self.logger.load_checkpoint(resume_from)
+        assert state is not None, f'No checkpoint found in {resume_from}.'
+        return self.load_state_dict(state)
+
     def _init_mpi(self):
         """Initialize MPI specifics."""
 
+        # Avoid slowdowns from PyTorch + MPI combo, pinned collectors are placed
+        # once their processes are started in learn
+        if not (self.cfgs.pin_cpus and self.cfgs.num_collectors > 0):
+            distributed_utils.setup_torch_for_mpi(
+                pin_cpus=self.cfgs.pin_cpus, worker_pids=self.env.env_pool.pids
+            )
         if distributed_utils.num_procs() > 1:
-            # Avoid slowdowns from PyTorch + MPI combo
-            distributed_utils.setup_torch_for_mpi()
             start = time.time()
             self.logger.log('INFO: Sync actor critic parameters')
             # Sync params across cores: only once necessary, grads are averaged!
@@ -263,36 +350,68 @@ class DDPG:  # pylint: disable=too-many-instance-attributes
 
         return loss_qc, qc_info
 
-    def learn(self):
+    def learn(self, resume_from=None):
         """
         This is main function for algorithm update, divided into the following steps:
             (1). self.rollout: collect interactive data from environment
             (2). self.update: perform actor/critic updates
             (3). log epoch/update information for visualization and terminal log print.
 
+        Args:
+            resume_from (str): checkpoint file, or log directory of a run, to continue from.
+
         Returns:
             model and environment.
         """
-
-        for steps in range(0, self.local_steps_per_epoch * self.epochs, self.update_every):
+        start_steps = self.resume(resume_from)
+        if self.cfgs.num_collectors > 0:
+            # Actor-learner mode: collector processes step the environments with the
+            # latest published policy, while this process only updates.
+            self.collectors = CollectorPool(
+                self.actor_critic,
+                self.wrapper_type,
+                self.env_id,
+                num_collectors=self.cfgs.num_collectors,
+                steps_per_chunk=self.update_every // self.cfgs.num_collectors,
+                seed=self.cfgs.seed,
+                use_cost=self.cfgs.use_cost,
+                max_ep_len=self.cfgs.max_ep_len,
+                num_envs=self.cfgs.num_envs,
+            )
+            if self.cfgs.pin_cpus:
+                # pin this process, its environments and the collectors at once
+                distributed_utils.setup_torch_for_mpi(
+                    pin_cpus=True, worker_pids=self.env.env_pool.pids + self.collectors.pids
+                )
+
+        for steps in range(
+            start_steps, self.local_steps_per_epoch * self.epochs, self.update_every
+        ):
             # Until start_steps have elapsed, randomly sample actions
             # from a uniform distribution for better exploration. Afterwards,
             # use the learned policy (with some noise, via act_noise).
             use_rand_action = steps < self.start_steps
-            self.env.roll_out(
-                self.actor_critic,
-                self.buf,
-                self.logger,
-                deterministic=False,
-                use_rand_action=use_rand_action,
-                ep_steps=self.update_every,
-            )
+            if self.collectors is None:
+                self.env.roll_out(
+                    self.actor_critic,
+                    self.buf,
+                    self.logger,
+                    deterministic=False,
+                    use_rand_action=use_rand_action,
+                    ep_steps=self.update_every,
+                )
+            else:
+                self.collectors.collect(
+                    self.update_every, self.buf, self.logger, use_rand_action=use_rand_action
+                )
 
             # Update handling
             if steps >= self.update_after:
                 for _ in range(self.update_every):
                     batch = self.buf.sample_batch()
                     self.update(data=batch)
+                if self.collectors is not None:
+                    self.collectors.publish(self.actor_critic)
 
             # End of epoch handling
             if steps % self.steps_per_epoch == 0 and steps:
@@ -311,6 +430,11 @@ class DDPG:  # pylint: disable=too-many-instance-attributes
                 self.test_agent()
                 # Log info about epoch
                 self.log(epoch, steps)
+                # Save the training state to resume from, scored by the row just logged
+                if self.cfgs.checkpoint_freq and (epoch + 1) % self.cfgs.checkpoint_freq == 0:
+                    self.logger.save_checkpoint(self.state_dict(epoch), epoch)
+        if self.collectors is not None:
+            self.collectors.close()
         return self.actor_critic
 
     def update(self, data):
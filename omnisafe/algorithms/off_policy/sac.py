@@ -120,6 +120,17 @@ class SAC(DDPG):  # pylint: disable=too-many-instance-attributes
         self.polyak_update_target()
         self.alpha_discount()
 
+    def state_dict(self, epoch: int) -> dict:
+        """The training state of DDPG and the discounted entropy coefficient."""
+        state = super().state_dict(epoch)
+        state['alpha'] = self.alpha
+        return state
+
+    def load_state_dict(self, state: dict) -> int:
+        """Restore a training state of :meth:`state_dict`."""
+        self.alpha = state['alpha']
+        return super().load_state_dict(state)
+
     def alpha_discount(self):
         """Alpha discount."""
         self.alpha *= self.alpha_gamma
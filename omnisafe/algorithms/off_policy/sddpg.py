@@ -19,8 +19,10 @@ import torch
 from omnisafe.algorithms import registry
 from omnisafe.algorithms.off_policy.ddpg import DDPG
 from omnisafe.utils import distributed_utils
+from omnisafe.utils.fisher import FisherSubsampler
 from omnisafe.utils.tools import (
-    conjugate_gradients,
+    block_conjugate_gradients,
+    flatten_parameters,
     get_flat_gradients_from,
     get_flat_params_from,
     set_param_values_to_model,
@@ -55,6 +57,11 @@ class SDDPG(DDPG):  # pylint: disable=too-many-instance-attributes,invalid-name
         self.cg_damping = cfgs.cg_damping
         self.cg_iters = cfgs.cg_iters
         self.fvp_obs = None
+        self.fvp_sampler = FisherSubsampler(
+            mode=cfgs.fvp_subsampling, size=cfgs.fvp_sample_size, tolerance=cfgs.fvp_tolerance
+        )
+        if cfgs.use_flat_params:
+            flatten_parameters(self.actor_critic.actor.net)
         self.target_kl = cfgs.target_kl
         self.gamma = cfgs.gamma
         self.d_init = cfgs.d_init
@@ -66,7 +73,7 @@ class SDDPG(DDPG):  # pylint: disable=too-many-instance-attributes,invalid-name
             data (dict): data dictionary.
         """
         # First run one gradient descent step for Q.
-        self.fvp_obs = data['obs'][::4]
+        self.fvp_obs = self.fvp_sampler.sample(data['obs'])
         self.update_value_net(data)
         if self.cfgs.use_cost:
             self.update_cost_net(data)
@@ -98,7 +105,7 @@ class SDDPG(DDPG):  # pylint: disable=too-many-instance-attributes,invalid-name
         For details see John Schulman's PhD thesis (pp. 40) http://joschu.net/docs/thesis.pdf
 
         Args:
-            params (torch.Tensor): parameters.
+            params (torch.Tensor): parameters, or a ``[k, n]`` batch of them.
 
         Returns:
             flat_grad_grad_kl (torch.Tensor): flat gradient of gradient of KL.
@@ -112,15 +119,32 @@ class SDDPG(DDPG):  # pylint: disable=too-many-instance-attributes,invalid-name
         grads = torch.autograd.grad(kl, self.actor_critic.actor.net.parameters(), create_graph=True)
         flat_grad_kl = torch.cat([grad.view(-1) for grad in grads])
 
-        kl_p = (flat_grad_kl * params).sum()
-        grads = torch.autograd.grad(
-            kl_p, self.actor_critic.actor.net.parameters(), retain_graph=False
-        )
-        # contiguous indicating, if the memory is contiguously stored or not
-        flat_grad_grad_kl = torch.cat([grad.contiguous().view(-1) for grad in grads])
+        vectors = params.view(-1, params.shape[-1])
+        products = []
+        # a batch of vectors shares the forward and the first backward pass
+        for row, vector in enumerate(vectors):
+            kl_p = (flat_grad_kl * vector).sum()
+            grads = torch.autograd.grad(
+                kl_p,
+                self.actor_critic.actor.net.parameters(),
+                retain_graph=row < len(vectors) - 1,
+            )
+            # contiguous indicating, if the memory is contiguously stored or not
+            products.append(torch.cat([grad.contiguous().view(-1) for grad in grads]))
+        flat_grad_grad_kl = torch.stack(products).view_as(params)
         distributed_utils.mpi_avg_torch_tensor(flat_grad_grad_kl)
         return flat_grad_grad_kl + params * self.cg_damping
 
+    def state_dict(self, epoch: int) -> dict:
+        state = super().state_dict(epoch)
+        state['fvp_sampler'] = self.fvp_sampler.state_dict()
+        return state
+
+    def load_state_dict(self, state: dict) -> int:
+        if 'fvp_sampler' in state:
+            self.fvp_sampler.load_state_dict(state['fvp_sampler'])
+        return super().load_state_dict(state)
+
     def compute_loss_cost_performance(self, data):
         """Compute loss of cost performance.
 
@@ -145,36 +169,50 @@ class SDDPG(DDPG):  # pylint: disable=too-many-instance-attributes,invalid-name
         """
         # Train policy with one steps of gradient descent
         theta_old = get_flat_params_from(self.actor_critic.actor.net)
+        adaptive = self.fvp_sampler.mode == 'adaptive'
+        if adaptive:
+            with torch.no_grad():
+                p_dist = self.actor_critic.actor.get_distribution(data['obs'])
 
         self.actor_optimizer.zero_grad()
         loss_pi, _ = self.compute_loss_pi(data)
         loss_pi.backward()
 
-        g_flat = get_flat_gradients_from(self.actor_critic.actor.net)
-        g_flat *= -1
+        g_flat = -get_flat_gradients_from(self.actor_critic.actor.net)
+
+        self.actor_optimizer.zero_grad()
+        loss_cost, _ = self.compute_loss_cost_performance(data)
+        loss_cost.backward()
 
-        x = conjugate_gradients(self.Fvp, g_flat, self.cg_iters)
+        b_flat = get_flat_gradients_from(self.actor_critic.actor.net)
+        # both systems H x = g and H d = b are solved at once,
+        # the products Hx, Hd and the quadratic forms come along
+        b_vectors = torch.stack([g_flat, b_flat])
+        (x, _), a_x, quadratic_forms = block_conjugate_gradients(self.Fvp, b_vectors, self.cg_iters)
+        Hx, Hd = a_x
         assert torch.isfinite(x).all()
 
         eps = 1.0e-8
-        xHx = torch.dot(x, self.Fvp(x))
+        xHx = quadratic_forms[0, 0]
 
         alpha = torch.sqrt(2 * self.target_kl / (xHx + eps))
 
-        self.actor_optimizer.zero_grad()
-        loss_cost, _ = self.compute_loss_cost_performance(data)
-        loss_cost.backward()
-
-        b_flat = get_flat_gradients_from(self.actor_critic.actor.net)
-        d = conjugate_gradients(self.Fvp, b_flat, self.cg_iters)
-        dHd = torch.dot(d, self.Fvp(d))
-        sHd = torch.dot(d, self.Fvp(d))
+        dHd = quadratic_forms[1, 1]
+        sHd = quadratic_forms[1, 1]
 
         epsilon = (1 - self.gamma) * (self.d_init - loss_cost)
         lambda_star = (-self.beta * epsilon - sHd) / (dHd + eps)
 
-        final_step_dir = -alpha / self.beta * (self.Fvp(x) - lambda_star * self.Fvp(d))
+        final_step_dir = -alpha / self.beta * (Hx - lambda_star * Hd)
         new_theta = theta_old + final_step_dir
         set_param_values_to_model(self.actor_critic.actor.net, new_theta)
 
+        if adaptive:
+            # the old distribution is only needed to resize the subset of fvp_obs
+            with torch.no_grad():
+                q_dist = self.actor_critic.actor.get_distribution(data['obs'])
+                kl = torch.distributions.kl.kl_divergence(p_dist, q_dist)
+            residual = torch.norm(b_vectors - a_x, dim=1) / torch.norm(b_vectors, dim=1)
+            self.fvp_sampler.update(kl, residual=residual.max().item())
+
         self.logger.store(**{'Loss/Pi': loss_pi.item()})
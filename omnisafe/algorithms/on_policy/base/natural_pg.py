@@ -19,8 +19,14 @@ import torch
 from omnisafe.algorithms import registry
 from omnisafe.algorithms.on_policy.base.policy_gradient import PolicyGradient
 from omnisafe.utils import distributed_utils
+from omnisafe.utils.fisher import (
+    FisherSubsampler,
+    GaussianFisherVectorProduct,
+    is_diagonal_gaussian,
+)
 from omnisafe.utils.tools import (
     conjugate_gradients,
+    flatten_parameters,
     get_flat_gradients_from,
     get_flat_params_from,
     set_param_values_to_model,
@@ -42,7 +48,35 @@ class NaturalPG(PolicyGradient):
         self.cg_damping = cfgs.cg_damping
         self.cg_iters = cfgs.cg_iters
         self.target_kl = cfgs.target_kl
+        self.fvp_mode = cfgs.fvp_mode
+        assert self.fvp_mode in ('analytic', 'autograd'), f'Unknown fvp_mode {self.fvp_mode}'
         self.fvp_obs = cfgs.fvp_obs
+        self.fvp_sampler = FisherSubsampler(
+            mode=cfgs.fvp_subsampling, size=cfgs.fvp_sample_size, tolerance=cfgs.fvp_tolerance
+        )
+        if cfgs.use_flat_params:
+            flatten_parameters(self.actor_critic.actor.net)
+
+    @property
+    def fvp_obs(self):
+        """The observations the Fisher-vector products are computed on."""
+        return self._fvp_obs
+
+    @fvp_obs.setter
+    def fvp_obs(self, obs):
+        # the analytic product is built again for the new observations
+        self._fvp_obs = obs
+        self.analytic_fvp = None
+
+    def state_dict(self, epoch: int) -> dict:
+        state = super().state_dict(epoch)
+        state['fvp_sampler'] = self.fvp_sampler.state_dict()
+        return state
+
+    def load_state_dict(self, state: dict) -> int:
+        if 'fvp_sampler' in state:
+            self.fvp_sampler.load_state_dict(state['fvp_sampler'])
+        return super().load_state_dict(state)
 
     def search_step_size(self, step_dir):
         """
@@ -63,8 +97,29 @@ class NaturalPG(PolicyGradient):
         """
         Build the Hessian-vector product based on an approximation of the KL-divergence.
         For details see John Schulman's PhD thesis (pp. 40) http://joschu.net/docs/thesis.pdf
+
+        ``params`` may also be a ``[k, n]`` batch of vectors, as used by
+        :func:`block_conjugate_gradients`, whose rows are multiplied at once.
+
+        With ``fvp_mode: analytic`` the product of a diagonal Gaussian actor is computed
+        by :class:`GaussianFisherVectorProduct`, which runs the forward pass once per
+        update, i.e. per ``fvp_obs``. Other actors use the double backward pass.
         """
         self.actor_critic.actor.net.zero_grad()
+        if self.fvp_mode == 'analytic' and self.analytic_fvp is None:
+            # False marks an actor which is not a diagonal Gaussian
+            self.analytic_fvp = is_diagonal_gaussian(
+                self.actor_critic.actor, self.fvp_obs
+            ) and GaussianFisherVectorProduct(self.actor_critic.actor, self.fvp_obs)
+        if self.fvp_mode == 'analytic' and self.analytic_fvp:
+            flat_grad_grad_kl = self.analytic_fvp(params)
+        else:
+            flat_grad_grad_kl = self.autograd_fvp(params)
+        distributed_utils.mpi_avg_torch_tensor(flat_grad_grad_kl)
+        return flat_grad_grad_kl + params * self.cg_damping
+
+    def autograd_fvp(self, params):
+        """The Fisher-vector products by a double backward pass through the KL-divergence."""
         q_dist = self.actor_critic.actor(self.fvp_obs)
         with torch.no_grad():
             p_dist = self.actor_critic.actor(self.fvp_obs)
@@ -73,14 +128,19 @@ class NaturalPG(PolicyGradient):
         grads = torch.autograd.grad(kl, self.actor_critic.actor.net.parameters(), create_graph=True)
         flat_grad_kl = torch.cat([grad.view(-1) for grad in grads])
 
-        kl_p = (flat_grad_kl * params).sum()
-        grads = torch.autograd.grad(
-            kl_p, self.actor_critic.actor.net.parameters(), retain_graph=False
-        )
-        # contiguous indicating, if the memory is contiguously stored or not
-        flat_grad_grad_kl = torch.cat([grad.contiguous().view(-1) for grad in grads])
-        distributed_utils.mpi_avg_torch_tensor(flat_grad_grad_kl)
-        return flat_grad_grad_kl + params * self.cg_damping
+        vectors = params.view(-1, params.shape[-1])
+        products = []
+        # a batch of vectors shares the forward and the first backward pass
+        for row, vector in enumerate(vectors):
+            kl_p = (flat_grad_kl * vector).sum()
+            grads = torch.autograd.grad(
+                kl_p,
+                self.actor_critic.actor.net.parameters(),
+                retain_graph=row < len(vectors) - 1,
+            )
+            # contiguous indicating, if the memory is contiguously stored or not
+            products.append(torch.cat([grad.contiguous().view(-1) for grad in grads]))
+        return torch.stack(products).view_as(params)
 
     def update(self):
         """
@@ -88,7 +148,7 @@ class NaturalPG(PolicyGradient):
         """
         raw_data, data = self.buf.pre_process_data()
         # sub-sampling accelerates calculations
-        self.fvp_obs = data['obs'][::4]
+        self.fvp_obs = self.fvp_sampler.sample(data['obs'])
         # Update Policy Network
         self.update_policy_net(data)
         # Update Value Function
@@ -111,14 +171,14 @@ class NaturalPG(PolicyGradient):
         loss_pi.backward()
         # average grads across MPI processes
         distributed_utils.mpi_avg_grads(self.actor_critic.actor.net)
-        g_flat = get_flat_gradients_from(self.actor_critic.actor.net)
-        g_flat *= -1
+        g_flat = -get_flat_gradients_from(self.actor_critic.actor.net)
 
         # pylint: disable-next=invalid-name
         x = conjugate_gradients(self.Fvp, g_flat, self.cg_iters)
         assert torch.isfinite(x).all()
         # Note that xHx = g^T x, but calculating xHx is faster than g^T x
-        xHx = torch.dot(x, self.Fvp(x))  # equivalent to : g^T x
+        Hx = self.Fvp(x)  # pylint: disable=invalid-name
+        xHx = torch.dot(x, Hx)  # equivalent to : g^T x
         assert xHx.item() >= 0, 'No negative values'
 
         # perform descent direction
@@ -136,8 +196,10 @@ class NaturalPG(PolicyGradient):
 
         with torch.no_grad():
             q_dist = self.actor_critic.actor(data['obs'])
-            kl = torch.distributions.kl.kl_divergence(p_dist, q_dist).mean().item()
+            kl = torch.distributions.kl.kl_divergence(p_dist, q_dist)
             loss_pi, pi_info = self.compute_loss_pi(data=data)
+        self.fvp_sampler.update(kl, residual=(torch.norm(g_flat - Hx) / torch.norm(g_flat)).item())
+        kl = kl.mean().item()
 
         self.logger.store(
             **{
@@ -22,12 +22,15 @@ import torch
 
 from omnisafe.algorithms import registry
 from omnisafe.common.buffer import Buffer
+from omnisafe.common.lagrange import Lagrange
 from omnisafe.common.logger import Logger
+from omnisafe.common.pid_lagrange import PIDLagrangian
 from omnisafe.models.constraint_actor_critic import ConstraintActorCritic
 from omnisafe.utils import core, distributed_utils
 from omnisafe.utils.config_utils import namedtuple2dict
-from omnisafe.utils.tools import get_flat_params_from
+from omnisafe.utils.tools import get_flat_params_from, get_rng_state, set_rng_state
 from omnisafe.wrappers import wrapper_registry
+from omnisafe.wrappers.collector import BackgroundRollout
 
 
 @registry.register
@@ -54,26 +57,57 @@ class PolicyGradient:  # pylint: disable=too-many-instance-attributes
         self.cfgs = deepcopy(cfgs)
         self.wrapper_type = self.cfgs.wrapper_type
         self.env = wrapper_registry.get(self.wrapper_type)(
-            env_id, cfgs=self.cfgs._asdict().get('env_cfgs')
+            env_id,
+            cfgs=self.cfgs._asdict().get('env_cfgs'),
+            num_envs=self.cfgs.num_envs,
+            use_subprocess_env=self.cfgs.use_subprocess_env,
         )
 
-        assert self.cfgs.steps_per_epoch % distributed_utils.num_procs() == 0
-        self.local_steps_per_epoch = cfgs.steps_per_epoch // distributed_utils.num_procs()
+        if self.cfgs.auto_resume:
+            # The world size may change between restarts, so the epoch is split as
+            # evenly as the number of environments per process allows.
+            self.local_steps_per_epoch = (
+                cfgs.steps_per_epoch
+                // distributed_utils.num_procs()
+                // cfgs.num_envs
+                * cfgs.num_envs
+            )
+        else:
+            assert self.cfgs.steps_per_epoch % distributed_utils.num_procs() == 0
+            self.local_steps_per_epoch = cfgs.steps_per_epoch // distributed_utils.num_procs()
+        assert self.local_steps_per_epoch % self.cfgs.num_envs == 0, (
+            f'Local steps per epoch ({self.local_steps_per_epoch}) must be divisible by '
+            f'num_envs ({self.cfgs.num_envs}).'
+        )
 
         # Ensure local each local process can experience at least one complete episode
-        assert self.env.max_ep_len <= self.local_steps_per_epoch, (
-            f'Reduce number of cores ({distributed_utils.num_procs()}) or increase '
-            f'batch size {self.cfgs.steps_per_epoch}.'
+        assert self.env.max_ep_len <= self.local_steps_per_epoch // self.cfgs.num_envs, (
+            f'Reduce number of cores ({distributed_utils.num_procs()}) or environments '
+            f'({self.cfgs.num_envs}) or increase batch size {self.cfgs.steps_per_epoch}.'
         )
 
+        if self.cfgs.async_rollout:
+            assert self.cfgs.buffer_cfgs.adv_estimation_method == 'vtrace', (
+                'async_rollout collects with a stale policy and requires '
+                'adv_estimation_method=vtrace.'
+            )
+
         # Set up logger and save configuration to disk
-        self.logger = Logger(exp_name=cfgs.exp_name, data_dir=cfgs.data_dir, seed=cfgs.seed)
+        self.logger = Logger(
+            exp_name=cfgs.exp_name,
+            data_dir=cfgs.data_dir,
+            seed=cfgs.seed,
+            resume=cfgs.auto_resume,
+            async_save=cfgs.async_save,
+            keep_checkpoints=cfgs.keep_checkpoints,
+            keep_best_checkpoints=cfgs.keep_best_checkpoints,
+        )
         self.logger.save_config(namedtuple2dict(cfgs))
         # Set seed
         seed = int(cfgs.seed) + 10000 * distributed_utils.proc_id()
         torch.manual_seed(seed)
         np.random.seed(seed)
-        self.env.env.reset(seed=seed)
+        self.env.reset(seed=seed)
         # Setup actor-critic module
         self.actor_critic = ConstraintActorCritic(
             observation_space=self.env.observation_space,
@@ -85,22 +119,7 @@ class PolicyGradient:  # pylint: disable=too-many-instance-attributes
         # Set PyTorch + MPI.
         self.set_mpi()
         # Set up experience buffer
-
-        self.buf = Buffer(
-            actor_critic=self.actor_critic,
-            obs_dim=self.env.observation_space.shape,
-            act_dim=self.env.action_space.shape,
-            size=self.local_steps_per_epoch,
-            reward_penalty=cfgs.reward_penalty,
-            scale_rewards=cfgs.scale_rewards,
-            standardized_obs=cfgs.standardized_obs,
-            gamma=cfgs.buffer_cfgs.gamma,
-            lam=cfgs.buffer_cfgs.lam,
-            lam_c=cfgs.buffer_cfgs.lam_c,
-            adv_estimation_method=cfgs.buffer_cfgs.adv_estimation_method,
-            standardized_reward=cfgs.buffer_cfgs.standardized_reward,
-            standardized_cost=cfgs.buffer_cfgs.standardized_cost,
-        )
+        self.buf = self.build_buffer()
         # Set up optimizer for policy and value function
         self.actor_optimizer = core.set_optimizer(
             'Adam', module=self.actor_critic.actor, learning_rate=cfgs.actor_lr
@@ -128,6 +147,79 @@ class PolicyGradient:  # pylint: disable=too-many-instance-attributes
         self.penalty_param = None
         self.p_dist = None
 
+    def build_buffer(self):
+        """Build an experience buffer for the data of one epoch."""
+        return Buffer(
+            actor_critic=self.actor_critic,
+            obs_dim=self.env.observation_space.shape,
+            act_dim=self.env.action_space.shape,
+            size=self.local_steps_per_epoch,
+            reward_penalty=self.cfgs.reward_penalty,
+            scale_rewards=self.cfgs.scale_rewards,
+            standardized_obs=self.cfgs.standardized_obs,
+            gamma=self.cfgs.buffer_cfgs.gamma,
+            lam=self.cfgs.buffer_cfgs.lam,
+            lam_c=self.cfgs.buffer_cfgs.lam_c,
+            adv_estimation_method=self.cfgs.buffer_cfgs.adv_estimation_method,
+            standardized_reward=self.cfgs.buffer_cfgs.standardized_reward,
+            standardized_cost=self.cfgs.buffer_cfgs.standardized_cost,
+            num_envs=self.cfgs.num_envs,
+            device_storage=self.cfgs.buffer_cfgs.device_storage,
+        )
+
+    def state_dict(self, epoch: int) -> dict:
+        """The training state after ``epoch``, to resume from with :meth:`load_state_dict`."""
+        state = {
+            'epoch': epoch,
+            'actor_critic': self.actor_critic.state_dict(),
+            'actor_optimizer': self.actor_optimizer.state_dict(),
+            'reward_critic_optimizer': self.reward_critic_optimizer.state_dict(),
+        }
+        if self.cfgs.use_cost:
+            state['cost_critic_optimizer'] = self.cost_critic_optimizer.state_dict()
+        if self.scheduler is not None:
+            state['scheduler'] = self.scheduler.state_dict()
+        if isinstance(self, Lagrange):
+            state['lagrange'] = self.lagrange_state_dict()
+        if isinstance(self, PIDLagrangian):
+            state['pid_lagrange'] = self.pid_state_dict()
+        # every process draws its own random numbers
+        state['rng'] = distributed_utils.all_gather_object(get_rng_state())
+        return state
+
+    def load_state_dict(self, state: dict) -> int:
+        """Restore a training state of :meth:`state_dict` and return the epoch to continue with.
+
+        Processes beyond the world size of the saved run keep their seeded random numbers.
+        """
+        self.actor_critic.load_state_dict(state['actor_critic'])
+        self.actor_optimizer.load_state_dict(state['actor_optimizer'])
+        self.reward_critic_optimizer.load_state_dict(state['reward_critic_optimizer'])
+        if self.cfgs.use_cost:
+            self.cost_critic_optimizer.load_state_dict(state['cost_critic_optimizer'])
+        if self.scheduler is not None:
+            self.scheduler.load_state_dict(state['scheduler'])
+        if isinstance(self, Lagrange):
+            self.load_lagrange_state_dict(state['lagrange'])
+        if isinstance(self, PIDLagrangian):
+            self.load_pid_state_dict(state['pid_lagrange'])
+        if distributed_utils.proc_id() < len(state['rng']):
+            set_rng_state(state['rng'][distributed_utils.proc_id()])
+        self.logger.epoch = state['epoch'] + 1
+        return state['epoch'] + 1
+
+    def resume(self, resume_from=None) -> int:
+        """Restore the training state to continue from and return the epoch to start with.
+
+        With ``auto_resume`` the latest checkpoint of this run, e.g. saved before a restart,
+        is preferred over ``resume_from``, a checkpoint file or the log directory of a run.
+        """
+        state = self.logger.load_checkpoint() if self.cfgs.auto_resume else None
+        if state is None and resume_from is not None:
+            state = self.logger.load_checkpoint(resume_from)
+            assert state is not None, f'No checkpoint found in {resume_from}.'
+        return 0 if state is None else self.load_state_dict(state)
+
     def set_learning_rate_scheduler(self):
         """Set up learning rate scheduler."""
         scheduler = None
@@ -145,14 +237,34 @@ class PolicyGradient:  # pylint: disable=too-many-instance-attributes
         """
         Initialize MPI specifics
         """
+        # Avoid slowdowns from PyTorch + MPI combo
+        distributed_utils.setup_torch_for_mpi(
+            pin_cpus=self.cfgs.pin_cpus, worker_pids=self.env.env_pool.pids
+        )
+        if self.cfgs.shared_memory_comm:
+            # exchange parameters, gradients and statistics of a single node in shared memory
+            distributed_utils.init_shared_memory_comm(
+                capacity=int(core.count_vars(self.actor_critic))
+            )
         if distributed_utils.num_procs() > 1:
-            # Avoid slowdowns from PyTorch + MPI combo
-            distributed_utils.setup_torch_for_mpi()
             start = time.time()
             self.logger.log('INFO: Sync actor critic parameters')
             # Sync parameters across cores: only once necessary, grads are averaged!
             distributed_utils.sync_params(self.actor_critic)
             self.logger.log(f'Done! (took {time.time()-start:0.3f} sec.)')
+            if self.cfgs.overlap_grad_sync:
+                # overlap the gradient averaging of all update steps with backward
+                assert (
+                    not self.cfgs.model_cfgs.shared_weights
+                ), 'overlap_grad_sync needs separate actor and critic networks.'
+                for module in (
+                    self.actor_critic.actor.net,
+                    self.actor_critic.reward_critic.net,
+                    self.actor_critic.cost_critic.net,
+                ):
+                    distributed_utils.register_overlapped_grad_sync(
+                        module, bucket_size_mb=self.cfgs.grad_sync_bucket_mb
+                    )
 
     def algorithm_specific_logs(self):
         """
@@ -202,18 +314,29 @@ class PolicyGradient:  # pylint: disable=too-many-instance-attributes
 
         return loss_pi, pi_info
 
-    def learn(self):
+    def learn(self, resume_from=None):
         """
         This is main function for algorithm update, divided into the following steps:
-            (1). self.rollout: collect interactive data from environment
+            (1). self.rollout: collect interactive data from environment,
+                 in the background during the previous update if ``async_rollout``
             (2). self.update: perform actor/critic updates
             (3). log epoch/update information for visualization and terminal log print.
 
+        Args:
+            resume_from (str): checkpoint file, or log directory of a run, to continue from.
+
         Returns:
             model and environment
         """
+        rollout = None
+        if self.cfgs.async_rollout:
+            # The data of each epoch is collected by the policy of the previous one,
+            # V-trace corrects for the lag between behavior and target policy.
+            rollout = BackgroundRollout(self.env)
+            bufs = [self.buf, self.build_buffer()]
+        start_epoch = self.resume(resume_from)
         # Main loop: collect experience in env and update/log each epoch
-        for epoch in range(self.cfgs.epochs):
+        for epoch in range(start_epoch, self.cfgs.epochs):
             self.epoch_time = time.time()
             # Update internals of AC
             if self.cfgs.exploration_noise_anneal:
@@ -226,17 +349,27 @@ class PolicyGradient:  # pylint: disable=too-many-instance-attributes
             else:
                 self.penalty_param = 0.0
             # Collect data from environment
-            self.env.set_rollout_cfgs(
-                local_steps_per_epoch=self.local_steps_per_epoch,
-                penalty_param=self.penalty_param,
-                use_cost=self.cfgs.use_cost,
-                cost_gamma=self.cfgs.cost_gamma,
-            )
-            self.env.roll_out(
-                self.actor_critic,
-                self.buf,
-                self.logger,
-            )
+            rollout_cfgs = {
+                'local_steps_per_epoch': self.local_steps_per_epoch,
+                'penalty_param': self.penalty_param,
+                'use_cost': self.cfgs.use_cost,
+                'cost_gamma': self.cfgs.cost_gamma,
+            }
+            if rollout is None:
+                self.env.set_rollout_cfgs(**rollout_cfgs)
+                self.env.roll_out(
+                    self.actor_critic,
+                    self.buf,
+                    self.logger,
+                )
+            else:
+                # Take the data of this epoch and collect the next one while updating
+                if epoch == start_epoch:
+                    rollout.start(self.actor_critic, bufs[epoch % 2], **rollout_cfgs)
+                rollout.wait(self.logger)
+                self.buf = bufs[epoch % 2]
+                if epoch + 1 < self.cfgs.epochs:
+                    rollout.start(self.actor_critic, bufs[(epoch + 1) % 2], **rollout_cfgs)
             # Update: actor, critic, running statistics
             raw_data, _ = self.update()
 
@@ -256,6 +389,9 @@ class PolicyGradient:  # pylint: disable=too-many-instance-attributes
             # Save model to disk
             if (epoch + 1) % self.cfgs.save_freq == 0:
                 self.logger.torch_save(itr=epoch)
+            # Save the training state to resume from
+            if self.cfgs.checkpoint_freq and (epoch + 1) % self.cfgs.checkpoint_freq == 0:
+                self.logger.save_checkpoint(self.state_dict(epoch), epoch)
 
         # Close opened files to avoid number of open files overflow
         self.logger.close()
@@ -14,11 +14,14 @@
 # ==============================================================================
 """Implementation of the TRPO algorithm."""
 
+from collections import namedtuple
+
 import torch
 
 from omnisafe.algorithms import registry
 from omnisafe.algorithms.on_policy.base.natural_pg import NaturalPG
 from omnisafe.utils import distributed_utils
+from omnisafe.utils.line_search import candidate_distributions, fixed_distribution
 from omnisafe.utils.tools import (
     conjugate_gradients,
     get_flat_gradients_from,
@@ -27,6 +30,13 @@ from omnisafe.utils.tools import (
 )
 
 
+# A candidate step of the line search, see TRPO.evaluate_step_candidates
+StepCandidate = namedtuple(
+    'StepCandidate',
+    'step step_frac loss_pi loss_pi_cost loss_improve cost_diff kl',
+)
+
+
 @registry.register
 class TRPO(NaturalPG):
     """The Trust Region Policy Optimization (TRPO) algorithm.
@@ -39,6 +49,81 @@ class TRPO(NaturalPG):
 
     def __init__(self, env_id, cfgs) -> None:
         super().__init__(env_id=env_id, cfgs=cfgs)
+        self.line_search_batch = cfgs.line_search_batch
+        assert self.line_search_batch > 0, 'line_search_batch must be a positive integer.'
+
+    # pylint: disable-next=too-many-arguments,too-many-locals
+    def evaluate_step_candidates(
+        self,
+        step_dir,
+        p_dist,
+        data,
+        loss_pi_before,
+        loss_pi_cost_before=None,
+        total_steps=15,
+        decay=0.8,
+    ):
+        """Evaluate the candidate steps of the line search, ``line_search_batch`` at a time.
+
+        The ``j``-th candidate moves the parameters by ``decay**j * step_dir``.
+        The candidates of a batch are evaluated by one forward pass of the actor, see
+        :func:`candidate_distributions`, which is shared by the losses and the KL-divergence,
+        and their statistics are averaged over the processes by one collective.
+        The actor keeps its parameters.
+
+        Args:
+            step_dir: direction theta changes towards.
+            p_dist: distribution of the old policy on ``data['obs']``.
+            data: data buffer, mainly with adv, costs, values, actions, and observations.
+            loss_pi_before: loss of the reward before the update.
+            loss_pi_cost_before: loss of the cost before the update, the cost is not
+                evaluated if None.
+            total_steps: number of candidates.
+            decay: how search-step reduces in line-search.
+
+        Yields:
+            a :class:`StepCandidate` with the step number starting at 1, the step fraction,
+            the local losses of the reward and of the cost (None if not evaluated), and the
+            improvement of the reward loss, the increase of the cost loss and the
+            KL-divergence averaged over the processes.
+        """
+        actor = self.actor_critic.actor
+        theta_old = get_flat_params_from(actor.net)
+        step_frac = 1.0
+        for start in range(0, total_steps, self.line_search_batch):
+            step_fracs = []
+            for _ in range(min(self.line_search_batch, total_steps - start)):
+                step_fracs.append(step_frac)
+                step_frac *= decay
+
+            losses, stats = [], []
+            with torch.no_grad():
+                thetas = theta_old + torch.tensor(step_fracs)[:, None] * step_dir
+                for q_dist in candidate_distributions(actor, thetas, data['obs']):
+                    with fixed_distribution(actor, data['obs'], q_dist):
+                        loss_pi_rew, _ = self.compute_loss_pi(data=data)
+                        loss_pi_cost = (
+                            self.compute_loss_cost_performance(data=data)[0]
+                            if loss_pi_cost_before is not None
+                            else None
+                        )
+                    torch_kl = torch.distributions.kl.kl_divergence(p_dist, q_dist).mean()
+                    losses.append((loss_pi_rew, loss_pi_cost))
+                    stats.append(
+                        [
+                            loss_pi_before - loss_pi_rew.item(),
+                            0.0
+                            if loss_pi_cost is None
+                            else loss_pi_cost.item() - loss_pi_cost_before,
+                            torch_kl.item(),
+                        ]
+                    )
+            # Average across MPI processes, all candidates at once
+            stats = distributed_utils.mpi_avg(torch.tensor(stats, dtype=torch.float64)).tolist()
+            for offset, (frac, (loss_pi_rew, loss_pi_cost), row) in enumerate(
+                zip(step_fracs, losses, stats)
+            ):
+                yield StepCandidate(start + offset + 1, frac, loss_pi_rew, loss_pi_cost, *row)
 
     # pylint: disable-next=too-many-arguments,too-many-locals,arguments-differ
     def search_step_size(
@@ -71,53 +156,31 @@ class TRPO(NaturalPG):
             decay:
                 how search-step reduces in line-search
         """
-        # How far to go in a single update
-        step_frac = 1.0
-        # Get old parameterized policy expression
-        _theta_old = get_flat_params_from(self.actor_critic.actor.net)
         # Change expected objective function gradient = expected_imrpove best this moment
         expected_improve = g_flat.dot(step_dir)
 
         # While not within_trust_region and not out of total_steps:
-        for j in range(total_steps):
-            # Update theta params
-            new_theta = _theta_old + step_frac * step_dir
-            # Set new params as params of net
-            set_param_values_to_model(self.actor_critic.actor.net, new_theta)
-            # The stepNo this update accept
-            acceptance_step = j + 1
-
-            with torch.no_grad():
-                loss_pi, _ = self.compute_loss_pi(data=data)
-                # Compute KL distance between new and old policy
-                q_dist = self.actor_critic.actor(data['obs'])
-                # KL-distance of old p-dist and new q-dist, applied in KLEarlyStopping
-                torch_kl = torch.distributions.kl.kl_divergence(p_dist, q_dist).mean().item()
-            # Real loss improve: old policy loss - new policy loss
-            loss_improve = loss_pi_before - loss_pi.item()
-            # Average processes.... multi-processing style like: mpi_tools.mpi_avg(xxx)
-            torch_kl = distributed_utils.mpi_avg(torch_kl)
-            loss_improve = distributed_utils.mpi_avg(loss_improve)
-            menu = (expected_improve, loss_improve)
+        for candidate in self.evaluate_step_candidates(
+            step_dir, p_dist, data, loss_pi_before, total_steps=total_steps, decay=decay
+        ):
+            step_frac, acceptance_step = candidate.step_frac, candidate.step
+            menu = (expected_improve, candidate.loss_improve)
             self.logger.log(f'Expected Improvement: {menu[0]} Actual: {menu[1]}')
-            if not torch.isfinite(loss_pi):
+            if not torch.isfinite(candidate.loss_pi):
                 self.logger.log('WARNING: loss_pi not finite')
-            elif loss_improve < 0:
+            elif candidate.loss_improve < 0:
                 self.logger.log('INFO: did not improve improve <0')
-            elif torch_kl > self.target_kl * 1.5:
+            elif candidate.kl > self.target_kl * 1.5:
                 self.logger.log('INFO: violated KL constraint.')
             else:
                 # step only if surrogate is improved and when within trust reg.
                 self.logger.log(f'Accept step at i={acceptance_step}')
                 break
-            step_frac *= decay
         else:
             self.logger.log('INFO: no suitable step found...')
             step_dir = torch.zeros_like(step_dir)
             acceptance_step = 0
 
-        set_param_values_to_model(self.actor_critic.actor.net, _theta_old)
-
         return step_frac * step_dir, acceptance_step
 
     # pylint: disable-next=too-many-locals
@@ -133,14 +196,14 @@ class TRPO(NaturalPG):
         loss_pi.backward()
         # average grads across MPI processes
         distributed_utils.mpi_avg_grads(self.actor_critic.actor.net)
-        g_flat = get_flat_gradients_from(self.actor_critic.actor.net)
-        g_flat *= -1
+        g_flat = -get_flat_gradients_from(self.actor_critic.actor.net)
 
         # pylint: disable-next=invalid-name
         x = conjugate_gradients(self.Fvp, g_flat, self.cg_iters)
         assert torch.isfinite(x).all()
         # Note that xHx = g^T x, but calculating xHx is faster than g^T x
-        xHx = torch.dot(x, self.Fvp(x))  # equivalent to : g^T x
+        Hx = self.Fvp(x)  # pylint: disable=invalid-name
+        xHx = torch.dot(x, Hx)  # equivalent to : g^T x
         assert xHx.item() >= 0, 'No negative values'
 
         # perform descent direction
@@ -164,8 +227,10 @@ class TRPO(NaturalPG):
 
         with torch.no_grad():
             q_dist = self.actor_critic.actor(data['obs'])
-            kl = torch.distributions.kl.kl_divergence(p_dist, q_dist).mean().item()
+            kl = torch.distributions.kl.kl_divergence(p_dist, q_dist)
             loss_pi, pi_info = self.compute_loss_pi(data=data)
+        self.fvp_sampler.update(kl, residual=(torch.norm(g_flat - Hx) / torch.norm(g_flat)).item())
+        kl = kl.mean().item()
 
         self.logger.store(
             **{
@@ -77,7 +77,7 @@ class NPGLag(NaturalPG, Lagrange):
         # pre-process data
         raw_data, data = self.buf.pre_process_data()
         # sub-sampling accelerates calculations
-        self.fvp_obs = data['obs'][::4]
+        self.fvp_obs = self.fvp_sampler.sample(data['obs'])
         # Note that logger already uses MPI statistics across all processes..
         ep_costs = self.logger.get_stats('Metrics/EpCost')[0]
         # First update Lagrange multiplier parameter
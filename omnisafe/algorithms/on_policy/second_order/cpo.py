@@ -21,7 +21,7 @@ from omnisafe.algorithms import registry
 from omnisafe.algorithms.on_policy.base.trpo import TRPO
 from omnisafe.utils import distributed_utils
 from omnisafe.utils.tools import (
-    conjugate_gradients,
+    block_conjugate_gradients,
     get_flat_gradients_from,
     get_flat_params_from,
     set_param_values_to_model,
@@ -74,65 +74,47 @@ class CPO(TRPO):
             decay
                 how search-step reduces in line-search
         """
-        # Get distance each time theta goes towards certain direction
-        step_frac = 1.0
-        # Get and flatten parameters from pi-net
-        _theta_old = get_flat_params_from(self.actor_critic.actor.net)
         # Reward improvement, g-flat as gradient of reward
         expected_rew_improve = g_flat.dot(step_dir)
 
         # While not within_trust_region and not finish all steps:
-        for j in range(total_steps):
-            # Get new theta
-            new_theta = _theta_old + step_frac * step_dir
-            # Set new theta as new actor parameters
-            set_param_values_to_model(self.actor_critic.actor.net, new_theta)
+        for candidate in self.evaluate_step_candidates(
+            step_dir,
+            p_dist,
+            data,
+            loss_pi_before,
+            loss_pi_cost_before=self.loss_pi_cost_before,
+            total_steps=total_steps,
+            decay=decay,
+        ):
             # The last acceptance steps to next step
-            acceptance_step = j + 1
-
-            with torch.no_grad():
-                # Loss of policy reward from target/expected reward
-                loss_pi_rew, _ = self.compute_loss_pi(data=data)
-                # Loss of cost of policy cost from real/expected reward
-                loss_pi_cost, _ = self.compute_loss_cost_performance(data=data)
-                # Compute KL distance between new and old policy
-                q_dist = self.actor_critic.actor(data['obs'])
-                torch_kl = torch.distributions.kl.kl_divergence(p_dist, q_dist).mean().item()
-            # Compute improvement of reward
-            loss_rew_improve = loss_pi_before - loss_pi_rew.item()
-            cost_diff = loss_pi_cost.item() - self.loss_pi_cost_before
-
-            # Average across MPI processes...
-            torch_kl = distributed_utils.mpi_avg(torch_kl)
-            # Pi_average of torch_kl above
-            loss_rew_improve = distributed_utils.mpi_avg(loss_rew_improve)
-            cost_diff = distributed_utils.mpi_avg(cost_diff)
-            menu = (expected_rew_improve, loss_rew_improve)
+            step_frac, acceptance_step = candidate.step_frac, candidate.step
+            menu = (expected_rew_improve, candidate.loss_improve)
             self.logger.log(f'Expected Improvement: {menu[0]} Actual: {menu[1]}')
             # Check whether there are nan.
-            if not torch.isfinite(loss_pi_rew) and not torch.isfinite(loss_pi_cost):
+            if not torch.isfinite(candidate.loss_pi) and not torch.isfinite(candidate.loss_pi_cost):
                 self.logger.log('WARNING: loss_pi not finite')
-            elif loss_rew_improve < 0 if optim_case > 1 else False:
+            elif candidate.loss_improve < 0 if optim_case > 1 else False:
                 self.logger.log('INFO: did not improve improve <0')
             # Change of cost's range
-            elif cost_diff > max(-c, 0):
-                self.logger.log(f'INFO: no improve {cost_diff} > {max(-c, 0)}')
+            elif candidate.cost_diff > max(-c, 0):
+                self.logger.log(f'INFO: no improve {candidate.cost_diff} > {max(-c, 0)}')
             # Check KL-distance to avoid too far gap
-            elif torch_kl > self.target_kl * 1.5:
-                self.logger.log(f'INFO: violated KL constraint {torch_kl} at step {j + 1}.')
+            elif candidate.kl > self.target_kl * 1.5:
+                self.logger.log(
+                    f'INFO: violated KL constraint {candidate.kl} at step {acceptance_step}.'
+                )
             else:
                 # step only if surrogate is improved and we are
                 # within the trust region
-                self.logger.log(f'Accept step at i={j + 1}')
+                self.logger.log(f'Accept step at i={acceptance_step}')
                 break
-            step_frac *= decay
         else:
             # If didn't find a step satisfy those conditions
             self.logger.log('INFO: no suitable step found...')
             step_dir = torch.zeros_like(step_dir)
             acceptance_step = 0
 
-        set_param_values_to_model(self.actor_critic.actor.net, _theta_old)
         return step_frac * step_dir, acceptance_step
 
     def algorithm_specific_logs(self):
@@ -174,19 +156,8 @@ class CPO(TRPO):
         loss_pi.backward()
         # Average grads across MPI processes
         distributed_utils.mpi_avg_grads(self.actor_critic.actor.net)
-        g_flat = get_flat_gradients_from(self.actor_critic.actor.net)
-
         # Flip sign since policy_loss = -(ration * adv)
-        g_flat *= -1
-        # x: g or g_T in original paper, stands for gradient of cost function
-        x = conjugate_gradients(self.Fvp, g_flat, self.cg_iters)  # pylint: disable=invalid-name
-        assert torch.isfinite(x).all()
-        eps = 1.0e-8
-        # Note that xHx = g^T x, but calculating xHx is faster than g^T x
-        # equivalent to : g^T x
-        xHx = torch.dot(x, self.Fvp(x))
-        alpha = torch.sqrt(2 * self.target_kl / (xHx + eps))
-        assert xHx.item() >= 0, 'No negative values'
+        g_flat = -get_flat_gradients_from(self.actor_critic.actor.net)
 
         # get the policy cost performance gradient b (flat as vector)
         self.actor_optimizer.zero_grad()
@@ -196,6 +167,21 @@ class CPO(TRPO):
         distributed_utils.mpi_avg_grads(self.actor_critic.actor.net)
         self.loss_pi_cost_before = loss_cost.item()
         b_flat = get_flat_gradients_from(self.actor_critic.actor.net)
+
+        # Set variable names as used in the paper with conjugate_gradient method,
+        # used to solve equation(compute Hessian Matrix) instead of Natural Gradient
+        # x: g or g_T in original paper, stands for gradient of cost function
+        # both systems H x = g and H p = b are solved at once, which gives xHx for free
+        b_vectors = torch.stack([g_flat, b_flat])
+        (x, p), a_x, quadratic_forms = block_conjugate_gradients(self.Fvp, b_vectors, self.cg_iters)
+        assert torch.isfinite(x).all()
+        eps = 1.0e-8
+        # Note that xHx = g^T x, but calculating xHx is faster than g^T x
+        # equivalent to : g^T x
+        xHx = quadratic_forms[0, 0]
+        alpha = torch.sqrt(2 * self.target_kl / (xHx + eps))
+        assert xHx.item() >= 0, 'No negative values'
+
         # :param ep_costs: do samplings to get approximate costs as ep_costs
         ep_costs = self.logger.get_stats('Metrics/EpCost')[0]
         # :params c: how much sampled result of cost goes beyond limit
@@ -203,10 +189,6 @@ class CPO(TRPO):
         # Rescale, and add small float to avoid nan
         cost /= self.logger.get_stats('Metrics/EpLen')[0] + eps  # rescale
 
-        # Set variable names as used in the paper with conjugate_gradient method,
-        # used to solve equation(compute Hessian Matrix) instead of Natural Gradient
-
-        p = conjugate_gradients(self.Fvp, b_flat, self.cg_iters)
         q = xHx  # conjugate of matrix H
         r = g_flat.dot(p)  # g^T H^{-1} b
         s = b_flat.dot(p)  # b^T H^{-1} b
@@ -312,7 +294,10 @@ class CPO(TRPO):
         set_param_values_to_model(self.actor_critic.actor.net, new_theta)
         # Output the performance of pi policy on observation
         q_dist = self.actor_critic.actor(data['obs'])
-        torch_kl = torch.distributions.kl.kl_divergence(p_dist, q_dist).mean().item()
+        torch_kl = torch.distributions.kl.kl_divergence(p_dist, q_dist).detach()
+        residual = torch.norm(b_vectors - a_x, dim=1) / torch.norm(b_vectors, dim=1)
+        self.fvp_sampler.update(torch_kl, residual=residual.max().item())
+        torch_kl = torch_kl.mean().item()
 
         self.logger.store(
             **{
@@ -20,7 +20,7 @@ from omnisafe.algorithms import registry
 from omnisafe.algorithms.on_policy.base.trpo import TRPO
 from omnisafe.utils import distributed_utils
 from omnisafe.utils.tools import (
-    conjugate_gradients,
+    block_conjugate_gradients,
     get_flat_gradients_from,
     get_flat_params_from,
     set_param_values_to_model,
@@ -58,53 +58,43 @@ class PCPO(TRPO):
         """
         PCPO algorithm performs line-search to ensure constraint satisfaction for rewards and costs.
         """
-        step_frac = 1.0
-        _theta_old = get_flat_params_from(self.actor_critic.actor.net)
         expected_rew_improve = g_flat.dot(step_dir)
 
         # while not within_trust_region:
-        for j in range(total_steps):
-            new_theta = _theta_old + step_frac * step_dir
-            set_param_values_to_model(self.actor_critic.actor.net, new_theta)
-            acceptance_step = j + 1
-
-            with torch.no_grad():
-                loss_pi_rew, _ = self.compute_loss_pi(data=data)
-                loss_pi_cost, _ = self.compute_loss_cost_performance(data=data)
-                # determine KL div between new and old policy
-                q_dist = self.actor_critic.actor(data['obs'])
-                torch_kl = torch.distributions.kl.kl_divergence(p_dist, q_dist).mean().item()
-            loss_rew_improve = loss_pi_before - loss_pi_rew.item()
-            cost_diff = loss_pi_cost.item() - loss_pi_cost_before
-
-            # Average across MPI processes...
-            torch_kl = distributed_utils.mpi_avg(torch_kl)
-            loss_rew_improve = distributed_utils.mpi_avg(loss_rew_improve)
-            cost_diff = distributed_utils.mpi_avg(cost_diff)
-            menu = (expected_rew_improve, loss_rew_improve)
+        for candidate in self.evaluate_step_candidates(
+            step_dir,
+            p_dist,
+            data,
+            loss_pi_before,
+            loss_pi_cost_before=loss_pi_cost_before,
+            total_steps=total_steps,
+            decay=decay,
+        ):
+            step_frac, acceptance_step = candidate.step_frac, candidate.step
+            menu = (expected_rew_improve, candidate.loss_improve)
             self.logger.log(f'Expected Improvement: {menu[0]} Actual: {menu[1]}')
 
-            if not torch.isfinite(loss_pi_rew) and not torch.isfinite(loss_pi_cost):
+            if not torch.isfinite(candidate.loss_pi) and not torch.isfinite(candidate.loss_pi_cost):
                 self.logger.log('WARNING: loss_pi not finite')
-            elif loss_rew_improve < 0 if optim_case > 1 else False:
+            elif candidate.loss_improve < 0 if optim_case > 1 else False:
                 self.logger.log('INFO: did not improve improve <0')
 
-            elif cost_diff > max(-cost, 0):
-                self.logger.log(f'INFO: no improve {cost_diff} > {max(-cost, 0)}')
-            elif torch_kl > self.target_kl * 1.5:
-                self.logger.log(f'INFO: violated KL constraint {torch_kl} at step {j + 1}.')
+            elif candidate.cost_diff > max(-cost, 0):
+                self.logger.log(f'INFO: no improve {candidate.cost_diff} > {max(-cost, 0)}')
+            elif candidate.kl > self.target_kl * 1.5:
+                self.logger.log(
+                    f'INFO: violated KL constraint {candidate.kl} at step {acceptance_step}.'
+                )
             else:
                 # step only if surrogate is improved and we are
                 # within the trust region
-                self.logger.log(f'Accept step at i={j + 1}')
+                self.logger.log(f'Accept step at i={acceptance_step}')
                 break
-            step_frac *= decay
         else:
             self.logger.log('INFO: no suitable step found...')
             step_dir = torch.zeros_like(step_dir)
             acceptance_step = 0
 
-        set_param_values_to_model(self.actor_critic.actor.net, _theta_old)
         return step_frac * step_dir, acceptance_step
 
     def algorithm_specific_logs(self):
@@ -143,19 +133,8 @@ class PCPO(TRPO):
         loss_pi.backward()
         # average grads across MPI processes
         distributed_utils.mpi_avg_grads(self.actor_critic.actor.net)
-        g_flat = get_flat_gradients_from(self.actor_critic.actor.net)
-
         # flip sign since policy_loss = -(ration * adv)
-        g_flat *= -1
-
-        x = conjugate_gradients(self.Fvp, g_flat, self.cg_iters)
-        assert torch.isfinite(x).all()
-        eps = 1.0e-8
-        # Note that xHx = g^T x, but calculating xHx is faster than g^T x
-        xHx = torch.dot(x, self.Fvp(x))  # equivalent to : g^T x
-        H_inv_g = self.Fvp(x)
-        alpha = torch.sqrt(2 * self.target_kl / (xHx + eps))
-        assert xHx.item() >= 0, 'No negative values'
+        g_flat = -get_flat_gradients_from(self.actor_critic.actor.net)
 
         # get the policy cost performance gradient b (flat as vector)
         self.actor_optimizer.zero_grad()
@@ -166,14 +145,24 @@ class PCPO(TRPO):
         loss_pi_cost_before = loss_cost.item()
         b_flat = get_flat_gradients_from(self.actor_critic.actor.net)
 
+        # set variable names as used in the paper
+        # both systems H x = g and H p = b are solved at once, which gives Hx and xHx for free
+        b_vectors = torch.stack([g_flat, b_flat])
+        (x, p), a_x, quadratic_forms = block_conjugate_gradients(self.Fvp, b_vectors, self.cg_iters)
+        H_inv_g = a_x[0]
+        assert torch.isfinite(x).all()
+        eps = 1.0e-8
+        # Note that xHx = g^T x, but calculating xHx is faster than g^T x
+        xHx = quadratic_forms[0, 0]  # equivalent to : g^T x
+        alpha = torch.sqrt(2 * self.target_kl / (xHx + eps))
+        assert xHx.item() >= 0, 'No negative values'
+
         ep_costs = self.logger.get_stats('Metrics/EpCost')[0]
         cost = ep_costs - self.cost_limit
         cost /= self.logger.get_stats('Metrics/EpLen')[0] + eps  # rescale
         self.logger.log(f'c = {cost}')
         self.logger.log(f'b^T b = {b_flat.dot(b_flat).item()}')
 
-        # set variable names as used in the paper
-        p = conjugate_gradients(self.Fvp, b_flat, self.cg_iters)
         q = xHx
         # g^T H^{-1} b
         r = g_flat.dot(p)
@@ -203,7 +192,10 @@ class PCPO(TRPO):
         set_param_values_to_model(self.actor_critic.actor.net, new_theta)
 
         q_dist = self.actor_critic.actor(data['obs'])
-        torch_kl = torch.distributions.kl.kl_divergence(p_dist, q_dist).mean().item()
+        torch_kl = torch.distributions.kl.kl_divergence(p_dist, q_dist).detach()
+        residual = torch.norm(b_vectors - a_x, dim=1) / torch.norm(b_vectors, dim=1)
+        self.fvp_sampler.update(torch_kl, residual=residual.max().item())
+        torch_kl = torch_kl.mean().item()
 
         self.logger.store(
             **{
@@ -14,12 +14,16 @@
 # ==============================================================================
 """Registry for algorithms."""
 
+import importlib
 import inspect
 
 
 class Registry:
     """A registry to map strings to classes.
 
+    Classes may be declared with the module defining them by :meth:`register_lazy`,
+    the module is only imported once the class is looked up by :meth:`get`.
+
     Args:
         name (str): Registry name.
     """
@@ -27,6 +31,7 @@ class Registry:
     def __init__(self, name):
         self._name = name
         self._module_dict = {}
+        self._lazy_dict = {}
 
     def __repr__(self):
         return (
@@ -43,10 +48,27 @@ class Registry:
         """Return a dict mapping names to classes."""
         return self._module_dict
 
+    @property
+    def lazy_dict(self):
+        """Return a dict mapping names to the modules which register the classes."""
+        return self._lazy_dict
+
     def get(self, key):
-        """Get the class that has been registered under the given key."""
+        """Get the class that has been registered under the given key.
+
+        The module of a class declared by :meth:`register_lazy` is imported on the first call.
+        """
+        if key not in self._module_dict and key in self._lazy_dict:
+            importlib.import_module(self._lazy_dict[key])
+            assert key in self._module_dict, f'{self._lazy_dict[key]} does not register {key}.'
         return self._module_dict.get(key, None)
 
+    def register_lazy(self, name, module):
+        """Declare that importing ``module`` registers the class ``name``."""
+        if name in self._lazy_dict:
+            raise KeyError(f'{name} is already registered in {self.name}')
+        self._lazy_dict[name] = module
+
     def _register_module(self, module_class):
         """Register a module.
         Args:
@@ -69,4 +91,5 @@ REGISTRY = Registry('OmniSafe')
 
 
 register = REGISTRY.register
+register_lazy = REGISTRY.register_lazy
 get = REGISTRY.get
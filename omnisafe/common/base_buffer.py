@@ -25,22 +25,46 @@ class BaseBuffer:
     """A simple FIFO experience replay buffer for DDPG agents."""
 
     # pylint: disable-next=too-many-arguments
-    def __init__(self, obs_dim, act_dim, size, batch_size, device=torch.device('cpu')):
+    def __init__(
+        self,
+        obs_dim,
+        act_dim,
+        size,
+        batch_size,
+        device=torch.device('cpu'),
+        device_storage: bool = False,
+    ):
+        """init
 
-        """init"""
-        self.obs_buf = np.zeros(combined_shape(size, obs_dim), dtype=np.float32)
-        self.obs_next_buf = np.zeros(combined_shape(size, obs_dim), dtype=np.float32)
-        self.act_buf = np.zeros(combined_shape(size, act_dim), dtype=np.float32)
-        self.rew_buf = np.zeros(size, dtype=np.float32)
-        self.cost_buf = np.zeros(size, dtype=np.float32)
-        self.done_buf = np.zeros(size, dtype=np.float32)
+        With ``device_storage`` the buffer is preallocated as torch tensors on ``device``
+        and minibatches are sampled there, otherwise it is kept in numpy arrays and every
+        minibatch is converted and moved to ``device``.
+        """
+        self.device = device
+        self.device_storage = device_storage
+        self.obs_buf = self._zeros(combined_shape(size, obs_dim))
+        self.obs_next_buf = self._zeros(combined_shape(size, obs_dim))
+        self.act_buf = self._zeros(combined_shape(size, act_dim))
+        self.rew_buf = self._zeros(size)
+        self.cost_buf = self._zeros(size)
+        self.done_buf = self._zeros(size)
         self.ptr, self.size, self.max_size = 0, 0, size
         self.batch_size = batch_size
-        self.device = device
+
+    def _zeros(self, shape):
+        """allocate a zero-initialized storage array."""
+        if self.device_storage:
+            return torch.zeros(shape, dtype=torch.float32, device=self.device)
+        return np.zeros(shape, dtype=np.float32)
 
     # pylint: disable-next=too-many-arguments
     def store(self, obs, act, rew, cost, next_obs, done):
         """store"""
+        if self.device_storage:
+            obs, act, rew, cost, next_obs, done = (
+                torch.as_tensor(x, dtype=torch.float32, device=self.device)
+                for x in (obs, act, rew, cost, next_obs, done)
+            )
         self.obs_buf[self.ptr] = obs
         self.obs_next_buf[self.ptr] = next_obs
         self.act_buf[self.ptr] = act
@@ -50,9 +74,53 @@ class BaseBuffer:
         self.ptr = (self.ptr + 1) % self.max_size
         self.size = min(self.size + 1, self.max_size)
 
+    # pylint: disable-next=too-many-arguments
+    def store_batch(self, obs, act, rew, cost, next_obs, done):
+        """store a batch of transitions, each argument holds one row per transition"""
+        num = len(rew)
+        idxs = (self.ptr + np.arange(num)) % self.max_size
+        if self.device_storage:
+            idxs = torch.as_tensor(idxs, device=self.device)
+            obs, act, rew, cost, next_obs, done = (
+                torch.as_tensor(x, dtype=torch.float32, device=self.device)
+                for x in (obs, act, rew, cost, next_obs, done)
+            )
+        self.obs_buf[idxs] = obs
+        self.obs_next_buf[idxs] = next_obs
+        self.act_buf[idxs] = act
+        self.rew_buf[idxs] = rew
+        self.cost_buf[idxs] = cost
+        self.done_buf[idxs] = done
+        self.ptr = (self.ptr + num) % self.max_size
+        self.size = min(self.size + num, self.max_size)
+
+    def state_dict(self) -> dict:
+        """The stored transitions and the write position, to restore with :meth:`load_state_dict`.
+
+        Only the filled part of the buffer is kept, as numpy arrays.
+        """
+        state = {'ptr': self.ptr, 'size': self.size}
+        for name in ('obs_buf', 'obs_next_buf', 'act_buf', 'rew_buf', 'cost_buf', 'done_buf'):
+            data = getattr(self, name)[: self.size]
+            state[name] = data.cpu().numpy() if self.device_storage else data.copy()
+        return state
+
+    def load_state_dict(self, state: dict) -> None:
+        """Restore the transitions of :meth:`state_dict`."""
+        assert state['size'] <= self.max_size, 'The saved transitions exceed the buffer size.'
+        for name in ('obs_buf', 'obs_next_buf', 'act_buf', 'rew_buf', 'cost_buf', 'done_buf'):
+            data = state[name]
+            if self.device_storage:
+                data = torch.as_tensor(data, dtype=torch.float32, device=self.device)
+            getattr(self, name)[: state['size']] = data
+        self.ptr, self.size = state['ptr'] % self.max_size, state['size']
+
     def sample_batch(self):
         """sample_batch"""
-        idxs = np.random.randint(0, self.size, size=self.batch_size)
+        if self.device_storage:
+            idxs = torch.randint(0, self.size, size=(self.batch_size,), device=self.device)
+        else:
+            idxs = np.random.randint(0, self.size, size=self.batch_size)
         batch = dict(
             obs=self.obs_buf[idxs],
             obs_next=self.obs_next_buf[idxs],
@@ -61,6 +129,8 @@ class BaseBuffer:
             cost=self.cost_buf[idxs],
             done=self.done_buf[idxs],
         )
+        if self.device_storage:
+            return batch
         return {
             k: torch.as_tensor(v, dtype=torch.float32).to(self.device) for k, v in batch.items()
         }
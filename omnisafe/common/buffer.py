@@ -14,14 +14,12 @@
 # ==============================================================================
 """Implementation of the Buffer."""
 
-from copy import deepcopy
-
 import numpy as np
 import torch
 
 from omnisafe.utils import distributed_utils
-from omnisafe.utils.core import combined_shape, discount_cumsum
-from omnisafe.utils.vtrace import calculate_v_trace
+from omnisafe.utils.core import combined_shape, segment_discount_cumsum, segment_gae
+from omnisafe.utils.vtrace import calculate_batched_v_trace
 
 
 # pylint: disable-next=too-many-instance-attributes
@@ -45,24 +43,39 @@ class Buffer:
         lam_c: float = 0.95,
         reward_penalty: bool = False,
         device: torch.device = torch.device('cpu'),
+        num_envs: int = 1,
+        device_storage: bool = False,
     ):
         """
         A buffer for storing trajectories experienced by an agent interacting
         with the environment, and using Generalized Advantage Estimation (GAE)
         for calculating the advantages of state-action pairs.
 
+        Data is stored time-major with one column per environment, i.e. every array
+        has the leading shape ``[size // num_envs, num_envs]``, and each environment
+        keeps track of the start of its own current path.
+
+        With ``device_storage`` all arrays are preallocated as torch tensors on
+        ``device``, so that :meth:`get` hands out views without any transfer.
+        Otherwise they are numpy arrays shared with the tensors returned by :meth:`get`.
+
         Important Note: Buffer collects only raw data received from environment.
         """
+        assert size % num_envs == 0, 'Buffer size must be divisible by num_envs.'
         self.actor_critic = actor_critic
         self.size = size
-        self.obs_buf = np.zeros(combined_shape(size, obs_dim), dtype=np.float32)
-        self.act_buf = np.zeros(combined_shape(size, act_dim), dtype=np.float32)
-        self.adv_buf = np.zeros(size, dtype=np.float32)
-        self.discounted_ret_buf = np.zeros(size, dtype=np.float32)
-        self.rew_buf = np.zeros(size, dtype=np.float32)
-        self.target_val_buf = np.zeros(size, dtype=np.float32)
-        self.val_buf = np.zeros(size, dtype=np.float32)
-        self.logp_buf = np.zeros(size, dtype=np.float32)
+        self.num_envs = num_envs
+        self.max_size = size // num_envs
+        self.device = device
+        self.device_storage = device_storage
+        self.obs_buf = self._zeros(combined_shape(self.max_size, combined_shape(num_envs, obs_dim)))
+        self.act_buf = self._zeros(combined_shape(self.max_size, combined_shape(num_envs, act_dim)))
+        self.adv_buf = self._zeros((self.max_size, num_envs))
+        self.discounted_ret_buf = self._zeros((self.max_size, num_envs))
+        self.rew_buf = self._zeros((self.max_size, num_envs))
+        self.target_val_buf = self._zeros((self.max_size, num_envs))
+        self.val_buf = self._zeros((self.max_size, num_envs))
+        self.logp_buf = self._zeros((self.max_size, num_envs))
         self.gamma = gamma
         self.lam = lam
         self.lam_c = lam_c
@@ -72,73 +85,114 @@ class Buffer:
         self.use_standardized_reward = standardized_reward
         self.use_standardized_cost = standardized_cost
         self.ptr = 0
-        self.path_start_idx = 0
-        self.max_size = size
+        self.path_start_idx = np.zeros(num_envs, dtype=int)
 
         # variables for cost-based RL
-        self.cost_buf = np.zeros(size, dtype=np.float32)
-        self.cost_val_buf = np.zeros(size, dtype=np.float32)
-        self.cost_adv_buf = np.zeros(size, dtype=np.float32)
-        self.target_cost_val_buf = np.zeros(size, dtype=np.float32)
+        self.cost_buf = self._zeros((self.max_size, num_envs))
+        self.cost_val_buf = self._zeros((self.max_size, num_envs))
+        self.cost_adv_buf = self._zeros((self.max_size, num_envs))
+        self.target_cost_val_buf = self._zeros((self.max_size, num_envs))
+
+        # path ends and the bootstrap values of the paths, see finish_path()
+        self.done_buf = self._zeros((self.max_size, num_envs), dtype=bool)
+        self.last_val_buf = self._zeros((self.max_size, num_envs))
+        self.last_cost_val_buf = self._zeros((self.max_size, num_envs))
+        self.penalty_buf = self._zeros((self.max_size, num_envs))
         self.use_reward_penalty = reward_penalty
-        self.device = device
 
         assert adv_estimation_method in ['gae', 'gae-rtg', 'vtrace', 'plain']
 
-    def calculate_adv_and_value_targets(self, vals, rews, lam=None):
-        """Compute the estimated advantage"""
+    def _zeros(self, shape, dtype=np.float32):
+        """allocate a zero-initialized storage array."""
+        if self.device_storage:
+            return torch.as_tensor(np.zeros(shape, dtype=dtype), device=self.device)
+        return np.zeros(shape, dtype=dtype)
 
-        if self.adv_estimation_method == 'gae':
-            # GAE formula: A_t = \sum_{k=0}^{n-1} (lam*gamma)^k delta_{t+k}
-            lam = self.lam if lam is None else lam
-            deltas = rews[:-1] + self.gamma * vals[1:] - vals[:-1]
-            adv = discount_cumsum(deltas, self.gamma * lam)
-            value_net_targets = adv + vals[:-1]
+    def _numpy(self, x_storage):
+        """view a storage array as numpy array, copied to CPU memory if necessary."""
+        if self.device_storage:
+            return x_storage.cpu().numpy()
+        return x_storage
+
+    def _tensor(self, x_array):
+        """convert an array to a float tensor on the buffer's device."""
+        return torch.as_tensor(x_array, dtype=torch.float32, device=self.device)
 
-        elif self.adv_estimation_method == 'gae-rtg':
+    def log_importance_ratios(self):
+        """
+        log-ratios of the probabilities of all stored actions under the current
+        policy and under the behavior policy which took them, computed with a
+        single forward pass of the actor over the whole epoch.
+        """
+        obs = self._tensor(self.obs_buf).reshape(self.size, -1)
+        if self.use_standardized_obs:
+            obs = self.actor_critic.obs_oms(obs, clip=False)
+        act = self._tensor(self.act_buf).reshape(self.size, -1)
+        with torch.no_grad():
+            # get current log_p of actions
+            _, log_p = self.actor_critic.actor(obs, act)
+        return log_p.reshape(self.max_size, self.num_envs) - self._tensor(self.logp_buf)
+
+    def _to_storage(self, x_array):
+        """convert an array before writing it to the storage."""
+        if self.device_storage:
+            return torch.as_tensor(x_array, dtype=torch.float32, device=self.device)
+        return x_array
+
+    # pylint: disable-next=too-many-arguments
+    def calculate_adv_and_value_targets(
+        self, vals, rews, last_vals, last_rews, lam=None, log_rhos=None
+    ):
+        """Compute the estimated advantage and the value targets of the whole epoch.
+
+        All arrays have the shape ``[steps, num_envs]``. ``last_vals`` and ``last_rews``
+        hold the bootstrap value of each path at its last step, where
+        :attr:`done_buf` is true, and are ignored elsewhere. ``log_rhos`` are the
+        importance log-ratios used by V-trace, see :meth:`log_importance_ratios`.
+        """
+        if self.adv_estimation_method in ['gae', 'gae-rtg', 'plain']:
+            # the paths of every environment are consecutive in environment-major order
+            segment_ends = self.segment_ends()
             # GAE formula: A_t = \sum_{k=0}^{n-1} (lam*gamma)^k delta_{t+k}
+            # while the plain advantage is the one step TD error, i.e. lam = 0
             lam = self.lam if lam is None else lam
-            deltas = rews[:-1] + self.gamma * vals[1:] - vals[:-1]
-            adv = discount_cumsum(deltas, self.gamma * lam)
+            adv, gae_targets, rewards_to_go = segment_gae(
+                rewards=self._env_major(rews),
+                values=self._env_major(vals),
+                last_values=self._env_major(last_vals)[segment_ends - 1],
+                segment_ends=segment_ends,
+                gamma=self.gamma,
+                lam=0.0 if self.adv_estimation_method == 'plain' else lam,
+                last_rewards=self._env_major(last_rews)[segment_ends - 1],
+            )
+            adv = self._time_major(adv)
+
+        if self.adv_estimation_method == 'gae':
+            value_net_targets = self._time_major(gae_targets)
+
+        elif self.adv_estimation_method in ['gae-rtg', 'plain']:
             # compute rewards-to-go, to be targets for the value function update
-            value_net_targets = discount_cumsum(rews, self.gamma)[:-1]
+            value_net_targets = self._time_major(rewards_to_go)
 
         elif self.adv_estimation_method == 'vtrace':
             #  v_s = V(x_s) + \sum^{T-1}_{t=s} \gamma^{t-s}
             #                * \prod_{i=s}^{t-1} c_i
             #                 * \rho_t (r_t + \gamma V(x_{t+1}) - V(x_t))
-            path_slice = slice(self.path_start_idx, self.ptr)
-
-            obs = (
-                self.actor_critic.obs_oms(self.obs_buf[path_slice], clip=False)
-                if self.use_standardized_obs
-                else self.obs_buf[path_slice]
-            )
-
-            obs = torch.as_tensor(obs, dtype=torch.float32)
-
-            act = self.act_buf[path_slice]
-            act = torch.as_tensor(act, dtype=torch.float32)
-            with torch.no_grad():
-                # get current log_p of actions
-                _, log_p = self.actor_critic.pi(obs, act)
-            value_net_targets, adv, _ = calculate_v_trace(
-                policy_action_probs=np.exp(log_p.numpy()),
-                values=vals,
-                rewards=rews,
-                behavior_action_probs=np.exp(self.logp_buf[path_slice]),
+            dones = self._numpy(self.done_buf)
+            # value of the next state, i.e. the bootstrap value at the end of a path
+            next_vals = np.append(vals[1:], np.zeros_like(vals[:1]), axis=0)
+            next_vals = np.where(dones, last_vals, next_vals)
+            v_s, adv, _ = calculate_batched_v_trace(
+                log_rhos=log_rhos,
+                values=self._tensor(vals),
+                rewards=self._tensor(rews),
+                next_values=self._tensor(next_vals),
+                dones=torch.as_tensor(dones, device=self.device),
                 gamma=self.gamma,
                 rho_bar=1.0,  # default is 1.0
                 c_bar=1.0,  # default is 1.0
             )
-
-        elif self.adv_estimation_method == 'plain':
-            # A(x, u) = Q(x, u) - V(x) = r(x, u) + gamma V(x+1) - V(x)
-            adv = rews[:-1] + self.gamma * vals[1:] - vals[:-1]
-
-            # compute rewards-to-go, to be targets for the value function update
-            # value_net_targets are just the discounted returns
-            value_net_targets = discount_cumsum(rews, self.gamma)[:-1]
+            value_net_targets, adv = v_s.cpu().numpy(), adv.cpu().numpy()
 
         else:
             raise NotImplementedError
@@ -148,13 +202,18 @@ class Buffer:
     # pylint: disable-next=too-many-arguments
     def store(self, obs, act, rew, val, logp, cost=0.0, cost_val=0.0):
         """
-        Append one timestep of agent-environment interaction to the buffer.
+        Append one timestep of agent-environment interaction to the buffer,
+        i.e. one row holding the data of all environments.
 
         Important Note: Store only raw data received from environment!!!
         Note: perform reward scaling if enabled
         """
         assert self.ptr < self.max_size, 'No empty space in buffer'
 
+        if self.device_storage:
+            obs, act, rew, val, logp, cost, cost_val = (
+                self._to_storage(x) for x in (obs, act, rew, val, logp, cost, cost_val)
+            )
         self.obs_buf[self.ptr] = obs
         self.act_buf[self.ptr] = act
         self.rew_buf[self.ptr] = rew
@@ -164,67 +223,137 @@ class Buffer:
         self.cost_val_buf[self.ptr] = cost_val
         self.ptr += 1
 
-    def finish_path(self, last_val=0, last_cost_val=0, penalty_param=0):
+    def finish_path(self, last_val=0, last_cost_val=0, penalty_param=0, env_idx=0):
         """
         Call this at the end of a trajectory, or when one gets cut off
-        by an epoch ending. This looks back in the buffer to where the
-        trajectory started, and uses rewards and value estimates from
-        the whole trajectory to compute advantage estimates with GAE-Lambda,
-        as well as compute the rewards-to-go for each state, to use as
-        the targets for the value function.
+        by an epoch ending. This marks the end of the trajectory, so that
+        advantage estimates with GAE-Lambda and the rewards-to-go of each state,
+        used as the targets for the value function, can be computed for all
+        trajectories of the epoch in one vectorized pass when calling :meth:`get`.
 
         The "last_val" argument should be 0 if the trajectory ended
         because the agent reached a terminal state (died), and otherwise
         should be V(s_T), the value function estimated for the last state.
         This allows us to bootstrap the reward-to-go calculation to account
         for timesteps beyond the arbitrary episode horizon (or epoch cutoff).
+
+        The "env_idx" argument selects the environment whose path is finished.
         """
+        if self.use_reward_penalty:
+            assert penalty_param >= 0, 'reward_penalty assumes positive value.'
+
+        path_slice = slice(self.path_start_idx[env_idx], self.ptr)
+        if path_slice.start == path_slice.stop:
+            return
+        self.penalty_buf[path_slice, env_idx] = penalty_param
+        self.done_buf[self.ptr - 1, env_idx] = True
+        self.last_val_buf[self.ptr - 1, env_idx] = float(last_val)
+        self.last_cost_val_buf[self.ptr - 1, env_idx] = float(last_cost_val)
+        self.path_start_idx[env_idx] = self.ptr
+
+    def _env_major(self, x_matrix):
+        """flatten a [steps, num_envs] array, so that each environment is consecutive."""
+        return x_matrix.T.reshape(-1)
 
-        path_slice = slice(self.path_start_idx, self.ptr)
-        rews = np.append(self.rew_buf[path_slice], last_val)
-        vals = np.append(self.val_buf[path_slice], last_val)
-        costs = np.append(self.cost_buf[path_slice], last_cost_val)
-        cost_vs = np.append(self.cost_val_buf[path_slice], last_cost_val)
+    def _time_major(self, x_vector):
+        """inverse of :meth:`_env_major`."""
+        return x_vector.reshape(self.num_envs, self.max_size).T
+
+    def segment_ends(self):
+        """
+        (exclusive) end indices of all paths in environment-major order,
+        unfinished paths end with their environment's column.
+        """
+        dones = self._numpy(self.done_buf).copy()
+        dones[-1] = True
+        return np.flatnonzero(self._env_major(dones)) + 1
+
+    def finish_epoch(self):
+        """
+        Compute the discounted returns, advantages and value targets of all
+        finished trajectories at once. Unfinished trajectories are treated as
+        terminated.
+        """
+        # the kernels run on numpy arrays of the per-step scalars only
+        rews, costs, vals, cost_vals = (
+            self._numpy(x) for x in (self.rew_buf, self.cost_buf, self.val_buf, self.cost_val_buf)
+        )
+        last_vals, last_cost_vals = (
+            self._numpy(x) for x in (self.last_val_buf, self.last_cost_val_buf)
+        )
 
         # new: add discounted returns to buffer
-        discounted_ret = discount_cumsum(rews, self.gamma)[:-1]
-        self.discounted_ret_buf[path_slice] = discounted_ret
+        self.discounted_ret_buf[:] = self._to_storage(
+            self._time_major(
+                segment_discount_cumsum(
+                    self._env_major(rews + self.gamma * last_vals), self.segment_ends(), self.gamma
+                )
+            )
+        )
 
+        # the bootstrap value is treated as the reward following the last step
+        last_rews = last_vals
         if self.use_reward_penalty:
-            assert penalty_param >= 0, 'reward_penalty assumes positive value.'
-            rews -= penalty_param * costs
+            penalty = self._numpy(self.penalty_buf)
+            rews = rews - penalty * costs
+            last_rews = last_rews - penalty * last_cost_vals
 
         if self.use_scaled_rewards:
-            rews = self.actor_critic.ret_oms(rews, subtract_mean=False, clip=True)
+            rews, last_rews = (
+                self.actor_critic.ret_oms(x.reshape(-1), subtract_mean=False, clip=True).reshape(
+                    x.shape
+                )
+                for x in (rews, last_rews)
+            )
 
-        adv, v_targets = self.calculate_adv_and_value_targets(vals, rews)
-        self.adv_buf[path_slice] = adv
-        self.target_val_buf[path_slice] = v_targets
+        log_rhos = None
+        if self.adv_estimation_method == 'vtrace':
+            # shared by the reward and the cost V-trace
+            log_rhos = self.log_importance_ratios()
+        adv, v_targets = self.calculate_adv_and_value_targets(
+            vals, rews, last_vals, last_rews, log_rhos=log_rhos
+        )
+        self.adv_buf[:] = self._to_storage(adv)
+        self.target_val_buf[:] = self._to_storage(v_targets)
 
         # calculate costs
-        c_adv, c_targets = self.calculate_adv_and_value_targets(cost_vs, costs, lam=self.lam_c)
-        self.cost_adv_buf[path_slice] = c_adv
-        self.target_cost_val_buf[path_slice] = c_targets
-
-        self.path_start_idx = self.ptr
+        c_adv, c_targets = self.calculate_adv_and_value_targets(
+            cost_vals, costs, last_cost_vals, last_cost_vals, lam=self.lam_c, log_rhos=log_rhos
+        )
+        self.cost_adv_buf[:] = self._to_storage(c_adv)
+        self.target_cost_val_buf[:] = self._to_storage(c_targets)
 
     def get(self):
         """
         Call this at the end of an epoch to get all of the data from
         the buffer, with advantages appropriately normalized (shifted to have
         mean zero and std one). Also, resets some pointers in the buffer.
+
+        The returned tensors are views of the buffer's storage, they stay valid
+        until the buffer is filled again in the next epoch.
         """
         assert self.ptr == self.max_size  # buffer has to be full before you can get
-        self.ptr, self.path_start_idx = 0, 0
+        self.finish_epoch()
+        self.ptr = 0
+        self.path_start_idx[:] = 0
+        self.done_buf[:] = False
+        self.last_val_buf[:] = 0.0
+        self.last_cost_val_buf[:] = 0.0
 
         if self.use_standardized_reward:
-            adv_mean, adv_std, *_ = distributed_utils.mpi_statistics_scalar(self.adv_buf)
-            self.adv_buf = (self.adv_buf - adv_mean) / (adv_std + 1.0e-8)
+            adv_mean, adv_std, *_ = distributed_utils.mpi_statistics_scalar(
+                self._numpy(self.adv_buf).reshape(-1)
+            )
+            # plain floats, in-place arithmetic with tensors would replace numpy storage
+            self.adv_buf -= float(adv_mean)
+            self.adv_buf /= float(adv_std) + 1.0e-8
 
         if self.use_standardized_cost:
             # also for cost advantages; only re-center but no rescale!
-            cadv_mean, *_ = distributed_utils.mpi_statistics_scalar(self.cost_adv_buf)
-            self.cost_adv_buf = self.cost_adv_buf - cadv_mean
+            cadv_mean, *_ = distributed_utils.mpi_statistics_scalar(
+                self._numpy(self.cost_adv_buf).reshape(-1)
+            )
+            self.cost_adv_buf -= float(cadv_mean)
 
         data = dict(
             obs=self.obs_buf,
@@ -237,8 +366,11 @@ class Buffer:
             target_c=self.target_cost_val_buf,
         )
 
+        # flatten the time and environment dimensions,
+        # the tensors share their memory with the buffer on CPU or with device storage
         return {
-            k: torch.as_tensor(v, device=self.device, dtype=torch.float32) for k, v in data.items()
+            k: torch.as_tensor(v.reshape(self.size, *v.shape[2:]), device=self.device)
+            for k, v in data.items()
         }
 
     def pre_process_data(self):
@@ -247,7 +379,9 @@ class Buffer:
             enabled by arguments.
         """
         raw_data = self.get()
-        data = deepcopy(raw_data)
+        # only the standardized observations are newly allocated,
+        # all other entries are shared with raw_data
+        data = dict(raw_data)
         # Note: use_reward_scaling is currently applied in Buffer...
         # If self.use_reward_scaling:
         #     rew = self.ac.ret_oms(data['rew'], subtract_mean=False, clip=True)
@@ -0,0 +1,144 @@
+# Copyright 2022 OmniSafe Team. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Implementation of the background writer of checkpoints."""
+
+import copy
+import math
+import os
+import queue
+import threading
+
+import numpy as np
+import torch
+
+
+def snapshot(obj):
+    """
+    A copy of ``obj`` whose tensors live on the CPU, so that the training may
+    go on modifying the original while the copy is written.
+
+    Modules are replaced by their state dicts.
+    """
+    if isinstance(obj, torch.nn.Module):
+        return snapshot(obj.state_dict())
+    if isinstance(obj, torch.Tensor):
+        return obj.detach().to('cpu', copy=True)
+    if isinstance(obj, np.ndarray):
+        return obj.copy()
+    if isinstance(obj, dict):
+        return type(obj)((key, snapshot(value)) for key, value in obj.items())
+    if type(obj) in (list, tuple):
+        return type(obj)(snapshot(value) for value in obj)
+    return copy.deepcopy(obj)
+
+
+def atomic_save(obj, fname: str) -> None:
+    """Save ``obj`` under a temporary name and rename it, so that ``fname`` is always complete."""
+    torch.save(obj, fname + '.tmp')
+    os.replace(fname + '.tmp', fname)
+
+
+def select_checkpoints(scores: dict, keep_last: int, keep_best: int = 0) -> set:
+    """
+    The checkpoints to keep of ``scores``, which maps the epoch of every checkpoint
+    to its score, None if unknown.
+
+    Returns:
+        the epochs of the latest ``keep_last`` checkpoints and of the ``keep_best``
+        ones with the highest scores.
+    """
+    epochs = sorted(scores)
+    keep = set(epochs[-keep_last:]) if keep_last > 0 else set()
+    scored = [
+        epoch
+        for epoch in epochs
+        if scores[epoch] is not None and not math.isnan(float(scores[epoch]))
+    ]
+    scored.sort(key=lambda epoch: float(scores[epoch]), reverse=True)
+    return keep | set(scored[:keep_best])
+
+
+class CheckpointWriter:
+    """
+    Writes checkpoints in a background thread while the training continues.
+
+    :meth:`save` takes a snapshot on the CPU and returns once it is queued.
+    At most ``max_pending`` snapshots wait to be written, further calls block until
+    one of them is done, which bounds the memory held by the snapshots.
+    Errors of the writer are raised by the next call of :meth:`save` or :meth:`flush`.
+    """
+
+    def __init__(self, max_pending: int = 2, asynchronous: bool = True) -> None:
+        """Initialize the writer.
+
+        Args:
+            max_pending (int): the number of snapshots which may wait to be written.
+            asynchronous (bool): whether to write in a background thread, otherwise
+                :meth:`save` only returns once the file is written.
+        """
+        assert max_pending > 0, 'max_pending must be a positive integer.'
+        self.asynchronous = asynchronous
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.thread = None
+        if asynchronous:
+            self.thread = threading.Thread(target=self._run, name='CheckpointWriter', daemon=True)
+            self.thread.start()
+
+    def _run(self) -> None:
+        """Write the queued snapshots until :meth:`close` is called."""
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except Exception as error:  # pylint: disable=broad-except
+                self.error = error
+            finally:
+                self.queue.task_done()
+
+    @staticmethod
+    def _write(obj, fname: str, on_saved=None) -> None:
+        atomic_save(obj, fname)
+        if on_saved is not None:
+            on_saved()
+
+    def _raise_error(self) -> None:
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise RuntimeError('Writing a checkpoint failed.') from error
+
+    def save(self, obj, fname: str, on_saved=None) -> None:
+        """Write a snapshot of ``obj`` to ``fname``, then call ``on_saved`` if given."""
+        self._raise_error()
+        obj = snapshot(obj)
+        if self.thread is None:
+            self._write(obj, fname, on_saved)
+        else:
+            self.queue.put((obj, fname, on_saved))
+
+    def flush(self) -> None:
+        """Wait until all queued snapshots are written."""
+        if self.thread is not None:
+            self.queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        """Write the queued snapshots and stop the background thread."""
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        self._raise_error()
@@ -71,3 +71,21 @@ class Lagrange(abc.ABC):
         self.lagrangian_multiplier.data.clamp_(
             0, self.lagrangian_upper_bound
         )  # enforce: lambda in [0, inf]
+
+    def lagrange_state_dict(self) -> dict:
+        """The state of the Lagrange multiplier and its optimizer.
+
+        Named apart from ``state_dict`` of the algorithms, which inherit from this class.
+        """
+        return {
+            'lagrangian_multiplier': self.lagrangian_multiplier.detach().clone(),
+            'lambda_optimizer': self.lambda_optimizer.state_dict(),
+        }
+
+    def load_lagrange_state_dict(self, state: dict) -> None:
+        """Restore a state of :meth:`lagrange_state_dict`.
+
+        The multiplier is updated in place, as it may be shared, e.g. with a planner.
+        """
+        self.lagrangian_multiplier.data.copy_(state['lagrangian_multiplier'])
+        self.lambda_optimizer.load_state_dict(state['lambda_optimizer'])
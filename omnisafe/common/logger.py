@@ -15,17 +15,28 @@
 """Implementation of the Logger."""
 
 import atexit
+import functools
 import json
 import os
 import os.path as osp
+import re
 import time
 
-import numpy as np
 import torch
-from torch.utils.tensorboard import SummaryWriter
 
-from omnisafe.utils.distributed_utils import mpi_statistics_scalar, proc_id
-from omnisafe.utils.logger_utils import colorize, convert_json
+from omnisafe.common.checkpoint_writer import CheckpointWriter, select_checkpoints
+from omnisafe.utils.distributed_utils import (
+    broadcast_object,
+    mpi_reduce_moments,
+    mpi_statistics_from_moments,
+    proc_id,
+    statistics_from_moments,
+)
+from omnisafe.utils.logger_utils import StatsAccumulator, colorize, convert_json
+
+
+# start time of the process, used to name the log directory
+START_TIME = time.strftime('%Y-%m-%d_%H-%M-%S')
 
 
 # pylint: disable-next=too-many-instance-attributes
@@ -41,12 +52,33 @@ class Logger:
         debug=False,
         level=1,
         datestamp=True,
-        hms_time=time.strftime('%Y-%m-%d_%H-%M-%S'),
+        hms_time=None,
         use_tensor_board=True,
         verbose=True,
         seed=None,
+        reservoir_size=0,
+        resume=False,
+        async_save=True,
+        keep_checkpoints=1,
+        keep_best_checkpoints=0,
+        best_metric='Metrics/EpRet',
     ):
-        """Initialize the logger."""
+        """Initialize the logger.
+
+        Stored values are reduced to running statistics right away, if ``reservoir_size``
+        is positive a random sample of that many values per key is kept in addition and
+        written as histogram to tensorboard.
+
+        The log directory is named after ``hms_time``, by default the launch time of the
+        run as set by :func:`mpi_fork`, so that restarted workers find it again. With
+        ``resume`` the progress of an existing log directory is continued.
+
+        Models and checkpoints are written by a :class:`CheckpointWriter`, in a background
+        thread if ``async_save``. The latest ``keep_checkpoints`` checkpoints are kept, and
+        the ``keep_best_checkpoints`` ones with the highest ``best_metric`` of the epoch.
+        """
+        if hms_time is None:
+            hms_time = os.getenv('OMNISAFE_RUN_TIME', START_TIME)
         relpath = hms_time if datestamp else ''
         if seed is not None:
             subfolder = '-'.join(['seed', str(seed).zfill(3)])
@@ -57,11 +89,17 @@ class Logger:
         # only the MPI root process is allowed to print information to console
         self.verbose = verbose if proc_id() == 0 else False
 
+        # the header of an output file which is continued is already written
+        self.resumed_output = False
         if proc_id() == 0:
             os.makedirs(self.log_dir, exist_ok=True)
+            output_path = osp.join(self.log_dir, output_fname)
+            self.resumed_output = (
+                resume and osp.exists(output_path) and osp.getsize(output_path) > 0
+            )
             # pylint: disable-next=consider-using-with
             self.output_file = open(
-                osp.join(self.log_dir, output_fname), encoding='utf-8', mode='w'
+                output_path, encoding='utf-8', mode='a' if self.resumed_output else 'w'
             )
             atexit.register(self.output_file.close)
             print(colorize(f'Logging data to {self.output_file.name}', 'cyan', bold=True))
@@ -74,15 +112,38 @@ class Logger:
         self.log_current_row = {}
         self.exp_name = exp_name
         self.torch_saver_elements = None
+        # the row of the last call of dump_tabular, to score checkpoints by
+        self.last_row = {}
+
+        assert keep_checkpoints > 0, 'The latest checkpoint is always kept.'
+        self.keep_checkpoints = keep_checkpoints
+        self.keep_best_checkpoints = keep_best_checkpoints
+        self.best_metric = best_metric
+        self.checkpoint_scores = {}
+        self.writer = None
+        if proc_id() == 0:
+            self.writer = CheckpointWriter(asynchronous=async_save)
+            atexit.register(self.writer.close)
+            scores_path = osp.join(self.log_dir, 'checkpoints', 'scores.json')
+            if resume and osp.exists(scores_path):
+                with open(scores_path, encoding='utf-8') as file:
+                    self.checkpoint_scores = {
+                        int(epoch): score for epoch, score in json.load(file).items()
+                    }
 
         # Setup tensor board logging if enabled and MPI root process
-        self.summary_writer = (
-            SummaryWriter(os.path.join(self.log_dir, 'tb'))
-            if use_tensor_board and proc_id() == 0
-            else None
-        )
+        self.summary_writer = None
+        if use_tensor_board and proc_id() == 0:
+            # tensorboard is slow to import, so only load it when it is used
+            # pylint: disable-next=import-outside-toplevel
+            from torch.utils.tensorboard import SummaryWriter
 
+            self.summary_writer = SummaryWriter(os.path.join(self.log_dir, 'tb'))
+
+        self.reservoir_size = reservoir_size
         self.epoch_dict = {}
+        self.histograms = {}
+        self.pending_stats = []
 
     def log(self, msg, color='green'):
         """Print a colorized message to stdout."""
@@ -94,12 +155,12 @@ class Logger:
         Save something into the epoch_logger's current state.
 
         Provide an arbitrary number of keyword arguments with numerical
-        values.
+        values, i.e. scalars or arrays whose elements are all recorded.
         """
         for key, value in kwargs.items():
             if key not in self.epoch_dict:
-                self.epoch_dict[key] = []
-            self.epoch_dict[key].append(value)
+                self.epoch_dict[key] = StatsAccumulator(self.reservoir_size)
+            self.epoch_dict[key].update(value)
 
     def log_single_value(self, key, val):
         """
@@ -122,22 +183,49 @@ class Logger:
         self.log_current_row[key] = val
 
     def log_tabular(self, key, val=None, min_and_max=False, std=False):
-        """log_tabular"""
+        """
+        log_tabular
+
+        Without ``val`` the statistics of the values stored under ``key`` are logged.
+        They are computed in :meth:`dump_tabular`, together with the statistics of all
+        other keys, so that all processes are synchronized with a single collective.
+        """
 
         if val is not None:
             self.log_single_value(key, val)
         else:
-            stats = self.get_stats(key, min_and_max)
+            assert key in self.epoch_dict, f'key={key} not in dict'
             if min_and_max or std:
-                self.log_single_value(key + '/Mean', stats[0])
+                columns = [key + '/Mean']
             else:
-                self.log_single_value(key, stats[0])
+                columns = [key]
             if std:
-                self.log_single_value(key + '/Std', stats[1])
+                columns.append(key + '/Std')
             if min_and_max:
-                self.log_single_value(key + '/Min', stats[2])
-                self.log_single_value(key + '/Max', stats[3])
-        self.epoch_dict[key] = []
+                columns += [key + '/Min', key + '/Max']
+            # reserve the columns, the values are filled in by dump_tabular
+            for column in columns:
+                self.log_single_value(column, None)
+            self.pending_stats.append((columns, self.epoch_dict[key].moments(), std, min_and_max))
+            if self.reservoir_size > 0:
+                self.histograms[key] = self.epoch_dict[key].samples()
+        if key in self.epoch_dict:
+            self.epoch_dict[key].reset()
+
+    def reduce_pending_stats(self):
+        """Compute the statistics of all keys logged with log_tabular in one collective."""
+        if not self.pending_stats:
+            return
+        moments = mpi_reduce_moments([moments for _, moments, *_ in self.pending_stats])
+        for (columns, _, std, min_and_max), key_moments in zip(self.pending_stats, moments):
+            stats = statistics_from_moments(key_moments, with_min_and_max=True)
+            values = [stats[0]]
+            if std:
+                values.append(stats[1])
+            if min_and_max:
+                values += [stats[2], stats[3]]
+            self.log_current_row.update(zip(columns, values))
+        self.pending_stats.clear()
 
     def save_config(self, config):
         """Save the configuration of the experiment."""
@@ -156,11 +244,14 @@ class Logger:
         """Get the statistics of a key."""
         assert key in self.epoch_dict, f'key={key} not in dict'
 
-        val = self.epoch_dict[key]
-        vals = (
-            np.concatenate(val) if isinstance(val[0], np.ndarray) and len(val[0].shape) > 0 else val
+        return mpi_statistics_from_moments(
+            self.epoch_dict[key].moments(), with_min_and_max=with_min_and_max
         )
-        return mpi_statistics_scalar(vals, with_min_and_max=with_min_and_max)
+
+    def get_samples(self, key):
+        """Get the reservoir sample of a key, empty if ``reservoir_size`` is 0."""
+        assert key in self.epoch_dict, f'key={key} not in dict'
+        return self.epoch_dict[key].samples()
 
     def dump_tabular(self) -> None:
         """
@@ -168,6 +259,7 @@ class Logger:
 
         Writes both to stdout, and to the output file.
         """
+        self.reduce_pending_stats()
         if proc_id() == 0:
             vals = []
             self.epoch += 1
@@ -189,10 +281,11 @@ class Logger:
                 vals.append(val)
             if self.verbose and self.level > 0:
                 print('-' * n_slashes, flush=True)
+            self.last_row = dict(zip(self.log_headers, vals))
 
             # Write into the output file (can be any text file format, e.g. CSV)
             if self.output_file is not None:
-                if self.first_row:
+                if self.first_row and not self.resumed_output:
                     self.output_file.write(' '.join(self.log_headers) + '\n')
                 self.output_file.write(' '.join(map(str, vals)) + '\n')
                 self.output_file.flush()
@@ -200,6 +293,9 @@ class Logger:
             if self.summary_writer is not None:
                 for key, value in zip(self.log_headers, vals):
                     self.summary_writer.add_scalar(key, value, global_step=self.epoch)
+                for key, samples in self.histograms.items():
+                    if len(samples) > 0:
+                        self.summary_writer.add_histogram(key, samples, global_step=self.epoch)
 
                 # Flushes the event file to disk. Call this method to make sure
                 # that all pending events have been written to disk.
@@ -207,11 +303,12 @@ class Logger:
 
         # free logged information in all processes...
         self.log_current_row.clear()
+        self.histograms.clear()
         self.first_row = False
 
         # Check if all values from dict are dumped -> prevent memory overflow
         for key, value in self.epoch_dict.items():
-            if len(value) > 0:
+            if value.count > 0:
                 print(f'epoch_dict: key={key} was not logged.')
 
     def setup_torch_saver(self, what_to_save: dict):
@@ -221,6 +318,8 @@ class Logger:
     def torch_save(self, itr=None):
         """
         Saves the PyTorch model (or models).
+
+        The models are copied right away and written by the checkpoint writer.
         """
         if proc_id() == 0:
             assert (
@@ -236,7 +335,88 @@ class Logger:
                 k: v.state_dict() if isinstance(v, torch.nn.Module) else v
                 for k, v in self.torch_saver_elements.items()
             }
-            torch.save(params, fname)
+            self.writer.save(params, fname)
+
+    def save_checkpoint(self, state: dict, epoch: int):
+        """
+        Save the full training state after ``epoch`` on the root process.
+
+        The state is copied to the CPU right away and written by the checkpoint writer,
+        under a temporary name and renamed afterwards, so that an interrupted write never
+        replaces a complete checkpoint. Older checkpoints are removed once it is written,
+        apart from the ones to keep, see :class:`Logger`.
+        """
+        if proc_id() != 0:
+            return
+        fpath = osp.join(self.log_dir, 'checkpoints')
+        os.makedirs(fpath, exist_ok=True)
+        score = self.last_row.get(self.best_metric)
+        self.checkpoint_scores[epoch] = None if score is None else float(score)
+        keep = select_checkpoints(
+            self.checkpoint_scores, self.keep_checkpoints, self.keep_best_checkpoints
+        )
+        self.checkpoint_scores = {epoch: self.checkpoint_scores[epoch] for epoch in sorted(keep)}
+        self.writer.save(
+            state,
+            osp.join(fpath, f'epoch-{epoch}.pt'),
+            on_saved=functools.partial(self._prune_checkpoints, dict(self.checkpoint_scores)),
+        )
+
+    def _prune_checkpoints(self, scores: dict):
+        """Remove the checkpoints which are not in ``scores`` and save the scores."""
+        fpath = osp.join(self.log_dir, 'checkpoints')
+        for epoch, fname in self.list_checkpoints():
+            if epoch not in scores:
+                os.remove(fname)
+        with open(osp.join(fpath, 'scores.json.tmp'), encoding='utf-8', mode='w') as file:
+            json.dump(scores, file)
+        os.replace(osp.join(fpath, 'scores.json.tmp'), osp.join(fpath, 'scores.json'))
+
+    def list_checkpoints(self, fpath=None) -> list:
+        """
+        The checkpoints in ``fpath`` as (epoch, file name), sorted by epoch.
+
+        ``fpath`` is the checkpoint directory of this log directory if None.
+        """
+        fpath = osp.join(self.log_dir, 'checkpoints') if fpath is None else fpath
+        checkpoints = []
+        if osp.isdir(fpath):
+            for fname in os.listdir(fpath):
+                match = re.fullmatch(r'epoch-(\d+)\.pt', fname)
+                if match:
+                    checkpoints.append((int(match.group(1)), osp.join(fpath, fname)))
+        return sorted(checkpoints)
+
+    def load_checkpoint(self, fname=None):
+        """
+        Load a checkpoint, the latest one of the log directory if ``fname`` is None.
+
+        ``fname`` may also be the log directory of another run, or its checkpoint
+        directory, to load the latest checkpoint saved there.
+        The root process reads the file and sends the state to all other processes,
+        so only the root process needs access to it.
+
+        Returns:
+            the saved state, or None if there is no checkpoint.
+        """
+        state = None
+        if proc_id() == 0:
+            # the latest checkpoint may still be queued
+            self.writer.flush()
+            if fname is None or osp.isdir(fname):
+                fpath = fname
+                if fpath is not None and osp.isdir(osp.join(fpath, 'checkpoints')):
+                    fpath = osp.join(fpath, 'checkpoints')
+                checkpoints = self.list_checkpoints(fpath)
+                fname = checkpoints[-1][1] if checkpoints else None
+            if fname is not None:
+                try:
+                    # the checkpoints also hold numpy arrays, e.g. random number generator states
+                    state = torch.load(fname, map_location='cpu', weights_only=False)
+                except TypeError:  # torch < 1.13 always loads arbitrary objects
+                    state = torch.load(fname, map_location='cpu')
+                self.log(f'Loaded checkpoint {fname}', color='cyan')
+        return broadcast_object(state)
 
     def close(self):
         """
@@ -246,3 +426,4 @@ class Logger:
         """
         if proc_id() == 0:
             self.output_file.close()
+            self.writer.close()
@@ -76,3 +76,24 @@ class PIDLagrangian(abc.ABC):
         if not (self.diff_norm or self.sum_norm):
             self.cost_penalty = min(self.cost_penalty, self.penalty_max)
         self.cost_ds.append(self._cost_d)
+
+    def pid_state_dict(self) -> dict:
+        """The state of the PID controller.
+
+        Named apart from ``state_dict`` of the algorithms, which inherit from this class.
+        """
+        return {
+            'pid_i': self.pid_i,
+            'cost_ds': list(self.cost_ds),
+            'delta_p': self._delta_p,
+            'cost_d': self._cost_d,
+            'cost_penalty': self.cost_penalty,
+        }
+
+    def load_pid_state_dict(self, state: dict) -> None:
+        """Restore a state of :meth:`pid_state_dict`."""
+        self.pid_i = state['pid_i']
+        self.cost_ds = deque(state['cost_ds'], maxlen=self.pid_d_delay)
+        self._delta_p = state['delta_p']
+        self._cost_d = state['cost_d']
+        self.cost_penalty = state['cost_penalty']
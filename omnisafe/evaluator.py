@@ -20,7 +20,6 @@ import os
 import numpy as np
 import torch
 from gymnasium.spaces import Box, Discrete
-from gymnasium.utils.save_video import save_video
 
 from omnisafe.models.actor import ActorBuilder
 from omnisafe.utils.config_utils import dict2namedtuple
@@ -41,18 +40,24 @@ class Evaluator:  # pylint: disable=too-many-instance-attributes
         obs_oms=None,
         play=True,
         save_replay=True,
+        num_envs=1,
+        use_subprocess_env=False,
     ):
         """Initialize the evaluator.
         Args:
             env (gymnasium.Env): the environment. if None, the environment will be created from the config.
             pi (omnisafe.algos.models.actor.Actor): the policy. if None, the policy will be created from the config.
             obs_oms (omnisafe.algos.models.obs_oms.ObsOMS): the observation OMS. Only used if obs_oms is not None.
+            num_envs (int): number of environments evaluating episodes in parallel.
+            use_subprocess_env (bool): whether to step each environment in a worker process.
         """
         # set the attributes
         self.env = env
         self.actor = actor
         self.obs_oms = obs_oms if obs_oms is not None else lambda x: x
         self.env_wrapper_class = type(env) if env is not None else None
+        self.num_envs = num_envs
+        self.use_subprocess_env = use_subprocess_env
 
         # Used when load model from saved file.
         self.cfg = None
@@ -147,7 +152,6 @@ class Evaluator:  # pylint: disable=too-many-instance-attributes
         else:
             self.obs_oms = lambda x: x
 
-    # pylint: disable-next=too-many-locals
     def evaluate(
         self,
         num_episodes: int = 10,
@@ -167,6 +171,23 @@ class Evaluator:  # pylint: disable=too-many-instance-attributes
                 'The environment and the policy must be provided or created before evaluating the agent.'
             )
 
+        if getattr(self.env, 'num_envs', 1) > 1:
+            episode_rewards, episode_costs, episode_lengths = self._evaluate_env_pool(
+                num_episodes, cost_criteria
+            )
+        else:
+            episode_rewards, episode_costs, episode_lengths = self._evaluate_env(
+                num_episodes, cost_criteria
+            )
+
+        print('Evaluation results:')
+        print(f'Average episode reward: {np.mean(episode_rewards):.3f}')
+        print(f'Average episode cost: {np.mean(episode_costs):.3f}')
+        print(f'Average episode length: {np.mean(episode_lengths):.3f}')
+        return episode_rewards, episode_costs, episode_lengths
+
+    def _evaluate_env(self, num_episodes: int, cost_criteria: float):
+        """Evaluate num_episodes episodes one after another."""
         episode_rewards = []
         episode_costs = []
         episode_lengths = []
@@ -193,10 +214,48 @@ class Evaluator:  # pylint: disable=too-many-instance-attributes
                     episode_lengths.append(step + 1)
                     break
 
-        print('Evaluation results:')
-        print(f'Average episode reward: {np.mean(episode_rewards):.3f}')
-        print(f'Average episode cost: {np.mean(episode_costs):.3f}')
-        print(f'Average episode length: {np.mean(episode_lengths):.3f}')
+        return episode_rewards, episode_costs, episode_lengths
+
+    # pylint: disable-next=too-many-locals
+    def _evaluate_env_pool(self, num_episodes: int, cost_criteria: float):
+        """Evaluate num_episodes episodes in parallel in the environments of the env pool."""
+        episode_rewards = []
+        episode_costs = []
+        episode_lengths = []
+        env_pool = self.env.env_pool
+        horizon = self.env.max_ep_len
+
+        obs, _ = env_pool.reset()
+        ep_ret = np.zeros(env_pool.num_envs)
+        ep_cost = np.zeros(env_pool.num_envs)
+        ep_len = np.zeros(env_pool.num_envs, dtype=int)
+        active = np.arange(min(env_pool.num_envs, num_episodes))
+        num_started = len(active)
+        while len(active) > 0:
+            with torch.no_grad():
+                act = self.actor.predict(
+                    self.obs_oms(torch.as_tensor(obs[active], dtype=torch.float32)),
+                    deterministic=True,
+                    need_log_prob=False,
+                )
+            obs[active], rew, cost, done, truncated, _ = env_pool.step(act.numpy(), active)
+            ep_ret[active] += rew
+            ep_cost[active] += (cost_criteria ** ep_len[active]) * cost
+            ep_len[active] += 1
+
+            finished = active[done | truncated | (ep_len[active] >= horizon)]
+            for env_idx in finished:
+                episode_rewards.append(ep_ret[env_idx])
+                episode_costs.append(ep_cost[env_idx])
+                episode_lengths.append(ep_len[env_idx])
+            # restart finished environments while episodes are left
+            restart = finished[: num_episodes - num_started]
+            num_started += len(restart)
+            if len(restart) > 0:
+                obs[restart], _ = env_pool.reset(restart)
+                ep_ret[restart], ep_cost[restart], ep_len[restart] = 0.0, 0.0, 0
+            active = np.setdiff1d(active, finished[len(restart) :])
+
         return episode_rewards, episode_costs, episode_lengths
 
     def render(  # pylint: disable=too-many-locals,too-many-arguments,too-many-branches,too-many-statements
@@ -308,6 +367,9 @@ class Evaluator:  # pylint: disable=too-many-instance-attributes
                     frames = self.env.render()
 
                 if save_replay_path is not None:
+                    # pylint: disable-next=import-outside-toplevel
+                    from gymnasium.utils.save_video import save_video
+
                     save_video(
                         frames,
                         save_replay_path,
@@ -334,4 +396,9 @@ class Evaluator:  # pylint: disable=too-many-instance-attributes
             return SimmerEnvWrapper(env_id, env_cfgs, **env_kwargs)
         if self.algo_name in ['PPOSaute', 'PPOLagSaute']:
             return SauteEnvWrapper(env_id, env_cfgs, **env_kwargs)
-        return EnvWrapper(env_id, **env_kwargs)
+        return EnvWrapper(
+            env_id,
+            num_envs=self.num_envs,
+            use_subprocess_env=self.use_subprocess_env,
+            **env_kwargs,
+        )
@@ -15,7 +15,6 @@
 """Some Core Functions"""
 
 import numpy as np
-import scipy.signal
 import torch
 
 
@@ -77,4 +76,104 @@ def discount_cumsum(x_vector, discount):
          x1 + discount * x2,
          x2]
     """
+    # scipy is slow to import, so only load it when it is used
+    import scipy.signal  # pylint: disable=import-outside-toplevel
+
     return scipy.signal.lfilter([1], [1, float(-discount)], x_vector[::-1], axis=0)[::-1]
+
+
+def masked_discount_cumsum(x_matrix, dones, discount):
+    """
+    discounted cumulative sums along the first (time) axis,
+    restarted after every step flagged in ``dones``.
+
+    Every column of ``x_matrix`` may hold several paths, a path ends at each
+    step where ``dones`` is true. All paths are computed with a single
+    :func:`discount_cumsum` call over the whole matrix, after which the part
+    leaking in from the following path is subtracted:
+    ``y_t = z_t + discount^(e + 1 - t) * y_(e + 1)``,
+    where ``e`` is the last step of the path containing ``t``.
+
+    input:
+        x_matrix and dones of shape [time, ...]
+    output:
+        the discounted cumulative sums of each path, with the shape of x_matrix.
+    """
+    x_matrix = np.asarray(x_matrix, dtype=np.float64)
+    dones = np.asarray(dones, dtype=bool)
+    horizon = x_matrix.shape[0]
+    full = discount_cumsum(x_matrix, discount)
+
+    # index of the last step of the path containing each step
+    steps = np.arange(horizon).reshape((horizon,) + (1,) * (x_matrix.ndim - 1))
+    path_end = np.where(dones, steps, horizon)
+    path_end = np.minimum.accumulate(path_end[::-1], axis=0)[::-1]
+
+    # discounted sum starting at the first step of the next path
+    next_full = np.concatenate([full, np.zeros_like(full[:1])])
+    carry = np.take_along_axis(next_full, np.minimum(path_end + 1, horizon), axis=0)
+    return full - np.power(float(discount), path_end + 1 - steps) * carry
+
+
+def segment_dones(segment_ends, length: int):
+    """
+    convert the (exclusive) end indices of consecutive segments of an array
+    of the given length into a mask flagging the last step of every segment.
+    """
+    dones = np.zeros(length, dtype=bool)
+    dones[np.asarray(segment_ends, dtype=int) - 1] = True
+    return dones
+
+
+def segment_discount_cumsum(x_vector, segment_ends, discount):
+    """
+    discounted cumulative sums of all segments of x_vector in one pass.
+
+    input:
+        vector x of a whole epoch, e.g. [x0, x1, x2, x3, x4],
+        and the (exclusive) end indices of its segments, e.g. [2, 5]
+    output:
+        [x0 + discount * x1,
+         x1,
+         x2 + discount * x3 + discount^2 * x4,
+         x3 + discount * x4,
+         x4]
+    """
+    return masked_discount_cumsum(x_vector, segment_dones(segment_ends, len(x_vector)), discount)
+
+
+# pylint: disable-next=too-many-arguments
+def segment_gae(rewards, values, last_values, segment_ends, gamma, lam, last_rewards=None):
+    """
+    GAE-Lambda advantages, value targets and rewards-to-go of all segments of
+    an epoch in one pass.
+
+    Args:
+        rewards (np.ndarray): rewards of the whole epoch.
+        values (np.ndarray): value estimates of the whole epoch.
+        last_values (np.ndarray): bootstrap value of every segment, 0 if the
+            segment ended in a terminal state.
+        segment_ends (np.ndarray): (exclusive) end indices of the segments.
+        gamma (float): discount factor.
+        lam (float): GAE-Lambda.
+        last_rewards (np.ndarray): bootstrap of every segment for the rewards-to-go,
+            ``last_values`` if None.
+
+    Returns:
+        the advantages, the value targets (advantages plus values) and the
+        discounted rewards-to-go including the bootstrap values.
+    """
+    dones = segment_dones(segment_ends, len(rewards))
+    bootstrap = np.zeros(len(rewards), dtype=np.float64)
+    bootstrap[dones] = last_values
+    last_rewards = last_values if last_rewards is None else last_rewards
+    bootstrap_rewards = np.zeros(len(rewards), dtype=np.float64)
+    bootstrap_rewards[dones] = last_rewards
+
+    # GAE formula: A_t = \sum_{k=0}^{n-1} (lam*gamma)^k delta_{t+k}
+    next_values = np.append(values[1:], 0.0)
+    next_values = np.where(dones, bootstrap, next_values)
+    deltas = rewards + gamma * next_values - values
+    adv = masked_discount_cumsum(deltas, dones, gamma * lam)
+    rewards_to_go = masked_discount_cumsum(rewards + gamma * bootstrap_rewards, dones, gamma)
+    return adv, adv + values, rewards_to_go
@@ -0,0 +1,105 @@
+# Copyright 2022 OmniSafe Team. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Placement of processes on the physical cores of a node."""
+
+import functools
+import glob
+import os
+import re
+
+
+SYSFS_CPU = '/sys/devices/system/cpu'
+SYSFS_NODE = '/sys/devices/system/node'
+
+
+def is_supported() -> bool:
+    """Whether the platform allows to pin processes, i.e. Linux."""
+    return hasattr(os, 'sched_setaffinity')
+
+
+def parse_cpulist(cpulist: str) -> list:
+    """Parse a cpulist as found in sysfs, e.g. ``'0-3,8,10-11'``."""
+    cpus = []
+    for part in cpulist.strip().split(','):
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def _read(path: str, default: str = None) -> str:
+    try:
+        with open(path, encoding='utf-8') as file:
+            return file.read().strip()
+    except OSError:
+        return default
+
+
+@functools.lru_cache(maxsize=None)
+def physical_cores() -> tuple:
+    """
+    The physical cores available to this process, each as a tuple of its logical CPUs.
+
+    The cores are ordered by NUMA node, so that consecutive cores share a node.
+    The result is cached, as pinning the process shrinks the available CPUs.
+    """
+    available = sorted(os.sched_getaffinity(0)) if is_supported() else list(range(os.cpu_count()))
+    cpu_node = {}
+    for node_dir in glob.glob(os.path.join(SYSFS_NODE, 'node[0-9]*')):
+        node = int(re.findall(r'\d+$', node_dir)[0])
+        for cpu in parse_cpulist(_read(os.path.join(node_dir, 'cpulist'), '')):
+            cpu_node[cpu] = node
+
+    cores = {}
+    for cpu in available:
+        topology = os.path.join(SYSFS_CPU, f'cpu{cpu}', 'topology')
+        # without topology information every logical CPU is a core of its own
+        package = int(_read(os.path.join(topology, 'physical_package_id'), '0'))
+        core = int(_read(os.path.join(topology, 'core_id'), str(-cpu - 1)))
+        cores.setdefault((cpu_node.get(cpu, 0), package, core), []).append(cpu)
+    return tuple(tuple(cores[key]) for key in sorted(cores))
+
+
+def split_cores(cores, num_parts: int) -> list:
+    """
+    Split the cores into ``num_parts`` contiguous parts of nearly equal size.
+
+    If there are fewer cores than parts, the parts share the cores round-robin.
+    """
+    if len(cores) < num_parts:
+        return [[cores[part % len(cores)]] for part in range(num_parts)]
+    bounds = [len(cores) * part // num_parts for part in range(num_parts + 1)]
+    return [list(cores[start:end]) for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def assign_cores(cores, num_workers: int) -> tuple:
+    """
+    Assign one core to each of ``num_workers`` single-threaded workers, e.g.
+    environment processes, and the remaining cores to the calling process.
+
+    Returns:
+        the cores of the calling process and the list of cores of every worker.
+    """
+    if num_workers == 0:
+        return list(cores), []
+    if len(cores) > num_workers:
+        return list(cores[:-num_workers]), [[core] for core in cores[-num_workers:]]
+    return list(cores), split_cores(cores, num_workers)
+
+
+def pin(cores, pid: int = 0) -> None:
+    """Restrict a process, the calling one if ``pid`` is 0, to the logical CPUs of the cores."""
+    os.sched_setaffinity(pid, {cpu for core in cores for cpu in core})
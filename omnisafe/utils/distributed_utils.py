@@ -17,18 +17,54 @@
 import os
 import subprocess
 import sys
+import tempfile
+import time
+import uuid
+import weakref
 
 import numpy as np
 import torch
 import torch.distributed as dist
 from torch.distributed import ReduceOp
+from torch.distributed.constants import default_pg_timeout
 
+from omnisafe.utils import cpu_affinity
 
-def setup_torch_for_mpi():
+
+# how long the collectives of the process group and of the shared memory wait
+PROCESS_GROUP_TIMEOUT = default_pg_timeout
+
+
+def setup_torch_for_mpi(pin_cpus: bool = False, worker_pids=()):
     """
     Avoid slowdowns caused by each separate process's PyTorch using
     more than its fair share of CPU resources.
+
+    With ``pin_cpus`` the physical cores of the node are split among the local ranks,
+    NUMA node by NUMA node. Each of the ``worker_pids``, e.g. environment processes, is
+    pinned to one core of its rank, the rank itself to the remaining ones, which also
+    set its number of Torch threads.
     """
+    if pin_cpus and cpu_affinity.is_supported():
+        local_rank = int(os.getenv('LOCAL_RANK', '0'))
+        local_world_size = int(os.getenv('LOCAL_WORLD_SIZE', '1'))
+        cores = cpu_affinity.split_cores(cpu_affinity.physical_cores(), local_world_size)
+        own_cores, worker_cores = cpu_affinity.assign_cores(cores[local_rank], len(worker_pids))
+        for pid, cores_of_worker in zip(worker_pids, worker_cores):
+            cpu_affinity.pin(cores_of_worker, pid)
+        cpu_affinity.pin(own_cores)
+        torch.set_num_threads(len(own_cores))
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # can only be set once, before any inter-op parallel work
+            pass
+        print(
+            f'Proc {proc_id()}: Pinned to {len(own_cores)} cores with '
+            f'{torch.get_num_threads()} Torch threads and {len(worker_pids)} workers',
+            flush=True,
+        )
+        return
     old_num_threads = torch.get_num_threads()
     # decrease number of torch threads for MPI
     if old_num_threads > 1 and num_procs() > 1:
@@ -42,12 +78,139 @@ def setup_torch_for_mpi():
 
 
 def mpi_avg_grads(module):
-    """Average contents of gradient buffers across MPI processes."""
+    """Average contents of gradient buffers across MPI processes.
+
+    The gradients are packed into one contiguous buffer per dtype, which is averaged
+    with a single allreduce and unpacked in place. If an :class:`OverlappedGradSync`
+    is registered for the module, only the allreduces it launched are awaited.
+    """
     if num_procs() > 1:
-        for parameter in module.parameters():
-            p_grad_numpy = parameter.grad.numpy()  # numpy view of tensor data
-            avg_p_grad = mpi_avg(parameter.grad)
-            p_grad_numpy[:] = avg_p_grad[:]
+        grad_sync = _GRAD_SYNCS.get(module)
+        if grad_sync is not None:
+            # the allreduces were already launched during backward
+            grad_sync.synchronize()
+            return
+        grads = [parameter.grad for parameter in module.parameters() if parameter.grad is not None]
+        for group in _group_by_dtype(grads):
+            mpi_avg_flat(group)
+
+
+class OverlappedGradSync:
+    """
+    Average the gradients of a module across processes while backward is running.
+
+    The parameters are split into buckets of about ``bucket_size_mb`` megabytes, in
+    reverse order of registration, as this is roughly the order in which backward
+    produces the gradients. As soon as all gradients of a bucket are accumulated, a
+    hook packs them into a flat buffer and launches an asynchronous allreduce, so the
+    communication overlaps with the rest of backward. :meth:`synchronize`, called by
+    :func:`mpi_avg_grads`, waits for the allreduces and unpacks the averages in place.
+
+    Only ``.backward()`` triggers the hooks, ``torch.autograd.grad`` (e.g. for
+    Fisher-vector products) leaves them untouched. All processes have to run the same
+    backward passes, with gradients for every parameter, and call :meth:`synchronize`
+    after each of them, as collectives have to be issued in the same order everywhere.
+    """
+
+    def __init__(self, module: torch.nn.Module, bucket_size_mb: float = 1.0):
+        bucket_bytes = bucket_size_mb * 2**20
+        self.buckets = []
+        bucket, size = [], 0
+        for param in reversed([param for param in module.parameters() if param.requires_grad]):
+            nbytes = param.numel() * param.element_size()
+            if bucket and (size + nbytes > bucket_bytes or param.dtype != bucket[0].dtype):
+                self.buckets.append(bucket)
+                bucket, size = [], 0
+            bucket.append(param)
+            size += nbytes
+        if bucket:
+            self.buckets.append(bucket)
+        self.num_ready = [0] * len(self.buckets)
+        self.pending = [None] * len(self.buckets)
+        self._grad_accumulators = []
+        for idx, bucket in enumerate(self.buckets):
+            for param in bucket:
+                self._register_hook(param, idx)
+
+    def _register_hook(self, param, bucket_idx):
+        """Call :meth:`_mark_ready` whenever a gradient is accumulated into ``param``."""
+        if hasattr(param, 'register_post_accumulate_grad_hook'):
+            param.register_post_accumulate_grad_hook(lambda _: self._mark_ready(bucket_idx))
+        else:
+            # older torch versions: hook the AccumulateGrad node of the parameter
+            grad_accumulator = param.expand_as(param).grad_fn.next_functions[0][0]
+            grad_accumulator.register_hook(lambda *_: self._mark_ready(bucket_idx))
+            self._grad_accumulators.append(grad_accumulator)
+
+    def _mark_ready(self, bucket_idx):
+        self.num_ready[bucket_idx] += 1
+        if self.num_ready[bucket_idx] == len(self.buckets[bucket_idx]):
+            self._launch(bucket_idx)
+
+    def _launch(self, bucket_idx):
+        """Start the asynchronous allreduce of a bucket."""
+        self.num_ready[bucket_idx] = 0
+        if self.pending[bucket_idx] is not None:
+            # a further backward accumulated into the bucket, its last reduction is outdated
+            self.pending[bucket_idx][0].wait()
+        flat = torch.cat(
+            [
+                (param.grad if param.grad is not None else torch.zeros_like(param)).reshape(-1)
+                for param in self.buckets[bucket_idx]
+            ]
+        )
+        work = dist.all_reduce(flat, op=ReduceOp.SUM, async_op=True)
+        self.pending[bucket_idx] = (work, flat)
+
+    def synchronize(self):
+        """Wait for all allreduces and write the averaged gradients back."""
+        for bucket_idx, bucket in enumerate(self.buckets):
+            # buckets whose gradients were not all accumulated are reduced now
+            if self.pending[bucket_idx] is None:
+                if any(param.grad is not None for param in bucket):
+                    self._launch(bucket_idx)
+                else:
+                    self.num_ready[bucket_idx] = 0
+                    continue
+            work, flat = self.pending[bucket_idx]
+            self.pending[bucket_idx] = None
+            work.wait()
+            flat /= num_procs()
+            offset = 0
+            for param in bucket:
+                numel = param.numel()
+                if param.grad is not None:
+                    param.grad.copy_(flat[offset : offset + numel].view_as(param))
+                offset += numel
+
+
+_GRAD_SYNCS = weakref.WeakKeyDictionary()
+
+
+def register_overlapped_grad_sync(module, bucket_size_mb: float = 1.0):
+    """Let :func:`mpi_avg_grads` of ``module`` use an :class:`OverlappedGradSync`."""
+    if num_procs() > 1:
+        _GRAD_SYNCS[module] = OverlappedGradSync(module, bucket_size_mb)
+
+
+def _group_by_dtype(tensors):
+    """Split tensors into lists which can be concatenated, i.e. share dtype and device."""
+    groups = {}
+    for tensor in tensors:
+        groups.setdefault((tensor.dtype, tensor.device), []).append(tensor)
+    return list(groups.values())
+
+
+def mpi_avg_flat(tensors) -> None:
+    """Average a list of tensors of the same dtype in place with a single allreduce."""
+    flat = torch.cat([tensor.reshape(-1) for tensor in tensors])
+    allreduce(flat, op=ReduceOp.SUM)
+    flat /= num_procs()
+    offset = 0
+    for tensor in tensors:
+        numel = tensor.numel()
+        tensor.copy_(flat[offset : offset + numel].view_as(tensor))
+        offset += numel
 
 
 def sync_params(module):
@@ -58,24 +221,70 @@ def sync_params(module):
             broadcast(p_numpy)
 
 
-def mpi_fork(parallel: int, bind_to_core=False, use_number_of_threads=False) -> bool:
+def init_process_group():
     """
-    Re-launches the current script with workers linked by MPI.
+    Initialize the gloo process group of a worker started by ``torchrun``.
+
+    The store of the elastic agent outlives restarts of the workers, so the keys of
+    every attempt get their own prefix. Otherwise restarted workers may read the
+    addresses of the workers they replace and fail to connect.
+    """
+    rank, world_size = int(os.environ['RANK']), int(os.environ['WORLD_SIZE'])
+    agent_store = os.getenv('TORCHELASTIC_USE_AGENT_STORE') == str(True)
+    store = dist.TCPStore(
+        os.environ['MASTER_ADDR'],
+        int(os.environ['MASTER_PORT']),
+        world_size,
+        is_master=not agent_store and rank == 0,
+    )
+    attempt = os.getenv('TORCHELASTIC_RESTART_COUNT', '0')
+    dist.init_process_group(
+        backend='gloo',
+        store=dist.PrefixStore(f'omnisafe/attempt_{attempt}', store),
+        rank=rank,
+        world_size=world_size,
+        timeout=PROCESS_GROUP_TIMEOUT,
+    )
+
+
+def mpi_fork(
+    parallel: int,
+    nnodes: int = 1,
+    node_rank: int = 0,
+    rdzv_endpoint: str = None,
+    max_restarts: int = 0,
+    min_nodes: int = None,
+) -> bool:
+    """
+    Re-launches the current script with workers linked by torch.distributed.
 
     Also, terminates the original process that launched it.
 
-    Taken almost without modification from the Baselines function of the
-    `same name`_.
+    Adapted from the Baselines function of the `same name`_, the workers are started
+    by ``torchrun``. On a single node they find each other on ``localhost``. To span
+    several nodes, the script is launched once per node with the same ``nnodes`` and
+    ``rdzv_endpoint`` and a distinct ``node_rank``; the node with rank 0 hosts the
+    rendezvous, so ``rdzv_endpoint`` has to be its address.
+
+    With ``max_restarts`` the training is elastic: if a worker fails, or with
+    ``min_nodes`` a node leaves or joins, ``torchrun`` restarts all workers with the
+    new world size. The workers resume from their latest checkpoint, which they find
+    in the log directory named after ``OMNISAFE_RUN_TIME``, the launch time.
 
     .. _`same name`: https://github.com/openai/baselines/blob/master/baselines/common/mpi_fork.py
 
     Args:
-        n (int): Number of process to split into.
+        parallel (int): Number of processes to split into on this node.
+
+        nnodes (int): Number of nodes taking part in the training.
 
-        bind_to_core (bool): Bind each MPI process to a core.
+        node_rank (int): Rank of this node, between 0 and ``nnodes - 1``.
 
-        use_number_of_threads (bool): If you want Open MPI to default to the
-        number of hardware threads instead of the number of processor cores.
+        rdzv_endpoint (str): ``host:port`` of the rendezvous, required if ``nnodes > 1``.
+
+        max_restarts (int): Number of times the workers are restarted after a failure.
+
+        min_nodes (int): Minimum number of nodes to keep training with, ``nnodes`` if None.
 
     Returns:
         bool
@@ -86,27 +295,48 @@ def mpi_fork(parallel: int, bind_to_core=False, use_number_of_threads=False) ->
             sys.exit()   # exit single thread python process
 
     """
+    assert 0 <= node_rank < nnodes, 'node_rank must be in [0, nnodes).'
     is_parent = False
     if os.getenv('MASTER_ADDR') is not None:
-        dist.init_process_group(backend='gloo')
+        init_process_group()
     # Check if MPI is already setup..
-    if parallel > 1 and os.getenv('MASTER_ADDR') is None:
+    if (parallel > 1 or nnodes > 1 or max_restarts > 0) and os.getenv('MASTER_ADDR') is None:
         # MPI is not yet set up: quit parent process and start N child processes
         env = os.environ.copy()
-        env.update(MKL_NUM_THREADS='1', OMP_NUM_THREADS='1', IN_MPI='1')
-        args = [
-            'torchrun',
-            '--rdzv_backend',
-            'c10d',
-            '--rdzv_endpoint',
-            'localhost:0',
-            '--nproc_per_node',
-            str(parallel),
-        ]
-        if bind_to_core:
-            args += ['-bind-to', 'core']
-        if use_number_of_threads:
-            args += ['--use-hwthread-cpus']
+        env.update(MKL_NUM_THREADS='1', OMP_NUM_THREADS='1', IN_MPI='1', OMNISAFE_PARALLEL='1')
+        env.setdefault('OMNISAFE_RUN_TIME', time.strftime('%Y-%m-%d_%H-%M-%S'))
+        args = ['torchrun', '--nproc_per_node', str(parallel), '--max_restarts', str(max_restarts)]
+        min_nodes = nnodes if min_nodes is None else min_nodes
+        assert 1 <= min_nodes <= nnodes, 'min_nodes must be in [1, nnodes].'
+        if min_nodes < nnodes:
+            assert rdzv_endpoint is not None, 'rdzv_endpoint is required for several nodes.'
+            # dynamic rendezvous, nodes may leave and join, the ranks are assigned anew
+            args += [
+                '--nnodes',
+                f'{min_nodes}:{nnodes}',
+                '--rdzv_backend',
+                'c10d',
+                '--rdzv_endpoint',
+                rdzv_endpoint,
+                '--rdzv_id',
+                'omnisafe',
+            ]
+        elif nnodes > 1:
+            assert rdzv_endpoint is not None, 'rdzv_endpoint is required for several nodes.'
+            # static rendezvous, so that the ranks follow the node ranks
+            master_addr, master_port = rdzv_endpoint.rsplit(':', 1)
+            args += [
+                '--nnodes',
+                str(nnodes),
+                '--node_rank',
+                str(node_rank),
+                '--master_addr',
+                master_addr,
+                '--master_port',
+                master_port,
+            ]
+        else:
+            args += ['--rdzv_backend', 'c10d', '--rdzv_endpoint', rdzv_endpoint or 'localhost:0']
         args += sys.argv
         # This is the parent process, spawn sub-processes..
         subprocess.check_call(args, env=env)
@@ -126,9 +356,11 @@ def proc_id():
     return dist.get_rank()
 
 
-def allreduce(*args, **kwargs):
-    """allreduce"""
-    return dist.all_reduce(*args, **kwargs)
+def allreduce(tensor, op=ReduceOp.SUM, **kwargs):  # pylint: disable=invalid-name
+    """allreduce, through shared memory if :func:`init_shared_memory_comm` was called."""
+    if _SHARED_MEMORY_COMM is not None and _SHARED_MEMORY_COMM.supports(tensor, op, **kwargs):
+        return _SHARED_MEMORY_COMM.allreduce(tensor, op)
+    return dist.all_reduce(tensor, op=op, **kwargs)
 
 
 def gather(*args, **kwargs):
@@ -165,11 +397,170 @@ def num_procs():
     return dist.get_world_size()
 
 
+def broadcast_object(obj, src=0):
+    """Send a picklable object of process ``src`` to all processes and return it."""
+    if num_procs() == 1:
+        return obj
+    objects = [obj]
+    dist.broadcast_object_list(objects, src=src)
+    return objects[0]
+
+
+def all_gather_object(obj) -> list:
+    """Gather a picklable object of every process, the returned list is indexed by rank."""
+    if num_procs() == 1:
+        return [obj]
+    objects = [None] * num_procs()
+    dist.all_gather_object(objects, obj)
+    return objects
+
+
 def broadcast(value, src=0):
-    """broadcast"""
+    """broadcast, through shared memory if :func:`init_shared_memory_comm` was called."""
+    if _SHARED_MEMORY_COMM is not None and _SHARED_MEMORY_COMM.supports(value):
+        _SHARED_MEMORY_COMM.broadcast(value, src)
+        return
     dist.broadcast(value, src=src)
 
 
+class SharedMemoryComm:
+    """
+    Collectives of the processes of a single node through a shared memory block.
+
+    Every process owns one row of a float32 exchange area and a flag. A collective
+    writes the local data into the own row, waits on a barrier until every process
+    has done so, combines the rows locally and waits on a second barrier before the
+    rows may be overwritten again. The barriers poll the flags, which are only
+    written by their owner, so no socket traffic is involved. A barrier spins for
+    a few polls, then sleeps between them, so a stalled process does not keep the
+    waiting ones busy.
+
+    Only float32 CPU tensors are exchanged; :func:`allreduce` and :func:`broadcast`
+    fall back to the process group for anything else. Like all collectives, the
+    calls have to be issued in the same order by every process.
+    """
+
+    _REDUCE = {
+        ReduceOp.SUM: lambda rows: rows.sum(axis=0),
+        ReduceOp.MAX: lambda rows: rows.max(axis=0),
+        ReduceOp.MIN: lambda rows: rows.min(axis=0),
+    }
+
+    # polls of a barrier without sleeping, and the longest sleep between polls
+    spin_polls = 100
+    max_sleep = 1e-3
+
+    def __init__(self, capacity: int = 2**20, timeout: float = None):
+        """Create the shared memory block, a collective call of all processes.
+
+        Args:
+            capacity (int): number of float32 values a process exchanges at once,
+                larger tensors are exchanged in chunks.
+            timeout (float): seconds to wait for the other processes at a barrier,
+                by default the timeout of the process group.
+        """
+        self.rank = dist.get_rank()
+        self.world_size = dist.get_world_size()
+        self.capacity = capacity
+        self.timeout = PROCESS_GROUP_TIMEOUT.total_seconds() if timeout is None else timeout
+        self.phase = 0
+        # the flags, padded to a cache line, followed by the exchange area
+        offset = max(64, 8 * self.world_size)
+        nbytes = offset + 4 * self.world_size * capacity
+        names = [None]
+        if self.rank == 0:
+            shm_dir = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+            names[0] = os.path.join(shm_dir, f'omnisafe-comm-{os.getpid()}-{uuid.uuid4().hex}')
+            self.memory = np.memmap(names[0], dtype=np.uint8, mode='w+', shape=(nbytes,))
+        dist.broadcast_object_list(names, src=0)
+        if self.rank != 0:
+            self.memory = np.memmap(names[0], dtype=np.uint8, mode='r+', shape=(nbytes,))
+        dist.barrier()
+        if self.rank == 0:
+            # the mappings stay valid, the file disappears with the last process
+            os.unlink(names[0])
+        self.flags = np.ndarray((self.world_size,), dtype=np.int64, buffer=self.memory)
+        self.rows = np.ndarray(
+            (self.world_size, capacity), dtype=np.float32, buffer=self.memory, offset=offset
+        )
+
+    @staticmethod
+    def supports(tensor, op=ReduceOp.SUM, **kwargs) -> bool:  # pylint: disable=invalid-name
+        """Whether a collective on ``tensor`` can go through shared memory."""
+        return (
+            not kwargs
+            and op in SharedMemoryComm._REDUCE
+            and isinstance(tensor, torch.Tensor)
+            and tensor.device.type == 'cpu'
+            and tensor.dtype == torch.float32
+            and tensor.is_contiguous()
+        )
+
+    def barrier(self):
+        """Wait until every process has reached the same barrier."""
+        self.phase += 1
+        self.flags[self.rank] = self.phase
+        deadline = None
+        polls = 0
+        while self.flags.min() < self.phase:
+            if deadline is None:
+                deadline = time.monotonic() + self.timeout
+            elif time.monotonic() > deadline:
+                raise RuntimeError(f'Proc {self.rank}: shared memory barrier timed out.')
+            polls += 1
+            if polls <= self.spin_polls:
+                time.sleep(0)
+            else:
+                # back off from 10 microseconds up to max_sleep
+                time.sleep(min(1e-5 * 2 ** min(polls - self.spin_polls, 10), self.max_sleep))
+
+    def _chunks(self, tensor):
+        flat = tensor.detach().view(-1).numpy()
+        for start in range(0, len(flat), self.capacity):
+            yield flat[start : start + self.capacity]
+
+    def allreduce(self, tensor, op=ReduceOp.SUM):  # pylint: disable=invalid-name
+        """Reduce ``tensor`` in place across all processes."""
+        reduce = self._REDUCE[op]
+        for chunk in self._chunks(tensor):
+            self.rows[self.rank, : len(chunk)] = chunk
+            self.barrier()
+            chunk[:] = reduce(self.rows[:, : len(chunk)])
+            self.barrier()
+
+    def broadcast(self, tensor, src=0):
+        """Copy ``tensor`` of process ``src`` into ``tensor`` of all processes."""
+        for chunk in self._chunks(tensor):
+            if self.rank == src:
+                self.rows[src, : len(chunk)] = chunk
+            self.barrier()
+            if self.rank != src:
+                chunk[:] = self.rows[src, : len(chunk)]
+            self.barrier()
+
+
+_SHARED_MEMORY_COMM = None
+
+
+def init_shared_memory_comm(capacity: int = 2**20) -> bool:
+    """
+    Let :func:`allreduce` and :func:`broadcast`, thus also :func:`mpi_avg`, :func:`mpi_sum`,
+    :func:`mpi_avg_grads` and :func:`sync_params`, use a :class:`SharedMemoryComm`.
+
+    Has to be called by all processes, and only takes effect if all of them run on the
+    same node.
+
+    Returns:
+        whether the shared memory collectives are used.
+    """
+    global _SHARED_MEMORY_COMM  # pylint: disable=global-statement
+    if num_procs() == 1 or os.getenv('LOCAL_WORLD_SIZE', str(num_procs())) != str(num_procs()):
+        return False
+    if _SHARED_MEMORY_COMM is None:
+        _SHARED_MEMORY_COMM = SharedMemoryComm(capacity)
+    return True
+
+
 def mpi_avg(value):
     """Average a scalar or numpy vector over MPI processes."""
     return mpi_sum(value) / num_procs()
@@ -240,3 +631,79 @@ def mpi_statistics_scalar(value, with_min_and_max=False) -> tuple:
         global_max = mpi_op(np.max(value) if len(value) > 0 else -np.inf, operation=ReduceOp.MAX)
         return mean, std, global_min, global_max
     return mean, std
+
+
+def merge_moments(moments) -> np.ndarray:
+    """Merge the moments of several disjoint sets of samples by the formula of Chan et al.
+
+    Args:
+        moments: An array of shape [P, K, 5] holding the moments of K quantities
+            in each of P sets, as of :func:`mpi_reduce_moments`.
+
+    Returns:
+        np.ndarray
+            the [K, 5] moments of the union of the sets.
+    """
+    count, mean, m2 = moments[..., 0], moments[..., 1], moments[..., 2]
+    total_count = count.sum(axis=0)
+    total_mean = (count * mean).sum(axis=0) / np.maximum(total_count, 1)
+    total_m2 = (m2 + count * (mean - total_mean) ** 2).sum(axis=0)
+    return np.stack(
+        [
+            total_count,
+            total_mean,
+            total_m2,
+            moments[..., 3].min(axis=0),
+            moments[..., 4].max(axis=0),
+        ],
+        axis=1,
+    )
+
+
+def mpi_reduce_moments(moments) -> np.ndarray:
+    """Combine the running moments of several quantities across MPI processes.
+
+    All quantities are reduced with a single ``all_gather`` collective.
+
+    Args:
+        moments: An array of shape [K, 5] holding count, mean, sum of squared deviations
+            from the mean, min and max of the local samples of K quantities.
+
+    Returns:
+        np.ndarray
+            the moments of the samples of all processes, with the same shape.
+    """
+    moments = np.asarray(moments, dtype=np.float64).reshape(-1, 5)
+    if num_procs() == 1:
+        return moments
+    local = torch.as_tensor(moments)
+    gathered = [torch.empty_like(local) for _ in range(num_procs())]
+    dist.all_gather(gathered, local)
+    return merge_moments(torch.stack(gathered).numpy())
+
+
+def statistics_from_moments(moments, with_min_and_max=False) -> tuple:
+    """Get mean/std and optional min/max from count, mean, centred sum of squares, min and max."""
+    count, mean, m2, minimum, maximum = moments
+    if count == 0:
+        mean = std = np.nan
+    else:
+        std = np.sqrt(max(m2 / count, 0.0))
+    if with_min_and_max:
+        return np.float64(mean), np.float64(std), np.float64(minimum), np.float64(maximum)
+    return np.float64(mean), np.float64(std)
+
+
+def mpi_statistics_from_moments(moments, with_min_and_max=False) -> tuple:
+    """Get mean/std and optional min/max across MPI processes from running moments.
+
+    Args:
+        moments (tuple): count, mean, sum of squared deviations from the mean, min and
+            max of the local samples, e.g. from :class:`omnisafe.utils.logger_utils.StatsAccumulator`.
+
+        with_min_and_max (bool): If true, return min and max of x in
+            addition to mean and std.
+    """
+    return statistics_from_moments(
+        mpi_reduce_moments(moments)[0], with_min_and_max=with_min_and_max
+    )
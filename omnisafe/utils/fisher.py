@@ -0,0 +1,189 @@
+# Copyright 2022 OmniSafe Team. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Fisher-vector products of diagonal Gaussian policies."""
+
+import math
+
+import torch
+from torch.distributions.normal import Normal
+from torch.func import functional_call, vjp, vmap
+
+from omnisafe.utils import distributed_utils
+
+
+def is_diagonal_gaussian(actor: torch.nn.Module, obs: torch.Tensor) -> bool:
+    """Whether ``actor`` maps observations to a :class:`Normal` distribution."""
+    with torch.no_grad():
+        return isinstance(actor(obs[:1]), Normal)
+
+
+class GaussianFisherVectorProduct:
+    """
+    The product of the Fisher information matrix of a diagonal Gaussian actor
+    with a flat vector of the parameters of ``actor.net``.
+
+    The Hessian of ``KL(p, q).mean()`` at ``q = p`` with respect to the parameters
+    is ``J^T M J``, where ``J`` is the Jacobian of the mean and std of the actor and
+    ``M`` is the Fisher information of a normal distribution with respect to them,
+    ``1 / std^2`` for the mean and ``2 / std^2`` for the std, divided by the number
+    of entries averaged by the KL-divergence.
+
+    The forward pass is run and the activations are kept once, on construction.
+    Every product is then a Jacobian-vector product, computed as the derivative of
+    the cached vector-Jacobian product, followed by a vector-Jacobian product, in
+    place of a forward pass and a double backward pass through the KL-divergence.
+    """
+
+    def __init__(self, actor: torch.nn.Module, obs: torch.Tensor) -> None:
+        """Initialize the product for the current parameters of the actor.
+
+        Args:
+            actor (torch.nn.Module): an actor returning a :class:`Normal` distribution.
+            obs (torch.Tensor): the observations the KL-divergence is averaged over.
+        """
+        self.params = list(actor.net.parameters())
+        # one name per parameter, setting a shared module once sets it everywhere
+        names = {id(param): name for name, param in actor.named_parameters()}
+        param_names = [names[id(param)] for param in self.params]
+
+        def mean_std(params):
+            dist = functional_call(actor, dict(zip(param_names, params)), (obs,), tie_weights=False)
+            return dist.loc, dist.scale
+
+        (mean, std), vjp_fn = vjp(mean_std, tuple(param.detach() for param in self.params))
+
+        def vector_jacobian_product(cotangents):
+            return vjp_fn(cotangents)[0]
+
+        # u -> J^T u is linear in u, its vector-Jacobian product with v is J v
+        _, jvp_fn = vjp(vector_jacobian_product, (torch.zeros_like(mean), torch.zeros_like(std)))
+        self._vjp = vector_jacobian_product
+        self._jvp = jvp_fn
+        self.mean_weight = std.detach().pow(-2) / mean.numel()
+        self.std_weight = 2 * self.mean_weight
+
+    def __call__(self, vector: torch.Tensor) -> torch.Tensor:
+        """
+        The Fisher-vector product with the flat parameter vector ``vector``,
+        or the products with every row of a ``[k, n]`` batch of vectors.
+        """
+        if vector.dim() == 2:
+            return vmap(self._product)(vector)
+        return self._product(vector)
+
+    def _product(self, vector: torch.Tensor) -> torch.Tensor:
+        tangents = torch.split(vector, [param.numel() for param in self.params])
+        tangents = tuple(tangent.view_as(param) for tangent, param in zip(tangents, self.params))
+        mean_tangent, std_tangent = self._jvp(tangents)[0]
+        grads = self._vjp((mean_tangent * self.mean_weight, std_tangent * self.std_weight))
+        return torch.cat([grad.reshape(-1) for grad in grads])
+
+
+class FisherSubsampler:
+    """
+    Selects the observations the Fisher-vector products are averaged over.
+
+    The Fisher information only needs to be as accurate as the natural gradient it
+    preconditions, so a subset of the batch suffices. ``mode`` sets its size:
+
+    - ``count``: ``size`` observations.
+    - ``fraction``: the fraction ``size`` of the batch, ``0.25`` matches ``obs[::4]``.
+    - ``adaptive``: starts as ``fraction`` and is resized after every update by
+      :meth:`update`, such that the relative standard error of the KL-divergence
+      estimate on the subset is about ``tolerance``. It is not shrunk while the
+      relative residual of the conjugate gradients exceeds ``tolerance``.
+
+    The observations are evenly spaced over the batch, which keeps the subset
+    spread over all trajectories of the rollout.
+    """
+
+    modes = ('count', 'fraction', 'adaptive')
+
+    def __init__(
+        self,
+        mode: str = 'fraction',
+        size: float = 0.25,
+        tolerance: float = 0.1,
+        min_size: int = 32,
+    ) -> None:
+        """Initialize the subsampler.
+
+        Args:
+            mode (str): one of ``count``, ``fraction`` and ``adaptive``.
+            size (float): number of observations with ``count``, otherwise the
+                (initial) fraction of the batch.
+            tolerance (float): target relative error of ``adaptive``.
+            min_size (int): the smallest subset of ``adaptive``.
+        """
+        assert mode in self.modes, f'Unknown fvp_subsampling {mode}'
+        assert size > 0, 'fvp_sample_size must be positive.'
+        if mode != 'count':
+            assert size <= 1, 'fvp_sample_size must be a fraction in (0, 1].'
+        self.mode = mode
+        self.size = size
+        self.tolerance = tolerance
+        self.min_size = min_size
+        self.sample_size = None
+        self.batch_size = None
+
+    def subset_size(self, batch_size: int) -> int:
+        """The number of observations to take of a batch of ``batch_size``."""
+        if self.mode == 'count':
+            return min(int(self.size), batch_size)
+        if self.mode == 'adaptive' and self.sample_size is not None:
+            return max(min(self.sample_size, batch_size), min(self.min_size, batch_size), 1)
+        return max(math.ceil(batch_size * self.size), 1)
+
+    def sample(self, obs: torch.Tensor) -> torch.Tensor:
+        """The subset of ``obs`` to compute the Fisher-vector products on."""
+        self.batch_size = len(obs)
+        self.sample_size = self.subset_size(self.batch_size)
+        if self.sample_size == self.batch_size:
+            return obs
+        indices = torch.arange(self.sample_size) * self.batch_size // self.sample_size
+        return obs[indices]
+
+    def update(self, kl: torch.Tensor, residual: float = 0.0) -> None:
+        """Resize the subset of ``adaptive`` after an update.
+
+        Args:
+            kl (torch.Tensor): the KL-divergence between the old and the new policy
+                of every observation of the batch, summed over the action dimensions
+                if not done already.
+            residual (float): the relative residual ``|g - Hx| / |g|`` of the
+                conjugate gradients.
+        """
+        if self.mode != 'adaptive' or self.batch_size is None:
+            return
+        kl = kl.detach().reshape(len(kl), -1).sum(dim=1).cpu().numpy()
+        mean, std = distributed_utils.mpi_statistics_scalar(kl)
+        if not mean > 0:
+            return
+        # the standard error of a mean over m observations is std / sqrt(m)
+        target = math.ceil((std / (self.tolerance * mean)) ** 2)
+        if residual > self.tolerance:
+            target = max(target, self.sample_size)
+        # resize gradually, a single noisy estimate should not collapse the subset
+        target = min(max(target, self.sample_size // 2), 2 * self.sample_size)
+        self.sample_size = max(min(target, self.batch_size), min(self.min_size, self.batch_size))
+
+    def state_dict(self) -> dict:
+        """The size of the adaptive subset, to resume with :meth:`load_state_dict`."""
+        return {'sample_size': self.sample_size, 'batch_size': self.batch_size}
+
+    def load_state_dict(self, state: dict) -> None:
+        """Restore the size of the adaptive subset of :meth:`state_dict`."""
+        self.sample_size = state['sample_size']
+        self.batch_size = state['batch_size']
@@ -0,0 +1,78 @@
+# Copyright 2022 OmniSafe Team. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Evaluation of the candidate steps of a line search with few forward passes."""
+
+import contextlib
+
+import torch
+from torch.distributions import Distribution
+from torch.func import functional_call, vmap
+
+from omnisafe.utils.fisher import is_diagonal_gaussian
+
+
+def candidate_distributions(actor: torch.nn.Module, thetas: torch.Tensor, obs: torch.Tensor):
+    """
+    The distributions of ``actor`` on ``obs`` for every row of ``thetas``,
+    a ``[k, n]`` batch of flat parameters of ``actor.net``, as laid out by
+    :func:`omnisafe.utils.tools.get_flat_params_from`.
+
+    The actor itself is left unchanged. Several candidates of a diagonal Gaussian
+    actor are evaluated by one forward pass, vectorized over the stacked parameters,
+    other actors are evaluated one candidate after another.
+    """
+    params = [param for param in actor.net.parameters() if param.requires_grad]
+    # one name per parameter, setting a shared module once sets it everywhere
+    names = {id(param): name for name, param in actor.named_parameters()}
+    param_names = [names[id(param)] for param in params]
+    sizes = [param.numel() for param in params]
+
+    def forward(theta):
+        values = [value.view_as(param) for value, param in zip(torch.split(theta, sizes), params)]
+        return functional_call(actor, dict(zip(param_names, values)), (obs,), tie_weights=False)
+
+    if len(thetas) == 1 or not is_diagonal_gaussian(actor, obs):
+        return [forward(theta) for theta in thetas]
+
+    def mean_std(theta):
+        dist = forward(theta)
+        return dist.loc, dist.scale
+
+    # the validation of the arguments can not be vectorized
+    validate_args = Distribution._validate_args  # pylint: disable=protected-access
+    Distribution.set_default_validate_args(False)
+    try:
+        means, stds = vmap(mean_std)(thetas)
+    finally:
+        Distribution.set_default_validate_args(validate_args)
+    return [torch.distributions.Normal(mean, std) for mean, std in zip(means, stds)]
+
+
+@contextlib.contextmanager
+def fixed_distribution(actor: torch.nn.Module, obs: torch.Tensor, dist: Distribution):
+    """
+    Let ``actor`` return ``dist`` for ``obs`` instead of evaluating its network,
+    so that several losses of one candidate share a single forward pass.
+    """
+
+    def distribution(inputs):
+        assert inputs is obs, 'The distribution is only fixed for the given observations.'
+        return dist
+
+    actor._distribution = distribution  # pylint: disable=protected-access
+    try:
+        yield
+    finally:
+        del actor._distribution
@@ -15,6 +15,9 @@
 """logger_utils"""
 
 import json
+from typing import Optional
+
+import numpy as np
 
 
 color2num = dict(
@@ -79,3 +82,77 @@ def colorize(message, color, bold=False, highlight=False):
         attr.append('1')
     menus = [';'.join(attr), message]
     return f'\x1b[{menus[0]}m{menus[1]}\x1b[0m'
+
+
+class StatsAccumulator:
+    """
+    Running count, mean, sum of squared deviations from the mean, minimum and maximum
+    of all stored values.
+
+    Every :meth:`update` is O(1) in the number of previous updates, so the memory
+    does not grow with the number of steps. The centred sum of squares is updated by
+    Welford's algorithm, which keeps the variance of large values of small spread,
+    e.g. episode lengths, exact. Optionally a uniform random sample of at most
+    ``reservoir_size`` values is kept for histograms (reservoir sampling).
+    """
+
+    def __init__(self, reservoir_size: int = 0, seed: Optional[int] = 0):
+        self.reservoir_size = reservoir_size
+        self.reservoir = np.empty(reservoir_size, dtype=np.float64)
+        self.rng = np.random.default_rng(seed)
+        self.reset()
+
+    def reset(self):
+        """Forget all stored values."""
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    def update(self, value):
+        """Add a scalar or all elements of an array."""
+        if isinstance(value, (int, float)):
+            count = self.count + 1
+            delta = value - self.mean
+            self.mean += delta / count
+            self.m2 += delta * (value - self.mean)
+            self.minimum = min(self.minimum, value)
+            self.maximum = max(self.maximum, value)
+            values = value
+            size = 1
+        else:
+            values = np.asarray(value, dtype=np.float64).reshape(-1)
+            size = values.size
+            if size == 0:
+                return
+            # merge the moments of the batch as by Chan et al.
+            count = self.count + size
+            mean = float(values.mean())
+            delta = mean - self.mean
+            self.mean += delta * size / count
+            self.m2 += float(np.sum((values - mean) ** 2)) + delta**2 * self.count * size / count
+            self.minimum = min(self.minimum, float(values.min()))
+            self.maximum = max(self.maximum, float(values.max()))
+        if self.reservoir_size > 0:
+            self._sample(np.reshape(values, -1))
+        self.count += size
+
+    def _sample(self, values):
+        """Algorithm R: the i-th value overall replaces a random slot with probability k / i."""
+        positions = self.count + np.arange(len(values))
+        slots = np.where(
+            positions < self.reservoir_size,
+            positions,
+            self.rng.integers(0, positions + 1),
+        )
+        keep = slots < self.reservoir_size
+        self.reservoir[slots[keep]] = values[keep]
+
+    def moments(self):
+        """Return count, mean, sum of squared deviations from the mean, minimum and maximum."""
+        return self.count, self.mean, self.m2, self.minimum, self.maximum
+
+    def samples(self):
+        """Return the reservoir, i.e. a uniform random sample of the stored values."""
+        return self.reservoir[: min(self.count, self.reservoir_size)].copy()
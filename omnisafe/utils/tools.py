@@ -15,6 +15,7 @@
 """tool_function_packages"""
 
 import os
+import random
 from typing import Any
 
 import numpy as np
@@ -35,25 +36,112 @@ def get_default_kwargs_yaml(algo, env_id, algo_type):
     return kwargs[kwargs_name]
 
 
+def get_rng_state() -> dict:
+    """The states of the random number generators of python, numpy and torch."""
+    state = {
+        'random': random.getstate(),
+        'numpy': np.random.get_state(),
+        'torch': torch.get_rng_state(),
+    }
+    if torch.cuda.is_available():
+        state['cuda'] = torch.cuda.get_rng_state_all()
+    return state
+
+
+def set_rng_state(state: dict) -> None:
+    """Restore the random number generators from a state of :func:`get_rng_state`."""
+    random.setstate(state['random'])
+    np.random.set_state(state['numpy'])
+    torch.set_rng_state(state['torch'])
+    if 'cuda' in state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state['cuda'])
+
+
+def _trainable_parameters(model) -> list:
+    """The parameters of ``model`` which require gradients, in the order of the flat vectors."""
+    return [param for _, param in model.named_parameters() if param.requires_grad]
+
+
+def _is_view_of(tensors, flat) -> bool:
+    """Whether ``tensors`` are consecutive contiguous views covering ``flat``."""
+    if flat is None:
+        return False
+    address = flat.data_ptr()
+    for tensor in tensors:
+        if (
+            tensor is None
+            or tensor.data_ptr() != address
+            or tensor.dtype != flat.dtype
+            or tensor.device != flat.device
+            or not tensor.is_contiguous()
+        ):
+            return False
+        address += tensor.numel() * tensor.element_size()
+    return address == flat.data_ptr() + flat.numel() * flat.element_size()
+
+
+def flatten_parameters(model) -> None:
+    """
+    Store the trainable parameters of ``model`` and their gradients as views of two
+    contiguous flat buffers, in the order of :func:`get_flat_params_from`.
+
+    Afterwards :func:`get_flat_params_from` and :func:`get_flat_gradients_from` return
+    the buffers instead of concatenating copies, and :func:`set_param_values_to_model`
+    makes the given vector the new parameter buffer.
+
+    The returned vectors share memory with the model. The parameters are replaced by
+    new vectors rather than changed in place, so a parameter vector stays valid, but
+    the gradient buffer is overwritten by the next backward pass. A gradient to keep
+    across backward passes, e.g. ``g`` of CPO while ``b`` is computed, must be copied,
+    e.g. by negating it into a new vector instead of in place.
+
+    The layout is lost if the model is moved to another device or gradients are set
+    to None, e.g. by ``zero_grad()``. The helpers then fall back to copies, and
+    :func:`get_flat_gradients_from` gathers the new gradients into the buffer again.
+    """
+    params = _trainable_parameters(model)
+    flat_params = torch.cat([param.data.reshape(-1) for param in params])
+    flat_grads = torch.zeros_like(flat_params)
+    offset = 0
+    for param in params:
+        size = param.numel()
+        param.data = flat_params[offset : offset + size].view_as(param)
+        param.grad = flat_grads[offset : offset + size].view_as(param)
+        offset += size
+    model.flat_params = flat_params
+    model.flat_grads = flat_grads
+
+
 def get_flat_params_from(model):
     """get_flat_params_from"""
-    flat_params = []
-    for _, param in model.named_parameters():
-        if param.requires_grad:
-            data = param.data
-            data = data.view(-1)  # flatten tensor
-            flat_params.append(data)
-    assert flat_params, 'No gradients were found in model parameters.'
-    return torch.cat(flat_params)
+    flat_params = getattr(model, 'flat_params', None)
+    params = _trainable_parameters(model)
+    if _is_view_of(params, flat_params):
+        return flat_params
+    assert params, 'No gradients were found in model parameters.'
+    return torch.cat([param.data.view(-1) for param in params])
 
 
 def get_flat_gradients_from(model):
     """get_flat_gradients_from"""
-    grads = []
-    for _, param in model.named_parameters():
-        if param.requires_grad and param.grad is not None:
-            grad = param.grad
-            grads.append(grad.view(-1))  # flatten tensor and append
+    flat_grads = getattr(model, 'flat_grads', None)
+    params = _trainable_parameters(model)
+    grads = [param.grad for param in params]
+    if _is_view_of(grads, flat_grads):
+        return flat_grads
+    if flat_grads is not None and all(
+        grad is not None and grad.dtype == flat_grads.dtype and grad.device == flat_grads.device
+        for grad in grads
+    ):
+        # gather new gradients into the buffer, where the next backward pass accumulates
+        offset = 0
+        for param in params:
+            size = param.numel()
+            flat_grads[offset : offset + size].copy_(param.grad.view(-1))
+            param.grad = flat_grads[offset : offset + size].view_as(param)
+            offset += size
+        return flat_grads
+    grads = [grad.view(-1) for grad in grads if grad is not None]  # flatten tensor
     assert grads, 'No gradients were found in model parameters.'
     return torch.cat(grads)
 
@@ -100,6 +188,50 @@ def conjugate_gradients(
     return x
 
 
+def block_conjugate_gradients(
+    Avp,
+    b_vectors,
+    num_steps,
+    residual_tol=1e-10,
+    eps=1e-6,
+):  # pylint: disable=invalid-name
+    """
+    Conjugate gradient algorithm for several systems :math:`A x_i = b_i` with the same matrix.
+
+    Every row of ``b_vectors`` is solved as by :func:`conjugate_gradients`, but the
+    products of all rows which have not converged yet are computed by one call of ``Avp``,
+    which maps a ``[k, n]`` batch of vectors to their products with :math:`A`.
+    As the products :math:`A x_i` are updated along with :math:`x_i`, the quadratic forms
+    :math:`x_i^T A x_j` come without any further product.
+
+    Returns:
+        the solutions and their products with :math:`A` as ``[k, n]`` tensors,
+        and the ``[k, k]`` matrix of the quadratic forms :math:`x_i^T A x_j`.
+    """
+    x = torch.zeros_like(b_vectors)
+    a_x = torch.zeros_like(b_vectors)
+    r = b_vectors.clone()
+    p = r.clone()
+    rdotr = (r * r).sum(dim=1)
+    active = torch.arange(len(b_vectors))
+
+    for _ in range(num_steps):
+        z = Avp(p[active])
+        alpha = rdotr[active] / ((p[active] * z).sum(dim=1) + eps)
+        x[active] += alpha[:, None] * p[active]
+        a_x[active] += alpha[:, None] * z
+        r[active] -= alpha[:, None] * z
+        new_rdotr = (r[active] * r[active]).sum(dim=1)
+        converged = torch.sqrt(new_rdotr) < residual_tol
+        mu = new_rdotr / (rdotr[active] + eps)
+        p[active] = r[active] + mu[:, None] * p[active]
+        rdotr[active] = new_rdotr
+        active = active[~converged]
+        if len(active) == 0:
+            break
+    return x, a_x, x @ a_x.T
+
+
 def set_param_values_to_model(model, vals):
     """set_param_values_to_model"""
     assert isinstance(vals, torch.Tensor)
@@ -114,6 +246,9 @@ def set_param_values_to_model(model, vals):
             param.data = new_values
             i += size  # increment array position
     assert i == len(vals), f'Lengths do not match: {i} vs. {len(vals)}'
+    if getattr(model, 'flat_params', None) is not None:
+        # the parameters are views of vals now, which becomes the flat buffer
+        model.flat_params = vals
 
 
 # pylint: disable-next=too-many-branches,too-many-return-statements
@@ -15,6 +15,7 @@
 """vtrace"""
 
 import numpy as np
+import torch
 
 
 # pylint: disable-next=too-many-arguments,too-many-locals
@@ -67,3 +68,63 @@ def calculate_v_trace(
     policy_advantage = clip_rhos * (rewards[:-1] + gamma * v_s_plus_1 - values[:-1])
 
     return v_s, policy_advantage, clip_rhos
+
+
+# pylint: disable-next=too-many-arguments,too-many-locals
+def calculate_batched_v_trace(
+    log_rhos: torch.Tensor,
+    values: torch.Tensor,
+    rewards: torch.Tensor,
+    next_values: torch.Tensor,
+    dones: torch.Tensor,
+    gamma=0.99,
+    rho_bar=1.0,
+    c_bar=1.0,
+) -> tuple:
+    """
+    calculate V-trace targets of a batch of trajectories at once,
+    as proposed in: Espeholt et al. 2018, IMPALA
+
+    All tensors have the shape (sequence_length, batch_size), e.g. [steps, num_envs],
+    and every column may hold several trajectories: a trajectory ends at each
+    step where ``dones`` is true, and ``next_values`` holds the value of the
+    following state, i.e. the bootstrap value at the end of a trajectory.
+    The recursion is a single reverse scan over time, vectorized over the batch.
+
+    :param log_rhos: log-probabilities of the actions under the target policy
+        minus the ones under the behavior policy.
+    :param values:
+    :param rewards:
+    :param next_values:
+    :param dones:
+    :param gamma:
+    :param rho_bar:
+    :param c_bar:
+    :return: V-trace targets, policy advantages and clipped importance weights,
+        each with the shape of ``values``.
+    """
+    assert values.shape == rewards.shape == next_values.shape == dones.shape == log_rhos.shape
+    assert c_bar <= rho_bar
+
+    rhos = torch.exp(log_rhos)
+    clip_rhos = torch.clamp(rhos, max=rho_bar)
+    clip_cs = torch.clamp(rhos, max=c_bar)
+    dones = dones.to(dtype=torch.bool)
+
+    deltas = clip_rhos * (rewards + gamma * next_values - values)
+    # the trace is cut after the end of a trajectory
+    discounts = torch.where(dones, torch.zeros_like(clip_cs), gamma * clip_cs)
+    # v_s - V(x_s)
+    v_s_minus_v = []
+    last = torch.zeros_like(values[0])
+    for delta, discount in zip(reversed(deltas.unbind(0)), reversed(discounts.unbind(0))):
+        last = torch.addcmul(delta, discount, last)
+        v_s_minus_v.append(last)
+    v_s = values + torch.stack(v_s_minus_v[::-1])
+
+    # calculate q_targets
+    v_s_plus_1 = torch.cat([v_s[1:], torch.zeros_like(v_s[:1])])
+    v_s_plus_1 = torch.where(dones, next_values, v_s_plus_1)
+    policy_advantage = clip_rhos * (rewards + gamma * v_s_plus_1 - values)
+
+    return v_s, policy_advantage, clip_rhos
@@ -0,0 +1,285 @@
+# Copyright 2022 OmniSafe Team. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Collector processes streaming experience to a central learner."""
+
+import multiprocessing as mp
+import queue
+import threading
+from copy import deepcopy
+from typing import Optional
+
+import numpy as np
+import torch
+
+from omnisafe.wrappers.wrapper_registry import WRAPPER_REGISTRY
+
+
+class TransitionRecorder:
+    """Stands in for the replay buffer of a collector and records the stored transitions."""
+
+    def __init__(self):
+        self.transitions = []
+
+    # pylint: disable-next=too-many-arguments
+    def store(self, obs, act, rew, cost, next_obs, done):
+        """store"""
+        self.transitions.append((obs, act, rew, cost, next_obs, done))
+
+    def pop(self):
+        """Return the recorded transitions as stacked arrays and forget them."""
+        transitions, self.transitions = self.transitions, []
+        return tuple(np.stack(column) for column in zip(*transitions))
+
+
+class StatsRecorder:
+    """Stands in for the logger of a collector and records the stored values."""
+
+    def __init__(self):
+        self.values = {}
+
+    def store(self, **kwargs):
+        """store"""
+        for key, value in kwargs.items():
+            self.values.setdefault(key, []).append(np.asarray(value, dtype=np.float64).ravel())
+
+    def pop(self):
+        """Return all values per key as flat arrays and forget them."""
+        values, self.values = self.values, {}
+        return {key: np.concatenate(value) for key, value in values.items()}
+
+
+# pylint: disable-next=too-many-arguments,too-many-locals
+def _collector_worker(
+    wrapper_type,
+    env_id,
+    wrapper_kwargs,
+    shared_actor_critic,
+    lock,
+    version,
+    use_rand_action,
+    steps_per_chunk,
+    seed,
+    transition_queue,
+    stop_event,
+):
+    """Roll out the latest published policy and send the experience in chunks."""
+    torch.set_num_threads(1)
+    torch.manual_seed(seed)
+    np.random.seed(seed)
+    env = WRAPPER_REGISTRY.get(wrapper_type)(env_id, **wrapper_kwargs)
+    env.set_seed(seed)
+    env.reset(seed=seed)
+    actor_critic = deepcopy(shared_actor_critic)
+    local_version = -1
+    transitions, stats = TransitionRecorder(), StatsRecorder()
+    try:
+        while not stop_event.is_set():
+            if version.value != local_version:
+                with lock:
+                    actor_critic.load_state_dict(shared_actor_critic.state_dict())
+                    local_version = version.value
+            env.roll_out(
+                actor_critic,
+                transitions,
+                stats,
+                deterministic=False,
+                use_rand_action=bool(use_rand_action.value),
+                ep_steps=steps_per_chunk,
+            )
+            chunk = (transitions.pop(), stats.pop())
+            while not stop_event.is_set():
+                try:
+                    transition_queue.put(chunk, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        env.close()
+
+
+# pylint: disable-next=too-many-instance-attributes
+class CollectorPool:
+    """
+    Collector processes for the actor-learner mode of the off-policy algorithms.
+
+    Every collector owns an environment wrapper and calls its ``roll_out`` with a local
+    copy of the actor-critic, which is refreshed whenever the learner has published new
+    weights with :meth:`publish`. The collected transitions and logged values are sent
+    to the learner in chunks of ``steps_per_chunk`` steps through a bounded queue, so the
+    experience is at most ``queue_size`` chunks older than the latest weights.
+    """
+
+    # seconds to wait for a chunk before checking that the collectors are alive
+    poll_timeout = 1.0
+
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+        self,
+        actor_critic: torch.nn.Module,
+        wrapper_type: str,
+        env_id: str,
+        num_collectors: int,
+        steps_per_chunk: int,
+        seed: int = 0,
+        queue_size: Optional[int] = None,
+        context: Optional[str] = None,
+        **wrapper_kwargs,
+    ):
+        """Initialize the pool and start the collectors.
+
+        Args:
+            actor_critic (torch.nn.Module): the learner's actor-critic, published once.
+            wrapper_type (str): name of the registered environment wrapper.
+            env_id (str): environment id.
+            num_collectors (int): number of collector processes.
+            steps_per_chunk (int): number of transitions each collector sends at once.
+            seed (int): base seed, the ``i``-th collector uses ``seed + 1000 * (i + 1)``.
+            queue_size (int): maximal number of pending chunks, ``num_collectors`` if ``None``.
+            context (str): multiprocessing start method, the platform default if ``None``.
+            wrapper_kwargs (dict): The additional parameters of the environment wrapper.
+        """
+        ctx = mp.get_context(context)
+        self.shared_actor_critic = deepcopy(actor_critic).share_memory()
+        self.lock = ctx.Lock()
+        self.version = ctx.Value('i', 0)
+        self.use_rand_action = ctx.Value('b', True)
+        self.queue = ctx.Queue(maxsize=queue_size or num_collectors)
+        self.stop_event = ctx.Event()
+        self.processes = []
+        for collector_idx in range(num_collectors):
+            process = ctx.Process(
+                target=_collector_worker,
+                args=(
+                    wrapper_type,
+                    env_id,
+                    wrapper_kwargs,
+                    self.shared_actor_critic,
+                    self.lock,
+                    self.version,
+                    self.use_rand_action,
+                    steps_per_chunk,
+                    seed + 1000 * (collector_idx + 1),
+                    self.queue,
+                    self.stop_event,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+        self.closed = False
+
+    def publish(self, actor_critic: torch.nn.Module):
+        """Copy the learner's weights to the shared actor-critic of the collectors."""
+        with self.lock:
+            self.shared_actor_critic.load_state_dict(actor_critic.state_dict())
+            self.version.value += 1
+
+    def collect(self, num_steps: int, buf, logger, use_rand_action: bool = False) -> int:
+        """Move at least ``num_steps`` transitions into ``buf`` and their values to ``logger``.
+
+        Returns:
+            the number of received transitions.
+        """
+        self.use_rand_action.value = use_rand_action
+        num_received = 0
+        while num_received < num_steps:
+            try:
+                transitions, stats = self.queue.get(timeout=self.poll_timeout)
+            except queue.Empty:
+                self._check_alive()
+                continue
+            buf.store_batch(*transitions)
+            for key, values in stats.items():
+                logger.store(**{key: values})
+            num_received += len(transitions[0])
+        return num_received
+
+    def _check_alive(self):
+        """Close the pool and raise an error if a collector has exited."""
+        for collector_idx, process in enumerate(self.processes):
+            if not process.is_alive():
+                exitcode = process.exitcode
+                self.close()
+                raise RuntimeError(
+                    f'Collector {collector_idx} (pid {process.pid}) exited with code {exitcode}.'
+                )
+
+    @property
+    def pids(self) -> list:
+        """Process ids of the collectors."""
+        return [process.pid for process in self.processes]
+
+    def close(self):
+        """Stop the collectors."""
+        if self.closed:
+            return
+        self.stop_event.set()
+        for process in self.processes:
+            # drain the queue, so that no collector blocks on a full pipe
+            while process.is_alive():
+                try:
+                    self.queue.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+                process.join(timeout=0.1)
+        self.closed = True
+
+
+class BackgroundRollout:
+    """
+    Runs the ``roll_out`` of an on-policy environment wrapper in a background thread.
+
+    The rollout acts with a snapshot of the actor-critic taken in :meth:`start`, so the
+    learner may update its own actor-critic meanwhile. The logged values are recorded
+    apart from the learner's logger and handed over in :meth:`wait`. The environments
+    spend most of the time outside the GIL, in particular with ``use_subprocess_env``.
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self.stats = StatsRecorder()
+        self.thread = None
+        self.error = None
+
+    def _run(self, actor_critic, buf):
+        try:
+            self.env.roll_out(actor_critic, buf, self.stats)
+        except Exception as error:  # pylint: disable=broad-except
+            self.error = error
+
+    def start(self, actor_critic: torch.nn.Module, buf, **rollout_cfgs):
+        """Start collecting one epoch into ``buf`` with a copy of ``actor_critic``.
+
+        The ``rollout_cfgs`` are set on the environment wrapper before the thread starts,
+        which is the only time no rollout reads them.
+        """
+        assert self.thread is None, 'The previous rollout has not been waited for.'
+        self.env.set_rollout_cfgs(**rollout_cfgs)
+        self.thread = threading.Thread(
+            target=self._run, args=(deepcopy(actor_critic), buf), daemon=True
+        )
+        self.thread.start()
+
+    def wait(self, logger):
+        """Wait for the rollout and move its logged values to ``logger``."""
+        self.thread.join()
+        self.thread = None
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+        for key, values in self.stats.pop().items():
+            logger.store(**{key: values})
@@ -14,8 +14,6 @@
 # ==============================================================================
 """Early terminated wrapper."""
 
-import torch
-
 from omnisafe.wrappers.on_policy_wrapper import OnPolicyEnvWrapper
 from omnisafe.wrappers.wrapper_registry import WRAPPER_REGISTRY
 
@@ -24,64 +22,7 @@ from omnisafe.wrappers.wrapper_registry import WRAPPER_REGISTRY
 class EarlyTerminatedEnvWrapper(OnPolicyEnvWrapper):  # pylint: disable=too-many-instance-attributes
     """EarlyTerminatedEnvWrapper."""
 
-    # pylint: disable-next=too-many-locals
-    def roll_out(self, agent, buf, logger):
-        """Collect data and store to experience buffer.
-        Terminated when the episode is done or the episode length is larger than max_ep_len
+    def is_terminal(self, done, truncated, timeout, cost):
+        """Terminated when the episode is done or the episode length is larger than max_ep_len
         or cost is unequal to 0."""
-        obs, _ = self.env.reset()
-        ep_ret, ep_costs, ep_len = 0.0, 0.0, 0
-        for step_i in range(self.local_steps_per_epoch):
-            action, value, cost_value, logp = agent.step(torch.as_tensor(obs, dtype=torch.float32))
-            next_obs, reward, cost, done, truncated, _ = self.step(action)
-            ep_ret += reward
-            ep_costs += (self.cost_gamma**ep_len) * cost
-            ep_len += 1
-
-            # Save and log
-            # Notes:
-            #   - raw observations are stored to buffer (later transformed)
-            #   - reward scaling is performed in buffer
-            buf.store(
-                obs=obs,
-                act=action,
-                rew=reward,
-                val=value,
-                logp=logp,
-                cost=cost,
-                cost_val=cost_value,
-            )
-
-            # Store values for statistic purpose
-            if self.use_cost:
-                logger.store(**{'Values/V': value, 'Values/C': cost_value})
-            else:
-                logger.store(**{'Values/V': value})
-
-            # Update observation
-            obs = next_obs
-
-            timeout = ep_len == self.max_ep_len
-            terminal = done or timeout or truncated or cost
-            epoch_ended = step_i == self.local_steps_per_epoch - 1
-
-            if terminal or epoch_ended:
-                if timeout or epoch_ended:
-                    _, value, cost_value, _ = agent(torch.as_tensor(obs, dtype=torch.float32))
-                else:
-                    value, cost_value = 0.0, 0.0
-
-                # Automatically compute GAE in buffer
-                buf.finish_path(value, cost_value, penalty_param=float(self.penalty_param))
-
-                # Only save EpRet / EpLen if trajectory finished
-                if terminal:
-                    logger.store(
-                        **{
-                            'Metrics/EpRet': ep_ret,
-                            'Metrics/EpLen': ep_len,
-                            'Metrics/EpCost': ep_costs,
-                        }
-                    )
-                ep_ret, ep_costs, ep_len = 0.0, 0.0, 0
-                obs, _ = self.env.reset()
+        return done | truncated | timeout | (cost != 0)
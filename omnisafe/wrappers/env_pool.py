@@ -0,0 +1,297 @@
+# Copyright 2022 OmniSafe Team. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Pools of environments which are stepped in lockstep."""
+
+import ctypes
+import multiprocessing as mp
+from typing import Optional
+
+import numpy as np
+import safety_gymnasium
+
+
+class SyncEnvPool:
+    """Steps a list of environments one after another in the current process.
+
+    :class:`SyncEnvPool` and :class:`SubprocEnvPool` share the same interface,
+    so that the environment wrappers can use either of them.
+    """
+
+    def __init__(self, envs: list):
+        """Initialize the pool.
+
+        Args:
+            envs (list): the environments, e.g. made by ``safety_gymnasium.make``.
+        """
+        self.envs = envs
+        self.num_envs = len(envs)
+        self.observation_space = envs[0].observation_space
+        self.action_space = envs[0].action_space
+        self._actions = None
+        self._indices = None
+
+    @property
+    def pids(self) -> list:
+        """Process ids of the workers, none as all environments run in this process."""
+        return []
+
+    def reset(self, indices=None, seed: Optional[int] = None):
+        """Reset the environments in ``indices``, the ``i``-th one with ``seed + i``.
+
+        Args:
+            indices (list): indices of the environments to reset, all of them if ``None``.
+            seed (int): base seed, environments are not re-seeded if ``None``.
+
+        Returns:
+            the stacked observations and the list of info dicts.
+        """
+        indices = range(self.num_envs) if indices is None else indices
+        obs, infos = [], []
+        for env_idx in indices:
+            env_obs, info = self.envs[env_idx].reset(seed=None if seed is None else seed + env_idx)
+            obs.append(env_obs)
+            infos.append(info)
+        return np.stack(obs), infos
+
+    def step_async(self, actions, indices=None):
+        """Schedule a step of the environments in ``indices`` with one action row each."""
+        self._actions = actions
+        self._indices = range(self.num_envs) if indices is None else indices
+
+    def step_wait(self):
+        """Wait for the step scheduled by :meth:`step_async`.
+
+        Returns:
+            next_obs, reward, cost, terminated, truncated as arrays with one row per
+            stepped environment, and the list of info dicts.
+        """
+        results = [
+            self.envs[env_idx].step(action) for env_idx, action in zip(self._indices, self._actions)
+        ]
+        self._actions, self._indices = None, None
+        next_obs, reward, cost, terminated, truncated, infos = zip(*results)
+        return (
+            np.stack(next_obs),
+            np.asarray(reward, dtype=np.float32),
+            np.asarray(cost, dtype=np.float32),
+            np.asarray(terminated, dtype=bool),
+            np.asarray(truncated, dtype=bool),
+            list(infos),
+        )
+
+    def step(self, actions, indices=None):
+        """Step the environments in ``indices`` and return the results of :meth:`step_wait`."""
+        self.step_async(actions, indices)
+        return self.step_wait()
+
+    def close(self):
+        """Close all environments."""
+        for env in self.envs:
+            env.close()
+
+
+def _shared_array(ctx, shape, dtype):
+    """Allocate a shared memory block and return it with the information to view it."""
+    dtype = np.dtype(dtype)
+    raw = ctx.RawArray(ctypes.c_byte, int(np.prod(shape)) * dtype.itemsize)
+    return raw, shape, dtype
+
+
+def _as_numpy(raw, shape, dtype):
+    """View a shared memory block as a numpy array."""
+    return np.frombuffer(raw, dtype=dtype).reshape(shape)
+
+
+# pylint: disable-next=too-many-arguments
+def _worker(remote, parent_remote, env_id, env_kwargs, env_idx, shared):
+    """Run one environment and write its results into the shared memory blocks."""
+    parent_remote.close()
+    env = safety_gymnasium.make(env_id, **env_kwargs)
+    obs, act, rew, cost, terminated, truncated = (_as_numpy(*block) for block in shared)
+    try:
+        while True:
+            cmd, data = remote.recv()
+            if cmd == 'step':
+                (
+                    obs[env_idx],
+                    rew[env_idx],
+                    cost[env_idx],
+                    terminated[env_idx],
+                    truncated[env_idx],
+                    info,
+                ) = env.step(act[env_idx])
+                remote.send(info)
+            elif cmd == 'reset':
+                obs[env_idx], info = env.reset(seed=data)
+                remote.send(info)
+            elif cmd == 'close':
+                break
+            else:
+                raise NotImplementedError(f'Unknown command {cmd}')
+    except KeyboardInterrupt:
+        pass
+    finally:
+        env.close()
+        remote.close()
+
+
+# pylint: disable-next=too-many-instance-attributes
+class SubprocEnvPool:
+    """Runs every environment in its own worker process.
+
+    Actions, observations, rewards, costs and done flags are exchanged through
+    preallocated shared memory, the pipes only carry short commands and info dicts.
+    Between :meth:`step_async` and :meth:`step_wait` the workers step in parallel,
+    while the calling process is free to do other work.
+    """
+
+    def __init__(self, env_id: str, num_envs: int, context: Optional[str] = None, **env_kwargs):
+        """Initialize the pool and start the workers.
+
+        Args:
+            env_id (str): environment id.
+            num_envs (int): number of environments, i.e. worker processes.
+            context (str): multiprocessing start method, the platform default if ``None``.
+            env_kwargs (dict): The additional parameters of environments.
+        """
+        probe = safety_gymnasium.make(env_id, **env_kwargs)
+        self.observation_space = probe.observation_space
+        self.action_space = probe.action_space
+        probe.close()
+        self.num_envs = num_envs
+
+        ctx = mp.get_context(context)
+        obs_space, act_space = self.observation_space, self.action_space
+        shared = (
+            _shared_array(ctx, (num_envs, *obs_space.shape), obs_space.dtype),
+            _shared_array(ctx, (num_envs, *act_space.shape), act_space.dtype),
+            _shared_array(ctx, (num_envs,), np.float64),
+            _shared_array(ctx, (num_envs,), np.float64),
+            _shared_array(ctx, (num_envs,), bool),
+            _shared_array(ctx, (num_envs,), bool),
+        )
+        (
+            self._obs,
+            self._act,
+            self._rew,
+            self._cost,
+            self._terminated,
+            self._truncated,
+        ) = (_as_numpy(*block) for block in shared)
+
+        self.remotes, self.processes = [], []
+        for env_idx in range(num_envs):
+            remote, work_remote = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(work_remote, remote, env_id, env_kwargs, env_idx, shared),
+                daemon=True,
+            )
+            process.start()
+            work_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+        self._indices = None
+        self.closed = False
+
+    @property
+    def pids(self) -> list:
+        """Process ids of the workers."""
+        return [process.pid for process in self.processes]
+
+    def reset(self, indices=None, seed: Optional[int] = None):
+        """Reset the environments in ``indices``, the ``i``-th one with ``seed + i``.
+
+        Args:
+            indices (list): indices of the environments to reset, all of them if ``None``.
+            seed (int): base seed, environments are not re-seeded if ``None``.
+
+        Returns:
+            the stacked observations and the list of info dicts.
+        """
+        indices = np.arange(self.num_envs) if indices is None else np.asarray(indices)
+        for env_idx in indices:
+            self.remotes[env_idx].send(('reset', None if seed is None else seed + int(env_idx)))
+        infos = [self.remotes[env_idx].recv() for env_idx in indices]
+        return self._obs[indices], infos
+
+    def step_async(self, actions, indices=None):
+        """Write the actions to shared memory and let the workers step."""
+        indices = np.arange(self.num_envs) if indices is None else np.asarray(indices)
+        self._act[indices] = actions
+        for env_idx in indices:
+            self.remotes[env_idx].send(('step', None))
+        self._indices = indices
+
+    def step_wait(self):
+        """Wait for the step scheduled by :meth:`step_async`.
+
+        Returns:
+            next_obs, reward, cost, terminated, truncated as arrays with one row per
+            stepped environment, and the list of info dicts. The arrays are copies,
+            so they stay valid while the next step is running.
+        """
+        indices, self._indices = self._indices, None
+        infos = [self.remotes[env_idx].recv() for env_idx in indices]
+        return (
+            self._obs[indices],
+            self._rew[indices].astype(np.float32),
+            self._cost[indices].astype(np.float32),
+            self._terminated[indices],
+            self._truncated[indices],
+            infos,
+        )
+
+    def step(self, actions, indices=None):
+        """Step the environments in ``indices`` and return the results of :meth:`step_wait`."""
+        self.step_async(actions, indices)
+        return self.step_wait()
+
+    def close(self):
+        """Stop the workers."""
+        if self.closed:
+            return
+        if self._indices is not None:
+            for env_idx in self._indices:
+                self.remotes[env_idx].recv()
+        for remote in self.remotes:
+            remote.send(('close', None))
+        for process in self.processes:
+            process.join()
+        self.closed = True
+
+
+def make_env_pool(
+    env_id: str,
+    num_envs: int = 1,
+    use_subprocess_env: bool = False,
+    env: Optional[object] = None,
+    **env_kwargs,
+):
+    """Make a pool of ``num_envs`` environments.
+
+    Args:
+        env_id (str): environment id.
+        num_envs (int): number of environments.
+        use_subprocess_env (bool): whether to step every environment in a worker process.
+        env (gymnasium.Env): an already made environment, reused as the first one of a
+            :class:`SyncEnvPool`.
+        env_kwargs (dict): The additional parameters of environments.
+    """
+    if use_subprocess_env:
+        return SubprocEnvPool(env_id, num_envs, **env_kwargs)
+    envs = [] if env is None else [env]
+    envs += [safety_gymnasium.make(env_id, **env_kwargs) for _ in range(num_envs - len(envs))]
+    return SyncEnvPool(envs)
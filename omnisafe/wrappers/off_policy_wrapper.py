@@ -14,9 +14,11 @@
 # ==============================================================================
 """Environment wrapper for off-policy algorithms."""
 
+import numpy as np
 import safety_gymnasium
 import torch
 
+from omnisafe.wrappers.env_pool import make_env_pool
 from omnisafe.wrappers.wrapper_registry import WRAPPER_REGISTRY
 
 
@@ -30,10 +32,27 @@ class OffPolicyEnvWrapper:
         env_id,
         use_cost,
         max_ep_len,
+        num_envs: int = 1,
+        use_subprocess_env: bool = False,
         **env_kwargs,
     ):
+        """Initialize environment wrapper.
+
+        Args:
+            env_id (str): environment id.
+            use_cost (bool): whether to log the cost values.
+            max_ep_len (int): the max length of an episode if the environment has no time limit.
+            num_envs (int): number of environments stepped in lockstep by :meth:`roll_out`.
+            use_subprocess_env (bool): whether to step each environment in a worker process.
+            env_kwargs (dict): The additional parameters of environments.
+        """
         # check env_id is str
+        assert num_envs >= 1, 'num_envs must be a positive integer.'
+        self.num_envs = num_envs
         self.env = safety_gymnasium.make(env_id, **env_kwargs)
+        self.env_pool = make_env_pool(
+            env_id, num_envs, use_subprocess_env=use_subprocess_env, env=self.env, **env_kwargs
+        )
         self.env_id = env_id
         self.render_mode = env_kwargs.get('render_mode', None)
         self.camera_id = env_kwargs.get('camera_id', None)
@@ -52,10 +71,10 @@ class OffPolicyEnvWrapper:
         self.observation_space = self.env.observation_space
         self.action_space = self.env.action_space
         self.seed = None
-        self.curr_o, _ = self.env.reset(seed=self.seed)
-        self.ep_ret = 0
-        self.ep_cost = 0
-        self.ep_len = 0
+        self.curr_o, _ = self.env_pool.reset(seed=self.seed)
+        self.ep_ret = np.zeros(num_envs)
+        self.ep_cost = np.zeros(num_envs)
+        self.ep_len = np.zeros(num_envs, dtype=int)
         # self.deterministic = False
         self.local_steps_per_epoch = None
         self.cost_gamma = None
@@ -66,9 +85,10 @@ class OffPolicyEnvWrapper:
         return self.env
 
     def reset(self, seed=None):
-        """reset environment"""
-        self.curr_o, info = self.env.reset(seed=seed)
-        return self.curr_o, info
+        """reset environments and return the observation and info of the first one"""
+        self.curr_o, infos = self.env_pool.reset(seed=seed)
+        self.ep_ret[:], self.ep_cost[:], self.ep_len[:] = 0, 0, 0
+        return self.curr_o[0], infos[0]
 
     def render(self):
         """render environment"""
@@ -88,6 +108,11 @@ class OffPolicyEnvWrapper:
         next_obs, reward, cost, terminated, truncated, info = self.env.step(action)
         return next_obs, reward, cost, terminated, truncated, info
 
+    def close(self):
+        """close environments"""
+        self.env.close()
+        self.env_pool.close()
+
     # pylint: disable=too-many-arguments, too-many-locals
     def roll_out(
         self,
@@ -98,59 +123,52 @@ class OffPolicyEnvWrapper:
         use_rand_action,
         ep_steps,
     ):
-        """collect data and store to experience buffer."""
-        for _ in range(ep_steps):
-            ep_ret = self.ep_ret
-            ep_len = self.ep_len
-            ep_cost = self.ep_cost
-            obs = self.curr_o
+        """collect data and store to experience buffer.
+
+        During training all ``num_envs`` environments are stepped in lockstep, so that
+        ``ep_steps`` transitions take ``ep_steps // num_envs`` batched forward passes.
+        A deterministic test episode only runs in the first environment.
+        """
+        indices = np.arange(1) if deterministic else np.arange(self.num_envs)
+        for _ in range(ep_steps // len(indices)):
+            obs = self.curr_o[indices]
             action, value, cost_value, _ = actor_critic.step(
                 torch.as_tensor(obs, dtype=torch.float32), deterministic=deterministic
             )
+            if use_rand_action:
+                action = np.stack([self.env.action_space.sample() for _ in indices])
+            # Step the env
+            self.env_pool.step_async(action, indices)
             # Store values for statistic purpose
             if self.use_cost:
                 logger.store(**{'Values/V': value, 'Values/C': cost_value})
             else:
                 logger.store(**{'Values/V': value})
-            if use_rand_action:
-                action = self.env.action_space.sample()
-            # Step the env
-            # pylint: disable=unused-variable
-            obs_next, reward, cost, done, truncated, info = self.step(action)
-            ep_ret += reward
-            ep_cost += cost
-            ep_len += 1
-            self.ep_len = ep_len
-            self.ep_ret = ep_ret
-            self.ep_cost = ep_cost
+            obs_next, reward, cost, done, _, _ = self.env_pool.step_wait()
+            self.ep_ret[indices] += reward
+            self.ep_cost[indices] += cost
+            self.ep_len[indices] += 1
+            self.curr_o[indices] = obs_next
             # Ignore the "done" signal if it comes from hitting the time
             # horizon (that is, when it's an artificial terminal signal
             # that isn't based on the agent's state)
-            self.curr_o = obs_next
+            timeout = self.ep_len[indices] >= self.max_ep_len
+            finished = indices[done | timeout]
+            prefix = 'Test' if deterministic else 'Metrics'
             if not deterministic:
-                done = False if ep_len >= self.max_ep_len else done
-                buf.store(obs, action, reward, cost, obs_next, done)
-                if done or ep_len >= self.max_ep_len:
-                    logger.store(
-                        **{
-                            'Metrics/EpRet': ep_ret,
-                            'Metrics/EpLen': ep_len,
-                            'Metrics/EpCost': ep_cost,
-                        }
-                    )
-                    self.curr_o, _ = self.env.reset(seed=self.seed)
-                    self.ep_ret, self.ep_cost, self.ep_len = 0, 0, 0
-
-            else:
-                if done or ep_len >= self.max_ep_len:
-                    logger.store(
-                        **{
-                            'Test/EpRet': ep_ret,
-                            'Test/EpLen': ep_len,
-                            'Test/EpCost': ep_cost,
-                        }
-                    )
-                    self.curr_o, _ = self.env.reset(seed=self.seed)
-                    self.ep_ret, self.ep_cost, self.ep_len = 0, 0, 0
-
+                done = done & ~timeout
+                for i in range(len(indices)):
+                    buf.store(obs[i], action[i], reward[i], cost[i], obs_next[i], done[i])
+            for env_idx in finished:
+                logger.store(
+                    **{
+                        f'{prefix}/EpRet': self.ep_ret[env_idx],
+                        f'{prefix}/EpLen': self.ep_len[env_idx],
+                        f'{prefix}/EpCost': self.ep_cost[env_idx],
+                    }
+                )
+            if len(finished) > 0:
+                self.curr_o[finished], _ = self.env_pool.reset(finished, seed=self.seed)
+                self.ep_ret[finished], self.ep_cost[finished], self.ep_len[finished] = 0, 0, 0
+                if deterministic:
                     return
@@ -18,9 +18,11 @@ import collections
 from copy import deepcopy
 from typing import Optional
 
+import numpy as np
 import safety_gymnasium
 import torch
 
+from omnisafe.wrappers.env_pool import make_env_pool
 from omnisafe.wrappers.wrapper_registry import WRAPPER_REGISTRY
 
 
@@ -28,15 +30,29 @@ from omnisafe.wrappers.wrapper_registry import WRAPPER_REGISTRY
 class OnPolicyEnvWrapper:  # pylint: disable=too-many-instance-attributes
     """env_wrapper."""
 
-    def __init__(self, env_id, cfgs: Optional[collections.namedtuple] = None, **env_kwargs):
+    def __init__(
+        self,
+        env_id,
+        cfgs: Optional[collections.namedtuple] = None,
+        num_envs: int = 1,
+        use_subprocess_env: bool = False,
+        **env_kwargs,
+    ):
         """Initialize environment wrapper.
 
         Args:
             env_id (str): environment id.
             cfgs (collections.namedtuple): configs.
+            num_envs (int): number of environments stepped in lockstep by :meth:`roll_out`.
+            use_subprocess_env (bool): whether to step each environment in a worker process.
             env_kwargs (dict): The additional parameters of environments.
         """
+        assert num_envs >= 1, 'num_envs must be a positive integer.'
+        self.num_envs = num_envs
         self.env = safety_gymnasium.make(env_id, **env_kwargs)
+        self.env_pool = make_env_pool(
+            env_id, num_envs, use_subprocess_env=use_subprocess_env, env=self.env, **env_kwargs
+        )
         self.cfgs = deepcopy(cfgs)
         self.env_id = env_id
         self.render_mode = env_kwargs.get('render_mode', None)
@@ -72,8 +88,13 @@ class OnPolicyEnvWrapper:  # pylint: disable=too-many-instance-attributes
         return self.env
 
     def reset(self, seed=None):
-        """reset environment"""
+        """reset environment
+
+        All environments are reset, the ``i``-th one with ``seed + i``,
+        while only the observation of the first one is returned.
+        """
         self.curr_o, info = self.env.reset(seed=seed)
+        self.env_pool.reset(seed=seed)
         return self.curr_o, info
 
     def render(self):
@@ -94,14 +115,39 @@ class OnPolicyEnvWrapper:  # pylint: disable=too-many-instance-attributes
         next_obs, reward, cost, terminated, truncated, info = self.env.step(action)
         return next_obs, reward, cost, terminated, truncated, info
 
+    def close(self):
+        """close environments"""
+        self.env.close()
+        self.env_pool.close()
+
+    def is_terminal(self, done, truncated, timeout, cost):  # pylint: disable=unused-argument
+        """per-environment terminal mask of the current step."""
+        return done | truncated | timeout
+
     # pylint: disable-next=too-many-locals
     def roll_out(self, agent, buf, logger):
-        """collect data and store to experience buffer."""
-        obs, _ = self.env.reset()
-        ep_ret, ep_costs, ep_len = 0.0, 0.0, 0
-        for step_i in range(self.local_steps_per_epoch):
+        """collect data and store to experience buffer.
+
+        All ``num_envs`` environments are stepped in lockstep, so every step needs only one
+        batched forward pass of the actor and critics. Each environment owns one column of
+        the buffer and finishes its own paths.
+        """
+        obs, _ = self.env_pool.reset()
+        ep_ret = np.zeros(self.num_envs)
+        ep_costs = np.zeros(self.num_envs)
+        ep_len = np.zeros(self.num_envs, dtype=int)
+        steps_per_env = self.local_steps_per_epoch // self.num_envs
+        for step_i in range(steps_per_env):
             action, value, cost_value, logp = agent.step(torch.as_tensor(obs, dtype=torch.float32))
-            next_obs, reward, cost, done, truncated, _ = self.step(action)
+            self.env_pool.step_async(action)
+
+            # Store values for statistic purpose while the environments are stepping
+            if self.use_cost:
+                logger.store(**{'Values/V': value, 'Values/C': cost_value})
+            else:
+                logger.store(**{'Values/V': value})
+
+            next_obs, reward, cost, done, truncated, _ = self.env_pool.step_wait()
             ep_ret += reward
             ep_costs += (self.cost_gamma**ep_len) * cost
             ep_len += 1
@@ -120,36 +166,44 @@ class OnPolicyEnvWrapper:  # pylint: disable=too-many-instance-attributes
                 cost_val=cost_value,
             )
 
-            # Store values for statistic purpose
-            if self.use_cost:
-                logger.store(**{'Values/V': value, 'Values/C': cost_value})
-            else:
-                logger.store(**{'Values/V': value})
-
             # Update observation
             obs = next_obs
 
             timeout = ep_len == self.max_ep_len
-            terminal = done or timeout or truncated
-            epoch_ended = step_i == self.local_steps_per_epoch - 1
-
-            if terminal or epoch_ended:
-                if timeout or epoch_ended:
-                    _, value, cost_value, _ = agent(torch.as_tensor(obs, dtype=torch.float32))
-                else:
-                    value, cost_value = 0.0, 0.0
-
+            terminal = self.is_terminal(done, truncated, timeout, cost)
+            epoch_ended = step_i == steps_per_env - 1
+            finished = np.flatnonzero(terminal | epoch_ended)
+            if len(finished) == 0:
+                continue
+
+            # Bootstrap all finished paths with a single forward pass
+            bootstrap = finished[timeout[finished] | epoch_ended]
+            last_val = np.zeros(self.num_envs, dtype=np.float32)
+            last_cost_val = np.zeros(self.num_envs, dtype=np.float32)
+            if len(bootstrap) > 0:
+                _, value, cost_value, _ = agent(
+                    torch.as_tensor(obs[bootstrap], dtype=torch.float32)
+                )
+                last_val[bootstrap] = value
+                last_cost_val[bootstrap] = cost_value
+
+            for env_idx in finished:
                 # Automatically compute GAE in buffer
-                buf.finish_path(value, cost_value, penalty_param=float(self.penalty_param))
+                buf.finish_path(
+                    last_val[env_idx],
+                    last_cost_val[env_idx],
+                    penalty_param=float(self.penalty_param),
+                    env_idx=env_idx,
+                )
 
                 # Only save EpRet / EpLen if trajectory finished
-                if terminal:
+                if terminal[env_idx]:
                     logger.store(
                         **{
-                            'Metrics/EpRet': ep_ret,
-                            'Metrics/EpLen': ep_len,
-                            'Metrics/EpCost': ep_costs,
+                            'Metrics/EpRet': ep_ret[env_idx],
+                            'Metrics/EpLen': ep_len[env_idx],
+                            'Metrics/EpCost': ep_costs[env_idx],
                         }
                     )
-                ep_ret, ep_costs, ep_len = 0.0, 0.0, 0
-                obs, _ = self.env.reset()
+                ep_ret[env_idx], ep_costs[env_idx], ep_len[env_idx] = 0.0, 0.0, 0
+            obs[finished], _ = self.env_pool.reset(finished)
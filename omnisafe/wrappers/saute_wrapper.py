@@ -30,6 +30,8 @@ class SauteEnvWrapper(OnPolicyEnvWrapper):
         self,
         env_id,
         cfgs,
+        num_envs: int = 1,
+        use_subprocess_env: bool = False,
         **env_kwargs,
     ) -> None:
         """Initialize SauteEnvWrapper.
@@ -37,8 +39,13 @@ class SauteEnvWrapper(OnPolicyEnvWrapper):
         Args:
             env_id (str): environment id.
             cfgs (dict): configuration dictionary.
+            num_envs (int): number of environments, the safety state is tracked for one only.
+            use_subprocess_env (bool): whether to step the environment in a worker process.
             env_kwargs (dict): The additional parameters of environments.
         """
+        assert (
+            num_envs == 1 and not use_subprocess_env
+        ), 'SauteEnvWrapper only supports a single in-process environment.'
         super().__init__(env_id, **env_kwargs)
 
         self.unsafe_reward = cfgs.unsafe_reward
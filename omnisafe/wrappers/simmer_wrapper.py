@@ -279,14 +279,26 @@ class QController:  # pylint: disable=too-many-instance-attributes
 class SimmerEnvWrapper(OnPolicyEnvWrapper):  # pylint: disable=too-many-instance-attributes
     """Wrapper for the Simmer environment."""
 
-    def __init__(self, env_id, cfgs, **env_kwargs) -> None:
+    def __init__(
+        self,
+        env_id,
+        cfgs,
+        num_envs: int = 1,
+        use_subprocess_env: bool = False,
+        **env_kwargs,
+    ) -> None:
         """Initialize the Simmer environment wrapper.
 
         Args:
             env_id (str): The environment id.
             cfgs (Config): The configuration.
+            num_envs (int): The number of environments, the safety state is tracked for one only.
+            use_subprocess_env (bool): Whether to step the environment in a worker process.
             env_kwargs (dict): The additional parameters of environments.
         """
+        assert (
+            num_envs == 1 and not use_subprocess_env
+        ), 'SimmerEnvWrapper only supports a single in-process environment.'
         super().__init__(env_id, **env_kwargs)
 
         self.unsafe_reward = cfgs.unsafe_reward
@@ -0,0 +1,92 @@
+# Copyright 2022 OmniSafe Team. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Test core functions"""
+
+import numpy as np
+import torch
+
+import helpers
+from omnisafe.utils.core import discount_cumsum, segment_discount_cumsum, segment_gae
+from omnisafe.utils.tools import block_conjugate_gradients, conjugate_gradients
+
+
+@helpers.parametrize(
+    mean_ep_len=[1, 5, 50],
+    discount=[0.0, 0.95, 1.0],
+)
+def test_segment_discount_cumsum(mean_ep_len, discount):
+    """Test that all segments are computed like single paths"""
+    rng = np.random.default_rng(0)
+    x_vector = rng.normal(size=500)
+    segment_ends = np.cumsum(rng.geometric(1.0 / mean_ep_len, size=500))
+    segment_ends = np.append(segment_ends[segment_ends < 500], 500)
+
+    result = segment_discount_cumsum(x_vector, segment_ends, discount)
+    for start, end in zip(np.append(0, segment_ends[:-1]), segment_ends):
+        np.testing.assert_allclose(
+            result[start:end], discount_cumsum(x_vector[start:end], discount), atol=1e-8
+        )
+
+
+@helpers.parametrize(mean_ep_len=[1, 5, 50])
+def test_segment_gae(mean_ep_len):
+    """Test GAE of all segments against the per-path computation"""
+    gamma, lam = 0.99, 0.95
+    rng = np.random.default_rng(0)
+    rewards, values = rng.normal(size=(2, 500))
+    segment_ends = np.cumsum(rng.geometric(1.0 / mean_ep_len, size=500))
+    segment_ends = np.append(segment_ends[segment_ends < 500], 500)
+    last_values = rng.normal(size=len(segment_ends))
+
+    adv, targets, rewards_to_go = segment_gae(
+        rewards, values, last_values, segment_ends, gamma, lam
+    )
+    starts = np.append(0, segment_ends[:-1])
+    for start, end, last_val in zip(starts, segment_ends, last_values):
+        rews = np.append(rewards[start:end], last_val)
+        vals = np.append(values[start:end], last_val)
+        deltas = rews[:-1] + gamma * vals[1:] - vals[:-1]
+        expected_adv = discount_cumsum(deltas, gamma * lam)
+        np.testing.assert_allclose(adv[start:end], expected_adv, atol=1e-8)
+        np.testing.assert_allclose(targets[start:end], expected_adv + vals[:-1], atol=1e-8)
+        np.testing.assert_allclose(
+            rewards_to_go[start:end], discount_cumsum(rews, gamma)[:-1], atol=1e-8
+        )
+
+
+@helpers.parametrize(num_systems=[1, 2, 3], num_steps=[1, 10, 50])
+def test_block_conjugate_gradients(num_systems, num_steps):
+    """Test that every system is solved like a single one, with one product per step"""
+    generator = torch.Generator().manual_seed(0)
+    matrix = torch.randn(30, 30, generator=generator, dtype=torch.float64)
+    matrix = matrix @ matrix.T + 0.1 * torch.eye(30, dtype=torch.float64)
+    b_vectors = torch.randn(num_systems, 30, generator=generator, dtype=torch.float64)
+    calls = []
+
+    def batched_product(vectors):
+        calls.append(len(vectors))
+        return vectors @ matrix
+
+    solutions, products, quadratic_forms = block_conjugate_gradients(
+        batched_product, b_vectors, num_steps
+    )
+    assert len(calls) <= num_steps
+    torch.testing.assert_close(products, solutions @ matrix)
+    torch.testing.assert_close(quadratic_forms, solutions @ matrix @ solutions.T)
+    for b_vector, solution in zip(b_vectors, solutions):
+        expected = conjugate_gradients(lambda vector: matrix @ vector, b_vector.clone(), num_steps)
+        torch.testing.assert_close(solution, expected)
+    if num_steps == 50:
+        torch.testing.assert_close(solutions @ matrix, b_vectors, rtol=0, atol=1e-3)
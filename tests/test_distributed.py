@@ -0,0 +1,173 @@
+# Copyright 2022 OmniSafe Team. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Test distributed utils"""
+
+import os
+import re
+import socket
+import subprocess
+import sys
+
+import numpy as np
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+
+import helpers
+from omnisafe.utils import cpu_affinity, distributed_utils
+
+
+SCRIPT = '''
+import sys
+
+from omnisafe.utils import distributed_utils
+
+if distributed_utils.mpi_fork(2, nnodes=2, node_rank=int(sys.argv[1]), rdzv_endpoint=sys.argv[2]):
+    sys.exit()
+rank = distributed_utils.proc_id()
+print(f'rank={rank} procs={distributed_utils.num_procs()} sum={distributed_utils.mpi_sum(rank)};', flush=True)
+'''
+
+
+ELASTIC_SCRIPT = '''
+import os
+import sys
+
+import omnisafe
+from omnisafe.algorithms.on_policy.base.policy_gradient import PolicyGradient
+from omnisafe.utils import distributed_utils
+
+log = PolicyGradient.log
+
+
+def failing_log(self, epoch):
+    """Let a worker fail in the second epoch of the first attempt."""
+    first_attempt = os.getenv('TORCHELASTIC_RESTART_COUNT') == '0'
+    if epoch == 1 and first_attempt and distributed_utils.proc_id() == 1:
+        raise RuntimeError('injected failure')
+    log(self, epoch)
+
+
+PolicyGradient.log = failing_log
+custom_cfgs = {
+    'epochs': 3,
+    'steps_per_epoch': 2000,
+    'batch_size': 500,
+    'actor_iters': 1,
+    'critic_iters': 1,
+    'data_dir': sys.argv[1],
+}
+agent = omnisafe.Agent(
+    'PPO', 'SafetyPointGoal1-v0', custom_cfgs=custom_cfgs, parallel=2, max_restarts=1
+)
+agent.learn()
+'''
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_mpi_fork_multi_node(tmp_path):
+    """Test two local nodes with two processes each, linked on loopback"""
+    script = tmp_path / 'fork.py'
+    script.write_text(SCRIPT)
+    port = _free_port()
+    nodes = [
+        subprocess.Popen(
+            [sys.executable, str(script), str(node_rank), f'127.0.0.1:{port}'],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for node_rank in range(2)
+    ]
+    outputs = [node.communicate(timeout=300)[0] for node in nodes]
+    assert all(node.returncode == 0 for node in nodes)
+    results = sorted(re.findall(r'rank=\d+ procs=\d+ sum=[\d.]+', ''.join(outputs)))
+    assert results == [f'rank={rank} procs=4 sum=6.0' for rank in range(4)]
+
+
+@helpers.parametrize(num_cores=[1, 3, 16], num_ranks=[1, 2, 4], num_workers=[0, 1, 4])
+def test_core_assignment(num_cores, num_ranks, num_workers):
+    """Test that ranks and workers get distinct cores whenever there are enough"""
+    cores = [(cpu, cpu + num_cores) for cpu in range(num_cores)]
+    assignments = []
+    for rank_cores in cpu_affinity.split_cores(cores, num_ranks):
+        own_cores, worker_cores = cpu_affinity.assign_cores(rank_cores, num_workers)
+        assert len(worker_cores) == num_workers
+        assert own_cores and all(len(worker) == 1 for worker in worker_cores)
+        assignments += [own_cores, *worker_cores]
+    assigned = [core for assignment in assignments for core in assignment]
+    assert set(assigned) == set(cores)
+    if num_cores >= num_ranks * (num_workers + 1):
+        assert len(assigned) == num_cores
+
+
+def _shared_memory_worker(rank, world_size, port):
+    os.environ.update(
+        MASTER_ADDR='127.0.0.1',
+        MASTER_PORT=str(port),
+        OMNISAFE_PARALLEL='1',
+        LOCAL_WORLD_SIZE=str(world_size),
+    )
+    dist.init_process_group('gloo', rank=rank, world_size=world_size)
+    values = torch.arange(10, dtype=torch.float32) * (rank + 1)
+    # reference results of the process group
+    expected = {op: values.clone() for op in (dist.ReduceOp.SUM, dist.ReduceOp.MAX)}
+    for op, tensor in expected.items():
+        dist.all_reduce(tensor, op=op)
+
+    # a capacity smaller than the tensors exchanges them in chunks
+    assert distributed_utils.init_shared_memory_comm(capacity=3)
+    assert distributed_utils.SharedMemoryComm.supports(values, dist.ReduceOp.MAX)
+    for op, tensor in expected.items():
+        result = values.clone()
+        distributed_utils.allreduce(result, op=op)
+        assert torch.equal(result, tensor)
+    np.testing.assert_allclose(distributed_utils.mpi_avg(rank), (world_size - 1) / 2)
+    assert distributed_utils.mpi_min(float(rank)) == 0.0
+
+    torch.manual_seed(rank)
+    net = torch.nn.Linear(4, 3)
+    distributed_utils.sync_params(net)
+    net(torch.randn(8, 4)).sum().backward()
+    grads = [param.grad.clone() for param in net.parameters()]
+    for grad in grads:
+        dist.all_reduce(grad)
+    distributed_utils.mpi_avg_grads(net)
+    torch.manual_seed(0)
+    reference = torch.nn.Linear(4, 3)
+    for param, ref_param, grad in zip(net.parameters(), reference.parameters(), grads):
+        assert torch.equal(param.data, ref_param.data)
+        assert torch.allclose(param.grad, grad / world_size)
+    dist.destroy_process_group()
+
+
+def test_shared_memory_comm():
+    """Test the shared memory collectives against the ones of the process group"""
+    mp.spawn(_shared_memory_worker, args=(3, _free_port()), nprocs=3)
+
+
+def test_elastic_resume(tmp_path):
+    """Test that restarted workers continue from the checkpoint of the last epoch"""
+    script = tmp_path / 'elastic.py'
+    script.write_text(ELASTIC_SCRIPT)
+    subprocess.run([sys.executable, str(script), str(tmp_path / 'runs')], check=True, timeout=900)
+    (progress,) = (tmp_path / 'runs').glob('**/progress.txt')
+    epochs = [line.split()[0] for line in progress.read_text().splitlines()[1:]]
+    assert epochs == ['1', '2', '3']
+    assert [path.name for path in progress.parent.glob('checkpoints/*.pt')] == ['epoch-2.pt']
@@ -0,0 +1,79 @@
+# Copyright 2022 OmniSafe Team. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Test environment pools"""
+
+import os
+import signal
+
+import numpy as np
+import pytest
+import torch
+
+import helpers
+from omnisafe.wrappers.collector import CollectorPool
+from omnisafe.wrappers.env_pool import make_env_pool
+
+
+@helpers.parametrize(num_envs=[1, 3])
+def test_subprocess_env_pool(num_envs):
+    """Test that the subprocess env pool steps exactly like the synchronous one"""
+    env_id = 'SafetyPointGoal1-v0'
+    sync_pool = make_env_pool(env_id, num_envs)
+    subproc_pool = make_env_pool(env_id, num_envs, use_subprocess_env=True)
+    try:
+        sync_obs, _ = sync_pool.reset(seed=0)
+        subproc_obs, _ = subproc_pool.reset(seed=0)
+        np.testing.assert_allclose(sync_obs, subproc_obs)
+
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            actions = rng.uniform(-1.0, 1.0, size=(num_envs, *sync_pool.action_space.shape))
+            subproc_pool.step_async(actions)
+            sync_results = sync_pool.step(actions)
+            subproc_results = subproc_pool.step_wait()
+            for sync_result, subproc_result in zip(sync_results[:5], subproc_results[:5]):
+                np.testing.assert_allclose(sync_result, subproc_result)
+
+        # step and reset a subset of the environments
+        indices = np.arange(num_envs)[-1:]
+        actions = np.zeros((1, *sync_pool.action_space.shape))
+        np.testing.assert_allclose(
+            sync_pool.step(actions, indices)[0], subproc_pool.step(actions, indices)[0]
+        )
+        np.testing.assert_allclose(
+            sync_pool.reset(indices, seed=1)[0], subproc_pool.reset(indices, seed=1)[0]
+        )
+    finally:
+        sync_pool.close()
+        subproc_pool.close()
+
+
+def test_collector_pool_failure():
+    """Test that a collector which died raises an error instead of blocking the learner"""
+    pool = CollectorPool(
+        torch.nn.Linear(1, 1),
+        'OffPolicyEnvWrapper',
+        'SafetyPointGoal1-v0',
+        num_collectors=1,
+        steps_per_chunk=10,
+        use_cost=True,
+        max_ep_len=1000,
+    )
+    pool.poll_timeout = 0.1
+    os.kill(pool.pids[0], signal.SIGKILL)
+    pool.processes[0].join()
+    with pytest.raises(RuntimeError, match='Collector 0 .* exited with code -9'):
+        pool.collect(10**9, buf=None, logger=None)
+    assert pool.closed
@@ -0,0 +1,64 @@
+# Copyright 2022 OmniSafe Team. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Test that importing omnisafe is cheap and algorithms are imported on first use"""
+
+import importlib
+import subprocess
+import sys
+
+import helpers
+import omnisafe
+
+
+HEAVY_MODULES = ['torch', 'scipy', 'safety_gymnasium', 'tensorboard']
+
+
+def run_python(code: str) -> str:
+    """Run ``code`` in a fresh interpreter and return its output."""
+    return subprocess.run(
+        [sys.executable, '-c', code], check=True, capture_output=True, text=True
+    ).stdout
+
+
+def test_import_omnisafe():
+    """Test that importing omnisafe does not load the heavy dependencies"""
+    output = run_python(
+        'import sys, omnisafe\n'
+        f'print(sorted(name for name in {HEAVY_MODULES!r} if name in sys.modules))\n'
+        'print(len(omnisafe.ALGORITHMS["all"]))\n'
+    )
+    loaded, num_algos = output.split('\n')[:2]
+    assert loaded == '[]', f'{loaded} are imported by omnisafe'
+    assert int(num_algos) > 0
+
+
+@helpers.parametrize(algo=omnisafe.ALGORITHMS['all'])
+def test_lazy_registry(algo):
+    """Test that an algorithm is imported and registered when it is looked up"""
+    output = run_python(
+        'from omnisafe.algorithms import registry\n'
+        f'print({algo!r} in registry.REGISTRY.module_dict)\n'
+        f'print(registry.get({algo!r}).__name__)\n'
+        f'from omnisafe.algorithms import {algo}\n'
+        f'print({algo} is registry.get({algo!r}))\n'
+    )
+    assert output.split('\n')[:3] == ['False', algo, 'True']
+
+
+@helpers.parametrize(algo_type=['on-policy', 'off-policy', 'model-based'])
+def test_algorithm_modules(algo_type):
+    """Test that the lazy table lists the algorithms exported by each subpackage"""
+    subpackage = importlib.import_module(f'omnisafe.algorithms.{algo_type.replace("-", "_")}')
+    assert tuple(omnisafe.ALGORITHMS[algo_type]) == tuple(subpackage.__all__)
@@ -0,0 +1,136 @@
+# Copyright 2022 OmniSafe Team. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Test logger statistics"""
+
+import os
+
+import numpy as np
+import torch
+
+import helpers
+from omnisafe.common.logger import Logger
+from omnisafe.utils.distributed_utils import (
+    merge_moments,
+    mpi_statistics_from_moments,
+    mpi_statistics_scalar,
+    statistics_from_moments,
+)
+from omnisafe.utils.logger_utils import StatsAccumulator
+
+
+@helpers.parametrize(reservoir_size=[0, 10, 1000])
+def test_stats_accumulator(reservoir_size):
+    """Test running statistics against the statistics of all stored values"""
+    rng = np.random.default_rng(0)
+    accumulator = StatsAccumulator(reservoir_size)
+    values = []
+    for step in range(200):
+        value = rng.normal(size=4) if step % 2 else float(rng.normal())
+        accumulator.update(value)
+        values.append(np.atleast_1d(value))
+    values = np.concatenate(values)
+
+    np.testing.assert_allclose(
+        mpi_statistics_from_moments(accumulator.moments(), with_min_and_max=True),
+        mpi_statistics_scalar(values, with_min_and_max=True),
+        rtol=1e-5,
+    )
+    samples = accumulator.samples()
+    assert len(samples) == min(reservoir_size, len(values))
+    assert np.isin(samples, values).all()
+
+    accumulator.reset()
+    assert np.isnan(mpi_statistics_from_moments(accumulator.moments())[0])
+
+
+@helpers.parametrize(offset=[0.0, 1e9])
+def test_merge_moments(offset):
+    """Test the moments merged across processes against those of all values"""
+    rng = np.random.default_rng(0)
+    parts = [offset + rng.normal(size=size) for size in (0, 1, 7, 100)]
+    accumulators = []
+    for part in parts:
+        accumulator = StatsAccumulator()
+        for value in part[:3]:
+            accumulator.update(float(value))
+        accumulator.update(part[3:])
+        accumulators.append(accumulator)
+    merged = merge_moments(np.array([[accumulator.moments()] for accumulator in accumulators]))
+    values = np.concatenate(parts)
+    # large values of small spread keep their exact std, E[x^2] - E[x]^2 would cancel out
+    np.testing.assert_allclose(
+        statistics_from_moments(merged[0], with_min_and_max=True),
+        (values.mean(), values.std(), values.min(), values.max()),
+        rtol=1e-6,
+    )
+
+
+def test_log_tabular_order(tmp_path):
+    """Test that fused statistics keep the column order of log_tabular"""
+    logger = Logger(str(tmp_path), 'logger', use_tensor_board=False, verbose=False)
+    for value in range(10):
+        logger.store(**{'Metrics/EpRet': float(value), 'Values/V': np.full(2, value)})
+    logger.log_tabular('Metrics/EpRet')
+    logger.log_tabular('Epoch', 1)
+    logger.log_tabular('Values/V', min_and_max=True, std=True)
+    logger.dump_tabular()
+    logger.close()
+
+    with open(os.path.join(logger.log_dir, 'progress.txt'), encoding='utf-8') as file:
+        headers, values = (line.split() for line in file.read().splitlines())
+    assert headers == [
+        'Metrics/EpRet',
+        'Epoch',
+        'Values/V/Mean',
+        'Values/V/Std',
+        'Values/V/Min',
+        'Values/V/Max',
+    ]
+    np.testing.assert_allclose(
+        [float(value) for value in values], [4.5, 1, 4.5, np.std(np.arange(10)), 0, 9]
+    )
+
+
+@helpers.parametrize(async_save=[True, False])
+def test_checkpoint_retention(tmp_path, async_save):
+    """Test that the latest and the best checkpoints are kept, also across a resume"""
+    returns = [3.0, 9.0, 1.0, 7.0, 2.0, 0.0]
+
+    def train(epochs, resume):
+        logger = Logger(
+            str(tmp_path),
+            'logger',
+            use_tensor_board=False,
+            verbose=False,
+            resume=resume,
+            async_save=async_save,
+            keep_checkpoints=2,
+            keep_best_checkpoints=2,
+        )
+        for epoch in epochs:
+            logger.store(**{'Metrics/EpRet': returns[epoch]})
+            logger.log_tabular('Metrics/EpRet')
+            logger.dump_tabular()
+            logger.save_checkpoint({'epoch': epoch, 'weight': torch.full((3,), epoch)}, epoch)
+        logger.close()
+        return logger
+
+    train(range(4), resume=False)
+    logger = train(range(4, 6), resume=True)
+    assert [epoch for epoch, _ in logger.list_checkpoints()] == [1, 3, 4, 5]
+    state = logger.load_checkpoint()
+    assert state['epoch'] == 5
+    assert torch.equal(state['weight'], torch.full((3,), 5))
+    assert not list(tmp_path.glob('**/*.tmp'))
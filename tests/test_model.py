@@ -23,6 +23,18 @@ import helpers
 from omnisafe.models import ActorBuilder, CriticBuilder
 from omnisafe.models.actor_critic import ActorCritic
 from omnisafe.utils.config_utils import dict2namedtuple
+from omnisafe.utils.fisher import (
+    FisherSubsampler,
+    GaussianFisherVectorProduct,
+    is_diagonal_gaussian,
+)
+from omnisafe.utils.line_search import candidate_distributions, fixed_distribution
+from omnisafe.utils.tools import (
+    flatten_parameters,
+    get_flat_gradients_from,
+    get_flat_params_from,
+    set_param_values_to_model,
+)
 
 
 @helpers.parametrize(
@@ -157,6 +169,152 @@ def test_gaussian_actor(
     assert logp.shape == torch.Size([]), f'Actor logp output shape is {logp.shape}'
 
 
+@helpers.parametrize(
+    act_dim=[1, 5],
+    activation=['tanh', 'relu'],
+    actor_type=['gaussian_annealing', 'gaussian_learning', 'gaussian_stdnet'],
+)
+def test_gaussian_fisher_vector_product(act_dim: int, activation: str, actor_type: str) -> None:
+    """Test the analytic Fisher-vector product against the double backward pass."""
+    torch.manual_seed(0)
+    builder = ActorBuilder(
+        obs_dim=10,
+        act_dim=act_dim,
+        hidden_sizes=[32, 32],
+        activation=activation,
+        weight_initialization_mode='kaiming_uniform',
+    )
+    actor = builder.build_actor(
+        actor_type=actor_type,
+        act_min=torch.full((act_dim,), -1.0),
+        act_max=torch.full((act_dim,), 1.0),
+    )
+    obs = torch.randn(200, 10)
+    params = list(actor.net.parameters())
+    assert is_diagonal_gaussian(actor, obs)
+    fvp = GaussianFisherVectorProduct(actor, obs)
+
+    q_dist = actor(obs)
+    with torch.no_grad():
+        p_dist = actor(obs)
+    kl = torch.distributions.kl.kl_divergence(p_dist, q_dist).mean()
+    grads = torch.autograd.grad(kl, params, create_graph=True)
+    flat_grad_kl = torch.cat([grad.view(-1) for grad in grads])
+    for _ in range(3):
+        vector = torch.randn_like(flat_grad_kl)
+        grads = torch.autograd.grad((flat_grad_kl * vector).sum(), params, retain_graph=True)
+        expected = torch.cat([grad.reshape(-1) for grad in grads])
+        torch.testing.assert_close(fvp(vector), expected, rtol=1e-4, atol=1e-6)
+
+    # the parameters of the actor are left in place, also those of shared modules
+    assert all(isinstance(param, torch.nn.Parameter) for param in actor.parameters())
+    assert [param.data_ptr() for param in actor.net.parameters()] == [
+        param.data_ptr() for param in params
+    ]
+    categorical = ActorBuilder(obs_dim=10, act_dim=3, hidden_sizes=[32]).build_actor('categorical')
+    assert not is_diagonal_gaussian(categorical, obs)
+
+
+@helpers.parametrize(batch_size=[1, 10, 1000, 1001])
+def test_fisher_subsampler(batch_size: int) -> None:
+    """Test the subsets of the observations for the Fisher-vector products."""
+    obs = torch.arange(batch_size).float()
+    sampler = FisherSubsampler('fraction', 0.25)
+    if batch_size % 4 == 0:
+        assert torch.equal(sampler.sample(obs), obs[::4])
+    assert len(sampler.sample(obs)) == len(obs[::4])
+    assert len(FisherSubsampler('count', 100).sample(obs)) == min(batch_size, 100)
+
+    sampler = FisherSubsampler('adaptive', 0.25, tolerance=0.1, min_size=1)
+    initial = len(sampler.sample(obs))
+    # a constant KL-divergence needs no more than the smallest subset, shrinking gradually
+    sampler.update(torch.ones(batch_size, 3))
+    assert len(sampler.sample(obs)) == max(initial // 2, 1)
+    # one concentrated on a single observation needs the whole batch, growing gradually
+    spike = torch.zeros(batch_size)
+    spike[0] = 1.0
+    for size in (initial, 2 * initial, 4 * initial):
+        sampler.load_state_dict({'sample_size': size, 'batch_size': batch_size})
+        sampler.update(spike)
+        assert len(sampler.sample(obs)) == min(2 * size, batch_size)
+    # an unconverged conjugate gradient keeps the subset
+    sampler.load_state_dict({'sample_size': initial, 'batch_size': batch_size})
+    sampler.update(torch.ones(batch_size), residual=1.0)
+    assert sampler.state_dict()['sample_size'] == initial
+
+
+def build_seeded_actor(actor_type: str) -> torch.nn.Module:
+    """An actor with 10 observations and 3 actions, built after seeding torch."""
+    torch.manual_seed(0)
+    builder = ActorBuilder(obs_dim=10, act_dim=3, hidden_sizes=[32, 32], activation='tanh')
+    kwargs = (
+        {} if actor_type == 'categorical' else {'act_min': -torch.ones(3), 'act_max': torch.ones(3)}
+    )
+    return builder.build_actor(actor_type=actor_type, **kwargs)
+
+
+@helpers.parametrize(
+    num_candidates=[1, 4],
+    actor_type=['gaussian_annealing', 'gaussian_stdnet', 'categorical'],
+)
+def test_candidate_distributions(num_candidates: int, actor_type: str) -> None:
+    """Test the distributions of the candidate steps against setting the parameters."""
+    actor = build_seeded_actor(actor_type)
+    obs = torch.randn(50, 10)
+    theta_old = get_flat_params_from(actor.net)
+    thetas = theta_old + 0.1 * torch.randn(num_candidates, len(theta_old))
+
+    with torch.no_grad():
+        dists = candidate_distributions(actor, thetas, obs)
+        torch.testing.assert_close(get_flat_params_from(actor.net), theta_old)
+        assert len(dists) == num_candidates
+        for theta, dist in zip(thetas, dists):
+            set_param_values_to_model(actor.net, theta)
+            expected = actor(obs)
+            if actor_type == 'categorical':
+                torch.testing.assert_close(dist.probs, expected.probs)
+            else:
+                torch.testing.assert_close(dist.mean, expected.mean)
+                torch.testing.assert_close(dist.stddev, expected.stddev)
+            with fixed_distribution(actor, obs, dist):
+                assert actor(obs) is dist
+            assert actor(obs) is not dist
+
+
+@helpers.parametrize(actor_type=['gaussian_annealing', 'gaussian_stdnet', 'categorical'])
+def test_flatten_parameters(actor_type: str) -> None:
+    """Test the flat parameter layout against the concatenated copies."""
+    actor = build_seeded_actor(actor_type)
+    obs, act = torch.randn(50, 10), torch.zeros(50, 3)
+    act = act[:, 0] if actor_type == 'categorical' else act
+
+    def flat_gradients():
+        actor.net.zero_grad()
+        actor(obs).log_prob(act).mean().backward()
+        return get_flat_gradients_from(actor.net).clone()
+
+    theta = get_flat_params_from(actor.net)
+    grad = flat_gradients()
+    flatten_parameters(actor.net)
+    torch.testing.assert_close(get_flat_params_from(actor.net), theta)
+    assert get_flat_params_from(actor.net) is actor.net.flat_params
+    # gradients set to None are gathered into the buffer, where the next ones accumulate
+    torch.testing.assert_close(flat_gradients(), grad)
+    actor(obs).log_prob(act).mean().backward()
+    assert get_flat_gradients_from(actor.net) is actor.net.flat_grads
+    torch.testing.assert_close(get_flat_gradients_from(actor.net), 2 * grad)
+
+    # setting the parameters keeps the layout, without changing the previous vector
+    new_theta = theta + 1.0
+    set_param_values_to_model(actor.net, new_theta)
+    assert get_flat_params_from(actor.net) is new_theta
+    torch.testing.assert_close(get_flat_params_from(actor.net), theta + 1.0)
+    param = next(actor.net.parameters())
+    param.data = param.data.clone()
+    torch.testing.assert_close(get_flat_params_from(actor.net), theta + 1.0)
+    assert get_flat_params_from(actor.net) is not actor.net.flat_params
+
+
 @helpers.parametrize(
     obs_dim=[1, 10, 100],
     act_dim=[1, 5, 10],
@@ -29,6 +29,37 @@ def test_on_policy(on_policy_algo):
     agent.learn()
 
 
+@helpers.parametrize(on_policy_algo=['PPOLag', 'CPO', 'PPOLagEarlyTerminated'])
+def test_vectorized_on_policy(on_policy_algo):
+    """Test on-policy algorithms with several environments per process"""
+    env_id = 'SafetyPointGoal1-v0'
+    custom_cfgs = {
+        'epochs': 1,
+        'steps_per_epoch': 2000,
+        'num_envs': 2,
+        'pi_iters': 1,
+        'critic_iters': 1,
+    }
+    agent = omnisafe.Agent(on_policy_algo, env_id, custom_cfgs=custom_cfgs, parallel=1)
+    agent.learn()
+
+
+@helpers.parametrize(on_policy_algo=['PPO', 'CPO'])
+def test_async_on_policy(on_policy_algo):
+    """Test on-policy algorithms collecting the next epoch during the update"""
+    env_id = 'SafetyPointGoal1-v0'
+    custom_cfgs = {
+        'epochs': 2,
+        'steps_per_epoch': 2000,
+        'async_rollout': True,
+        'buffer_cfgs': {'adv_estimation_method': 'vtrace'},
+        'pi_iters': 1,
+        'critic_iters': 1,
+    }
+    agent = omnisafe.Agent(on_policy_algo, env_id, custom_cfgs=custom_cfgs, parallel=1)
+    agent.learn()
+
+
 @helpers.parametrize(off_policy_algo=omnisafe.ALGORITHMS['off-policy'])
 def test_off_policy(off_policy_algo):
     """Test algorithms"""
@@ -38,6 +69,46 @@ def test_off_policy(off_policy_algo):
     agent.learn()
 
 
+@helpers.parametrize(off_policy_algo=['DDPG', 'SACLag'])
+def test_actor_learner_off_policy(off_policy_algo):
+    """Test off-policy algorithms fed by collector processes"""
+    env_id = 'SafetyPointGoal1-v0'
+    custom_cfgs = {
+        'epochs': 1,
+        'steps_per_epoch': 2000,
+        'update_after': 500,
+        'start_steps': 500,
+    }
+    agent = omnisafe.Agent(off_policy_algo, env_id, custom_cfgs=custom_cfgs, parallel=2)
+    agent.learn()
+
+
+@helpers.parametrize(algo=['PPOLag', 'CPPOPid', 'DDPGLag', 'SAC'])
+def test_resume(algo, tmp_path):
+    """Test continuing the training from the checkpoint of a previous run"""
+    env_id = 'SafetyPointGoal1-v0'
+    custom_cfgs = {
+        'epochs': 2,
+        'steps_per_epoch': 2000,
+        'pi_iters': 1,
+        'critic_iters': 1,
+        'checkpoint_freq': 1,
+        'data_dir': str(tmp_path / 'first'),
+    }
+    if algo == 'SAC':
+        custom_cfgs.update(checkpoint_replay_buffer=True)
+    agent = omnisafe.Agent(algo, env_id, custom_cfgs=custom_cfgs, parallel=1)
+    agent.learn()
+    (log_dir,) = (tmp_path / 'first').glob('*/*/*/')
+
+    # the resumed run only trains the epoch after the checkpoint
+    custom_cfgs.update(epochs=3, data_dir=str(tmp_path / 'second'))
+    agent = omnisafe.Agent(algo, env_id, custom_cfgs=custom_cfgs, parallel=1)
+    agent.learn(resume_from=str(log_dir))
+    (progress,) = (tmp_path / 'second').glob('**/progress.txt')
+    assert len(progress.read_text().splitlines()) == 2
+
+
 def test_evaluate_saved_policy():
     """Test render policy."""
     DIR = os.path.join(os.path.dirname(__file__), 'runs')
@@ -0,0 +1,54 @@
+# Copyright 2022 OmniSafe Team. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+"""Test V-trace"""
+
+import numpy as np
+import torch
+
+import helpers
+from omnisafe.utils.vtrace import calculate_batched_v_trace, calculate_v_trace
+
+
+@helpers.parametrize(mean_ep_len=[1, 5, 50], rho_bar=[1.0, 2.0])
+def test_batched_v_trace(mean_ep_len, rho_bar):
+    """Test the batched V-trace against the recursion over single paths"""
+    gamma, steps, batch_size = 0.99, 200, 3
+    rng = np.random.default_rng(0)
+    rewards, values, next_values = rng.normal(size=(3, steps, batch_size))
+    log_rhos = rng.normal(scale=0.5, size=(steps, batch_size))
+    dones = rng.random(size=(steps, batch_size)) < 1.0 / mean_ep_len
+    dones[-1] = True
+    # within a path the next value is the value of the following step
+    next_values = np.where(dones, next_values, np.append(values[1:], values[:1], axis=0))
+
+    v_s, adv, _ = calculate_batched_v_trace(
+        *(torch.as_tensor(x) for x in (log_rhos, values, rewards, next_values, dones)),
+        gamma=gamma,
+        rho_bar=rho_bar,
+    )
+    for column in range(batch_size):
+        ends = np.flatnonzero(dones[:, column]) + 1
+        for start, end in zip(np.append(0, ends[:-1]), ends):
+            path = slice(start, end)
+            expected_v_s, expected_adv, _ = calculate_v_trace(
+                policy_action_probs=np.exp(log_rhos[path, column]),
+                values=np.append(values[path, column], next_values[end - 1, column]),
+                rewards=np.append(rewards[path, column], 0.0),
+                behavior_action_probs=np.ones(end - start),
+                gamma=gamma,
+                rho_bar=rho_bar,
+            )
+            np.testing.assert_allclose(v_s[path, column].numpy(), expected_v_s, atol=1e-8)
+            np.testing.assert_allclose(adv[path, column].numpy(), expected_adv, atol=1e-8)